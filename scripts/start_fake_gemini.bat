@@ -0,0 +1,5 @@
+@echo off
+REM Gemini互換の疑似埋め込みサーバー起動スクリプト（負荷・障害テスト用）
+
+REM 疑似サーバー起動
+python -m src.fake_gemini.server --port 8765 %*
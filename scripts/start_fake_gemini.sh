@@ -0,0 +1,6 @@
+#!/bin/bash
+# Gemini互換の疑似埋め込みサーバー起動スクリプト（負荷・障害テスト用）
+# config.yaml の embedding.base_url を "http://127.0.0.1:8765" に設定して使用
+
+# 疑似サーバー起動（追加オプションはそのまま渡す: --latency-ms, --error-rate-429 など）
+python -m src.fake_gemini.server --port 8765 "$@"
@@ -1,6 +1,7 @@
 """FastAPI application for Local RAG."""
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import search, index
 from .dependencies import get_app_state
@@ -48,5 +49,8 @@ async def health():
     """ヘルスチェックエンドポイント"""
     return {
         "status": "healthy",
-        "index_size": app.state.app_state.vector_store.count()
+        "index_size": sum([
+            await run_in_threadpool(corpus.vector_store.count)
+            for corpus in app.state.app_state.corpora.values()
+        ])
     }
@@ -1,15 +1,19 @@
 """Dependency injection for FastAPI."""
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Dict, Optional
 from dotenv import load_dotenv
+from fastapi import HTTPException
 
 from ..shared.config import load_config
-from ..shared.db import FileDB, VectorStore
+from ..shared.corpus import Corpus, get_corpus, list_corpora, open_corpus
 from ..shared.embedder import Embedder
-from ..shared.searcher import Searcher
-from ..shared.indexer import Indexer
+from ..shared.embedding_cache import EmbeddingCache
+from ..shared.query_batcher import QueryBatcher
+from ..shared.query_cache import QueryEmbeddingCache
 
 load_dotenv()
 
@@ -18,11 +22,21 @@ load_dotenv()
 class AppState:
     """アプリケーション状態（シングルトン）"""
     docs_dir: Path
-    file_db: FileDB
-    vector_store: VectorStore
+    corpora: Dict[str, Corpus]
     embedder: Embedder
-    searcher: Searcher
-    indexer: Indexer
+    executor: ThreadPoolExecutor
+
+    def get_corpus(self, name: Optional[str] = None) -> Corpus:
+        """コーパスを名前で取得（None = DOCS_DIRのコーパス、未登録ならKeyError）"""
+        return get_corpus(self.corpora, name)
+
+
+def get_corpus_or_404(app_state: AppState, name: Optional[str]) -> Corpus:
+    """リクエストで指定されたコーパスを取得（未登録なら404）"""
+    try:
+        return app_state.get_corpus(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0]) from e
 
 
 def get_app_state() -> AppState:
@@ -42,27 +56,52 @@ def get_app_state() -> AppState:
     # 設定読込
     app_config = load_config(docs_dir=docs_dir)
 
-    # DB初期化
-    file_db = FileDB(data_dir / "files.db")
-    vector_store = VectorStore(data_dir / "chroma", app_config.chromadb)
+    # Embedder初期化（全コーパスで共有）
+    embedding_cache = None
+    if app_config.embedding.cache_enabled:
+        embedding_cache = EmbeddingCache(
+            data_dir / "embedding_cache.db",
+            app_config.embedding.cache_max_entries
+        )
+    embedder = Embedder(app_config.embedding, app_config.retry, embedding_cache)
 
-    # Embedder初期化
-    embedder = Embedder(app_config.embedding, app_config.retry)
+    # ブロッキング処理（ChromaDB/SQLite）用の上限付きExecutor
+    executor = ThreadPoolExecutor(
+        max_workers=app_config.concurrency.max_workers,
+        thread_name_prefix="rag-worker"
+    )
 
-    # Searcher初期化
-    searcher = Searcher(embedder, vector_store)
+    # クエリエンベディングキャッシュ初期化
+    query_cache = None
+    if app_config.search.query_cache_size > 0:
+        query_cache = QueryEmbeddingCache(
+            app_config.search.query_cache_size,
+            app_config.search.query_cache_ttl,
+            data_dir / "query_cache.db" if app_config.search.query_cache_persist else None,
+            app_config.embedding.task_type_query
+        )
 
-    # Indexer初期化
-    indexer = Indexer(
-        docs_dir, file_db, vector_store, embedder,
-        app_config.scanner, app_config.chunker
-    )
+    # クエリのマイクロバッチ化
+    query_batcher = None
+    if app_config.search.query_batching:
+        query_batcher = QueryBatcher(
+            embedder,
+            app_config.search.query_batch_max_wait_ms,
+            app_config.search.query_batch_max_size
+        )
+
+    # コーパスごとのDB・Searcher・Indexer初期化（DOCS_DIR + config.corpora）
+    corpora = {
+        name: open_corpus(
+            name, corpus_docs_dir, corpus_data_dir,
+            embedder, executor, query_cache, query_batcher
+        )
+        for name, corpus_docs_dir, corpus_data_dir in list_corpora(docs_dir, data_dir, app_config)
+    }
 
     return AppState(
         docs_dir=docs_dir,
-        file_db=file_db,
-        vector_store=vector_store,
+        corpora=corpora,
         embedder=embedder,
-        searcher=searcher,
-        indexer=indexer
+        executor=executor
     )
@@ -1,7 +1,13 @@
 """Index management API router."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Request, HTTPException
-from ..schemas.index import IndexRebuildRequest, IndexRebuildResponse, IndexStatusResponse
+from fastapi.concurrency import run_in_threadpool
+from ..dependencies import get_corpus_or_404
+from ..schemas.index import (
+    CorpusItem, CorpusListResponse, IndexRebuildRequest, IndexRebuildResponse, IndexStatusResponse
+)
 import time
 
 router = APIRouter()
@@ -11,11 +17,13 @@ router = APIRouter()
 async def rebuild_index(request: IndexRebuildRequest, app_request: Request):
     """インデックス再構築"""
     app_state = app_request.app.state.app_state
+    corpus = get_corpus_or_404(app_state, request.corpus)
 
     start_time = time.perf_counter()
 
     try:
-        summary = app_state.indexer.update()
+        # 再インデックス中も他のリクエストを処理できるようExecutorで実行
+        summary = await corpus.indexer.update_async()
         elapsed_ms = (time.perf_counter() - start_time) * 1000
 
         return IndexRebuildResponse(
@@ -25,6 +33,8 @@ async def rebuild_index(request: IndexRebuildRequest, app_request: Request):
             unchanged=summary.unchanged,
             total_chunks=summary.total_chunks,
             api_call_count=summary.api_call_count,
+            cache_hits=summary.cache_hits,
+            cache_misses=summary.cache_misses,
             execution_time_ms=elapsed_ms
         )
 
@@ -33,17 +43,38 @@ async def rebuild_index(request: IndexRebuildRequest, app_request: Request):
 
 
 @router.get("/index/status", response_model=IndexStatusResponse)
-async def index_status(app_request: Request):
+async def index_status(app_request: Request, corpus: Optional[str] = None):
     """インデックス状態取得"""
     app_state = app_request.app.state.app_state
+    selected = get_corpus_or_404(app_state, corpus)
 
     try:
-        total_files = len(app_state.file_db.get_all_files())
+        # 読み取り専用接続で件数のみ取得（インデックス更新の書き込みと競合しない）
+        total_files = await run_in_threadpool(selected.file_db.count_files)
 
         return IndexStatusResponse(
-            total_chunks=app_state.vector_store.count(),
+            total_chunks=await run_in_threadpool(selected.vector_store.count),
             total_files=total_files
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/corpora", response_model=CorpusListResponse)
+async def list_corpora(app_request: Request):
+    """検索可能なコーパスの一覧"""
+    app_state = app_request.app.state.app_state
+
+    try:
+        return CorpusListResponse(corpora=[
+            CorpusItem(
+                name=corpus.name,
+                docs_dir=str(corpus.docs_dir),
+                total_chunks=await run_in_threadpool(corpus.vector_store.count)
+            )
+            for corpus in app_state.corpora.values()
+        ])
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
@@ -1,7 +1,12 @@
 """Search API router."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Request, HTTPException
-from ..schemas.search import SearchRequest, SearchResponse, SearchResultItem
+from fastapi.concurrency import run_in_threadpool
+from ...shared.db import SearchFilters
+from ..dependencies import get_corpus_or_404
+from ..schemas.search import SearchRequest, SearchResponse, SearchResultItem, SearchStatsResponse
 import time
 
 router = APIRouter()
@@ -9,18 +14,30 @@ router = APIRouter()
 
 @router.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest, app_request: Request):
-    """セマンティック検索"""
+    """ドキュメント検索（セマンティック・全文・ハイブリッド）"""
     app_state = app_request.app.state.app_state
+    corpus = get_corpus_or_404(app_state, request.corpus)
 
     start_time = time.perf_counter()
 
     try:
         # インデックスが空なら自動構築
-        if app_state.vector_store.count() == 0:
-            app_state.indexer.update()
+        if await run_in_threadpool(corpus.vector_store.count) == 0:
+            await corpus.indexer.update_async()
 
-        # 検索実行
-        results = app_state.searcher.search(request.query, request.top_k)
+        # 絞り込み条件はベクトルストアの検索時に適用
+        filters = SearchFilters(
+            path_prefix=request.path_prefix or "",
+            path_glob=request.path_glob or "",
+            extensions=request.extensions or [],
+            heading=request.heading or ""
+        )
+
+        # 検索実行（イベントループをブロックしない）
+        results = await corpus.searcher.search_async(
+            request.query, request.top_k, search_ef=request.search_ef, filters=filters,
+            mode=request.mode
+        )
 
         # レスポンス構築
         elapsed_ms = (time.perf_counter() - start_time) * 1000
@@ -36,10 +53,27 @@ async def search(request: SearchRequest, app_request: Request):
                 )
                 for r in results
             ],
-            total_chunks=app_state.vector_store.count(),
+            total_chunks=await run_in_threadpool(corpus.vector_store.count),
             query=request.query,
+            corpus=corpus.name,
             execution_time_ms=elapsed_ms
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search/stats", response_model=SearchStatsResponse)
+async def search_stats(app_request: Request, corpus: Optional[str] = None):
+    """検索統計（クエリキャッシュは全コーパス共通、同一クエリの合流数はコーパス単位）"""
+    app_state = app_request.app.state.app_state
+
+    stats = get_corpus_or_404(app_state, corpus).searcher.get_stats()
+
+    return SearchStatsResponse(
+        query_cache_hits=stats["hits"],
+        query_cache_misses=stats["misses"],
+        query_cache_hit_rate=stats["hit_rate"],
+        query_cache_size=stats["size"],
+        coalesced_searches=stats["coalesced"]
+    )
@@ -1,11 +1,15 @@
 """Index API request and response schemas."""
 
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
 
 
 class IndexRebuildRequest(BaseModel):
     """インデックス再構築リクエスト"""
-    pass  # 将来的に force_full_rebuild などを追加可能
+    corpus: Optional[str] = Field(
+        None, description="再構築するコーパス名（未指定時はDOCS_DIRのコーパス）"
+    )
 
 
 class IndexRebuildResponse(BaseModel):
@@ -16,6 +20,8 @@ class IndexRebuildResponse(BaseModel):
     unchanged: int
     total_chunks: int
     api_call_count: int
+    cache_hits: int
+    cache_misses: int
     execution_time_ms: float
 
 
@@ -23,3 +29,15 @@ class IndexStatusResponse(BaseModel):
     """インデックス状態レスポンス"""
     total_chunks: int
     total_files: int
+
+
+class CorpusItem(BaseModel):
+    """コーパス情報"""
+    name: str
+    docs_dir: str
+    total_chunks: int
+
+
+class CorpusListResponse(BaseModel):
+    """コーパス一覧レスポンス"""
+    corpora: List[CorpusItem]
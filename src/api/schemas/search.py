@@ -1,13 +1,37 @@
 """Search API request and response schemas."""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 
 class SearchRequest(BaseModel):
     """検索リクエスト"""
     query: str = Field(..., min_length=1, description="検索クエリ")
     top_k: Optional[int] = Field(5, ge=1, le=100, description="返却件数")
+    search_ef: Optional[int] = Field(
+        None, ge=1, le=1000,
+        description="HNSW検索時の探索幅（大きいほど高精度・低速、未指定時は設定値）"
+    )
+    corpus: Optional[str] = Field(
+        None, description="検索対象のコーパス名（未指定時はDOCS_DIRのコーパス）"
+    )
+    path_prefix: Optional[str] = Field(
+        None, description="パスの前方一致で絞り込み（例: docs/runbooks/）"
+    )
+    path_glob: Optional[str] = Field(
+        None, description="パスのglobで絞り込み（例: docs/*/README.md、*はパス区切りにも一致）"
+    )
+    extensions: Optional[List[str]] = Field(
+        None, description="拡張子で絞り込み（例: [\".md\"]）"
+    )
+    heading: Optional[str] = Field(
+        None, description="見出しの部分一致で絞り込み（大文字小文字を区別しない）"
+    )
+    mode: Optional[Literal["vector", "hybrid", "lexical"]] = Field(
+        None,
+        description="検索モード（vector: エンベディング、hybrid: 全文検索と順位融合、"
+                    "lexical: 全文検索のみ。未指定時は設定値）"
+    )
 
 
 class SearchResultItem(BaseModel):
@@ -24,4 +48,14 @@ class SearchResponse(BaseModel):
     results: List[SearchResultItem]
     total_chunks: int
     query: str
+    corpus: str
     execution_time_ms: float
+
+
+class SearchStatsResponse(BaseModel):
+    """検索統計レスポンス"""
+    query_cache_hits: int
+    query_cache_misses: int
+    query_cache_hit_rate: float
+    query_cache_size: int
+    coalesced_searches: int
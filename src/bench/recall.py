@@ -0,0 +1,441 @@
+"""Recall/latency benchmark for HNSW index settings.
+
+Copies the vectors already stored in the VectorStore into throwaway ChromaDB
+collections built with each hnsw_M value, queries them with each search ef,
+and compares the results against exact NumPy search. Queries are either
+sampled from the stored vectors or embedded from a file of query texts.
+
+Usage:
+    python -m src.bench.recall --docs-dir ./docs --m 8,16,32 --ef 10,50,100,200 --k 10
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import chromadb
+import numpy as np
+
+from ..shared.config import load_config
+from ..shared.db import create_vector_store
+
+
+logger = logging.getLogger(__name__)
+
+# Vectors added per collection.add() call while building an index
+_ADD_BATCH = 1000
+# Queries scored per matrix product in exact search
+_EXACT_BATCH = 256
+
+
+@dataclass
+class BenchResult:
+    """Recall and latency of one index setting."""
+    m: int
+    construction_ef: int
+    search_ef: int
+    recall: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    build_seconds: float
+
+
+def exact_search(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    space: str = "cosine"
+) -> np.ndarray:
+    """
+    Find the exact k nearest neighbours by brute force.
+
+    Args:
+        vectors: Stored vectors, shape (n, dim)
+        queries: Query vectors, shape (q, dim)
+        k: Number of neighbours
+        space: Distance function (cosine / l2 / ip)
+
+    Returns:
+        Row indices into vectors, shape (q, k), nearest first
+    """
+    vectors, squared_norms = prepare_exact(vectors, space)
+    return exact_top_k(vectors, squared_norms, queries, k, space)
+
+
+def prepare_exact(vectors: np.ndarray, space: str = "cosine") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precompute the per-vector part of exact search once.
+
+    Args:
+        vectors: Stored vectors, shape (n, dim)
+        space: Distance function (cosine / l2 / ip)
+
+    Returns:
+        Tuple of (vectors, normalized for cosine; squared norms for l2)
+    """
+    if space == "cosine":
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    squared_norms = (vectors ** 2).sum(axis=1)
+    return vectors, squared_norms
+
+
+def exact_top_k(
+    vectors: np.ndarray,
+    squared_norms: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    space: str = "cosine"
+) -> np.ndarray:
+    """
+    Score queries against vectors prepared by prepare_exact.
+
+    Args:
+        vectors: Vectors returned by prepare_exact
+        squared_norms: Squared norms returned by prepare_exact
+        queries: Query vectors, shape (q, dim)
+        k: Number of neighbours
+        space: Distance function (cosine / l2 / ip)
+
+    Returns:
+        Row indices into vectors, shape (q, k), nearest first
+    """
+    k = min(k, len(vectors))
+    if space == "cosine":
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+    neighbours = []
+    for start in range(0, len(queries), _EXACT_BATCH):
+        scores = queries[start:start + _EXACT_BATCH] @ vectors.T
+        if space == "l2":
+            # ||q - v||^2 = ||q||^2 - 2 q.v + ||v||^2; ||q||^2 does not change the order
+            scores = 2 * scores - squared_norms
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        neighbours.append(np.take_along_axis(top, order, axis=1))
+
+    return np.concatenate(neighbours) if neighbours else np.empty((0, k), dtype=np.int64)
+
+
+def recall_at_k(found: Sequence[Sequence[int]], truth: np.ndarray) -> float:
+    """
+    Compute mean recall@k of approximate results against exact ones.
+
+    Args:
+        found: Approximate neighbour indices per query
+        truth: Exact neighbour indices, shape (q, k)
+
+    Returns:
+        Fraction of exact neighbours that were found, averaged over queries
+    """
+    if len(truth) == 0:
+        return 0.0
+    k = truth.shape[1]
+    hits = sum(len(set(approx[:k]) & set(exact)) for approx, exact in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def latency_percentiles(latencies: Sequence[float]) -> Tuple[float, float, float]:
+    """
+    Summarize query latencies.
+
+    Args:
+        latencies: Latencies in seconds
+
+    Returns:
+        Tuple of (p50, p95, p99) in milliseconds
+    """
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000.0, [50, 95, 99])
+    return float(p50), float(p95), float(p99)
+
+
+def build_index(
+    client,
+    name: str,
+    vectors: np.ndarray,
+    space: str,
+    m: int,
+    construction_ef: int
+):
+    """
+    Build a ChromaDB collection holding the given vectors.
+
+    search_ef is set to 1 so the breadth of each query is controlled only by
+    n_results (hnswlib searches with max(ef, k)), the same mechanism
+    VectorStore.query uses for per-query overrides.
+
+    Args:
+        client: ChromaDB client
+        name: Collection name
+        vectors: Vectors to index; row i gets ID str(i)
+        space: Distance function
+        m: hnsw:M
+        construction_ef: hnsw:construction_ef
+
+    Returns:
+        Tuple of (collection, build time in seconds)
+    """
+    collection = client.create_collection(
+        name=name,
+        metadata={
+            "hnsw:space": space,
+            "hnsw:M": m,
+            "hnsw:construction_ef": construction_ef,
+            "hnsw:search_ef": 1,
+        }
+    )
+
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), _ADD_BATCH):
+        batch = vectors[offset:offset + _ADD_BATCH]
+        collection.add(
+            ids=[str(i) for i in range(offset, offset + len(batch))],
+            embeddings=batch
+        )
+    return collection, time.perf_counter() - start
+
+
+def query_index(
+    collection,
+    queries: np.ndarray,
+    k: int,
+    search_ef: int
+) -> Tuple[List[List[int]], List[float]]:
+    """
+    Query an index one query at a time, as the searcher does.
+
+    Args:
+        collection: Collection built by build_index
+        queries: Query vectors
+        k: Number of neighbours
+        search_ef: Search breadth
+
+    Returns:
+        Tuple of (neighbour indices per query, latency per query in seconds)
+    """
+    n_results = min(max(k, search_ef), collection.count())
+    found: List[List[int]] = []
+    latencies: List[float] = []
+
+    for query in queries:
+        start = time.perf_counter()
+        results = collection.query(
+            query_embeddings=query.reshape(1, -1),
+            n_results=n_results,
+            include=["distances"]
+        )
+        latencies.append(time.perf_counter() - start)
+        found.append([int(i) for i in results["ids"][0][:k]])
+
+    return found, latencies
+
+
+def run_grid(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    m_values: Sequence[int],
+    ef_values: Sequence[int],
+    construction_ef: int,
+    space: str = "cosine"
+) -> List[BenchResult]:
+    """
+    Measure recall@k and latency for every (M, ef) combination.
+
+    Args:
+        vectors: Stored vectors
+        queries: Query vectors
+        k: Number of neighbours
+        m_values: hnsw:M values to build
+        ef_values: Search ef values to query each index with
+        construction_ef: hnsw:construction_ef for every index
+        space: Distance function
+
+    Returns:
+        List of BenchResult objects
+    """
+    truth = exact_search(vectors, queries, k, space)
+    results: List[BenchResult] = []
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as tmp_dir:
+        client = chromadb.PersistentClient(path=tmp_dir)
+        for m in m_values:
+            name = f"bench-m{m}"
+            logger.info(f"Building index M={m}, construction_ef={construction_ef}...")
+            collection, build_seconds = build_index(
+                client, name, vectors, space, m, construction_ef
+            )
+
+            for ef in ef_values:
+                found, latencies = query_index(collection, queries, k, ef)
+                p50, p95, p99 = latency_percentiles(latencies)
+                results.append(BenchResult(
+                    m=m,
+                    construction_ef=construction_ef,
+                    search_ef=ef,
+                    recall=recall_at_k(found, truth),
+                    p50_ms=p50,
+                    p95_ms=p95,
+                    p99_ms=p99,
+                    build_seconds=build_seconds
+                ))
+
+            client.delete_collection(name)
+
+    return results
+
+
+def format_table(results: List[BenchResult], exact_ms: Optional[Tuple[float, float, float]] = None) -> str:
+    """
+    Format benchmark results as a text table.
+
+    Args:
+        results: Benchmark results
+        exact_ms: (p50, p95, p99) latency of exact search, for reference
+
+    Returns:
+        Table text
+    """
+    lines = [
+        f"{'M':>4} {'ef_c':>5} {'ef':>5} {'recall':>7} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'build_s':>8}"
+    ]
+    for r in results:
+        lines.append(
+            f"{r.m:>4} {r.construction_ef:>5} {r.search_ef:>5} {r.recall:>7.4f} "
+            f"{r.p50_ms:>8.2f} {r.p95_ms:>8.2f} {r.p99_ms:>8.2f} {r.build_seconds:>8.2f}"
+        )
+    if exact_ms is not None:
+        lines.append(
+            f"{'exact':>4} {'-':>5} {'-':>5} {1.0:>7.4f} "
+            f"{exact_ms[0]:>8.2f} {exact_ms[1]:>8.2f} {exact_ms[2]:>8.2f} {'-':>8}"
+        )
+    return "\n".join(lines)
+
+
+def _exact_latency(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> Tuple[float, float, float]:
+    """
+    Measure per-query latency of exact search.
+
+    The stored vectors are normalized once up front, as a real exact-search
+    index would keep them; only query scoring is timed.
+
+    Args:
+        vectors: Stored vectors
+        queries: Query vectors
+        k: Number of neighbours
+        space: Distance function
+
+    Returns:
+        Tuple of (p50, p95, p99) in milliseconds
+    """
+    vectors, squared_norms = prepare_exact(vectors, space)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        exact_top_k(vectors, squared_norms, query.reshape(1, -1), k, space)
+        latencies.append(time.perf_counter() - start)
+    return latency_percentiles(latencies)
+
+
+def _load_queries(path: Path, app_config) -> np.ndarray:
+    """
+    Embed query texts from a file (one query per line).
+
+    Args:
+        path: Query file
+        app_config: Application configuration
+
+    Returns:
+        float32 query vectors
+    """
+    from ..shared.embedder import Embedder
+
+    texts = [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    embedder = Embedder(app_config.embedding, app_config.retry)
+    return embedder.embed_texts(texts, task_type=app_config.embedding.task_type_query)
+
+
+def _int_list(value: str) -> List[int]:
+    """Parse a comma-separated list of integers."""
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Recall/latency benchmark of HNSW settings against exact search"
+    )
+    parser.add_argument("--docs-dir", required=True,
+                        help="Documents directory (for config.yaml lookup)")
+    parser.add_argument("--data-dir",
+                        help="Data directory (default: <docs-dir>/.rag-index)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (recall@k)")
+    parser.add_argument("--m", type=_int_list, default=[8, 16, 32],
+                        help="Comma-separated hnsw_M values")
+    parser.add_argument("--ef", type=_int_list, default=[10, 50, 100, 200, 400],
+                        help="Comma-separated search ef values")
+    parser.add_argument("--construction-ef", type=int, default=None,
+                        help="hnsw_construction_ef (default: config value)")
+    parser.add_argument("--num-queries", type=int, default=200,
+                        help="Queries sampled from stored vectors")
+    parser.add_argument("--queries", type=Path, default=None,
+                        help="File of query texts, one per line (embedded via the API)")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--json", type=Path, default=None, help="Also write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose (DEBUG) logging")
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        stream=sys.stderr
+    )
+
+    docs_dir = Path(args.docs_dir).resolve()
+    data_dir = Path(args.data_dir).resolve() if args.data_dir else docs_dir / ".rag-index"
+    app_config = load_config(docs_dir=docs_dir)
+    construction_ef = args.construction_ef or app_config.chromadb.hnsw_construction_ef
+
+    vector_store = create_vector_store(data_dir, app_config.vector_store, app_config.chromadb)
+    # Metric of the active backend (numpy and ivf are always cosine)
+    space = vector_store.space
+    _, vectors = vector_store.get_all_vectors()
+    if len(vectors) == 0:
+        logger.error("The index is empty; run a reindex first")
+        sys.exit(1)
+
+    if args.queries is not None:
+        queries = _load_queries(args.queries, app_config)
+    else:
+        rng = np.random.default_rng(args.seed)
+        sample = rng.choice(len(vectors), size=min(args.num_queries, len(vectors)), replace=False)
+        queries = vectors[sample]
+
+    logger.info(f"{len(vectors)} vectors (dim={vectors.shape[1]}), {len(queries)} queries, k={args.k}")
+    results = run_grid(vectors, queries, args.k, args.m, args.ef, construction_ef, space)
+    exact_ms = _exact_latency(vectors, queries, args.k, space)
+
+    print(format_table(results, exact_ms))
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(
+            {
+                "vectors": len(vectors),
+                "queries": len(queries),
+                "k": args.k,
+                "space": space,
+                "exact_ms": dict(zip(["p50", "p95", "p99"], exact_ms)),
+                "results": [asdict(r) for r in results],
+            },
+            indent=2
+        ))
+
+
+if __name__ == "__main__":
+    main()
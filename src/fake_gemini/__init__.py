@@ -0,0 +1 @@
+# Fake Gemini embedding server module
@@ -0,0 +1,212 @@
+"""Local Gemini-compatible embedding server for load and failure testing.
+
+Implements the `models/{model}:batchEmbedContents` and
+`models/{model}:embedContent` endpoints of the Gemini API with deterministic
+vectors, a configurable latency distribution, injected 429/500 errors and
+request-size limits. Point the Gemini backend at it with
+`embedding.base_url: "http://127.0.0.1:8765"`.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from ..shared.config import EmbeddingConfig
+from ..shared.embedding_backends import HashingBackend
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour of the fake embedding server."""
+    dimensionality: int = 768           # Used when a request has no outputDimensionality
+    latency_ms: float = 50.0            # Median latency
+    latency_sigma: float = 0.5          # Log-normal shape (0 = constant latency)
+    error_rate_429: float = 0.0         # Probability of RESOURCE_EXHAUSTED
+    error_rate_500: float = 0.0         # Probability of INTERNAL
+    max_batch_size: int = 100           # Texts per batchEmbedContents request
+    max_payload_chars: int = 0          # Total characters per request (0 = unlimited)
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakeServerStats:
+    """Counters exposed at GET /stats."""
+    requests: int = 0
+    texts: int = 0
+    errors: Dict[int, int] = field(default_factory=dict)
+
+
+def _error(code: int, status: str, message: str) -> JSONResponse:
+    """
+    Build an error response in the Gemini API format.
+
+    Args:
+        code: HTTP status code
+        status: Google RPC status name
+        message: Error message
+
+    Returns:
+        JSONResponse
+    """
+    return JSONResponse(
+        status_code=code,
+        content={"error": {"code": code, "message": message, "status": status}}
+    )
+
+
+def _request_texts(request: Dict[str, Any]) -> str:
+    """
+    Extract the text of a single EmbedContentRequest.
+
+    Args:
+        request: Request object
+
+    Returns:
+        Concatenated text of all parts
+    """
+    parts = request.get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+def create_app(config: FakeServerConfig) -> FastAPI:
+    """
+    Create the fake embedding server application.
+
+    Args:
+        config: Server behaviour
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title="Fake Gemini Embedding API")
+    rng = random.Random(config.seed)
+    stats = FakeServerStats()
+    backends: Dict[int, HashingBackend] = {}
+
+    def embed(text: str, dimensionality: int) -> List[float]:
+        if dimensionality not in backends:
+            backends[dimensionality] = HashingBackend(
+                EmbeddingConfig(backend="hashing", output_dimensionality=dimensionality)
+            )
+        return backends[dimensionality].embed([text], "")[0].tolist()
+
+    def record_error(response: JSONResponse) -> JSONResponse:
+        stats.errors[response.status_code] = stats.errors.get(response.status_code, 0) + 1
+        return response
+
+    @app.post("/{api_version}/models/{model_action}")
+    async def models_action(api_version: str, model_action: str, request: Request):
+        """Handle embedContent / batchEmbedContents."""
+        model, _, action = model_action.partition(":")
+        body = await request.json()
+        stats.requests += 1
+
+        if config.latency_ms > 0:
+            if config.latency_sigma > 0:
+                latency = rng.lognormvariate(0.0, config.latency_sigma) * config.latency_ms
+            else:
+                latency = config.latency_ms
+            await asyncio.sleep(latency / 1000.0)
+
+        roll = rng.random()
+        if roll < config.error_rate_429:
+            return record_error(_error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (fake)."))
+        if roll < config.error_rate_429 + config.error_rate_500:
+            return record_error(_error(500, "INTERNAL", "An internal error has occurred (fake)."))
+
+        if action == "batchEmbedContents":
+            requests = body.get("requests", [])
+        elif action == "embedContent":
+            requests = [body]
+        else:
+            return record_error(_error(404, "NOT_FOUND", f"Unsupported action: {action}"))
+
+        if len(requests) > config.max_batch_size:
+            return record_error(_error(
+                400, "INVALID_ARGUMENT",
+                f"* BatchEmbedContentsRequest.requests: at most {config.max_batch_size} "
+                f"requests can be in one batch"
+            ))
+
+        texts = [_request_texts(r) for r in requests]
+        payload_chars = sum(len(text) for text in texts)
+        if config.max_payload_chars and payload_chars > config.max_payload_chars:
+            return record_error(_error(
+                400, "INVALID_ARGUMENT",
+                f"Request payload size exceeds the limit: {config.max_payload_chars} characters."
+            ))
+
+        stats.texts += len(texts)
+        embeddings = [
+            {"values": embed(text, r.get("outputDimensionality") or config.dimensionality)}
+            for r, text in zip(requests, texts)
+        ]
+
+        if action == "embedContent":
+            return {"embedding": embeddings[0]}
+        return {"embeddings": embeddings}
+
+    @app.get("/stats")
+    async def get_stats():
+        """Request counters since startup."""
+        return {
+            "requests": stats.requests,
+            "texts": stats.texts,
+            "errors": {str(code): count for code, count in stats.errors.items()}
+        }
+
+    return app
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Local Gemini-compatible fake embedding server"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dimensionality", type=int, default=768,
+                        help="Vector size when the request does not specify one")
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="Median response latency in milliseconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                        help="Log-normal shape of the latency distribution (0 = constant)")
+    parser.add_argument("--error-rate-429", type=float, default=0.0,
+                        help="Probability of answering 429 RESOURCE_EXHAUSTED")
+    parser.add_argument("--error-rate-500", type=float, default=0.0,
+                        help="Probability of answering 500 INTERNAL")
+    parser.add_argument("--max-batch-size", type=int, default=100,
+                        help="Maximum texts per batchEmbedContents request")
+    parser.add_argument("--max-payload-chars", type=int, default=0,
+                        help="Maximum characters per request (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for reproducible latency and errors")
+
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        dimensionality=args.dimensionality,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate_429=args.error_rate_429,
+        error_rate_500=args.error_rate_500,
+        max_batch_size=args.max_batch_size,
+        max_payload_chars=args.max_payload_chars,
+        seed=args.seed
+    )
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
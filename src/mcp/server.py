@@ -1,12 +1,14 @@
 """MCP Server for local RAG search."""
 
 import argparse
+import asyncio
 import logging
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 from mcp.server import Server
@@ -14,10 +16,13 @@ from mcp.server.stdio import stdio_server
 from mcp import types
 
 from ..shared.config import load_config
-from ..shared.db import FileDB, VectorStore
+from ..shared.corpus import Corpus, get_corpus, list_corpora, open_corpus
+from ..shared.db import SearchFilters
 from ..shared.embedder import Embedder
-from ..shared.searcher import Searcher
-from ..shared.indexer import Indexer
+from ..shared.embedding_cache import EmbeddingCache
+from ..shared.query_batcher import QueryBatcher
+from ..shared.query_cache import QueryEmbeddingCache
+from ..shared.searcher import SEARCH_MODES
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,11 +30,9 @@ load_dotenv()
 
 # Global instances
 app_config = None
-file_db = None
-vector_store = None
+corpora: Dict[str, Corpus] = {}
 embedder = None
-searcher = None
-indexer = None
+executor = None
 logger = None
 
 
@@ -82,7 +85,7 @@ def initialize_components(docs_dir: Path, data_dir: Path):
         docs_dir: Documents directory
         data_dir: Data directory for persistence
     """
-    global app_config, file_db, vector_store, embedder, searcher, indexer
+    global app_config, corpora, embedder, executor
     
     logger.info(f"Initializing RAG server for docs_dir: {docs_dir}")
     
@@ -90,65 +93,101 @@ def initialize_components(docs_dir: Path, data_dir: Path):
     app_config = load_config(docs_dir=docs_dir)
     logger.debug("Configuration loaded")
     
-    # Initialize database
-    db_path = data_dir / "files.db"
-    file_db = FileDB(db_path)
-    logger.debug(f"FileDB initialized: {db_path}")
-    
-    # Initialize vector store
-    chroma_dir = data_dir / "chroma"
-    vector_store = VectorStore(chroma_dir, app_config.chromadb)
-    logger.debug(f"VectorStore initialized: {chroma_dir}")
-    
-    # Initialize embedder
-    embedder = Embedder(app_config.embedding, app_config.retry)
+    # Initialize embedder (shared by all corpora)
+    embedding_cache = None
+    if app_config.embedding.cache_enabled:
+        cache_path = data_dir / "embedding_cache.db"
+        embedding_cache = EmbeddingCache(cache_path, app_config.embedding.cache_max_entries)
+        logger.debug(f"EmbeddingCache initialized: {cache_path}")
+    embedder = Embedder(app_config.embedding, app_config.retry, embedding_cache)
     logger.debug("Embedder initialized")
     
-    # Initialize searcher
-    searcher = Searcher(embedder, vector_store)
-    logger.debug("Searcher initialized")
-    
-    # Initialize indexer
-    indexer = Indexer(
-        docs_dir,
-        file_db,
-        vector_store,
-        embedder,
-        app_config.scanner,
-        app_config.chunker
+    # Bounded executor for blocking ChromaDB/SQLite work
+    executor = ThreadPoolExecutor(
+        max_workers=app_config.concurrency.max_workers,
+        thread_name_prefix="rag-worker"
     )
-    logger.debug("Indexer initialized")
+
+    # Initialize query embedding cache
+    query_cache = None
+    if app_config.search.query_cache_size > 0:
+        query_cache = QueryEmbeddingCache(
+            app_config.search.query_cache_size,
+            app_config.search.query_cache_ttl,
+            data_dir / "query_cache.db" if app_config.search.query_cache_persist else None,
+            app_config.embedding.task_type_query
+        )
+        logger.debug("QueryEmbeddingCache initialized")
+
+    # Initialize query batcher
+    query_batcher = None
+    if app_config.search.query_batching:
+        query_batcher = QueryBatcher(
+            embedder,
+            app_config.search.query_batch_max_wait_ms,
+            app_config.search.query_batch_max_size
+        )
+
+    # Initialize the index, searcher and indexer of every corpus
+    corpora = {
+        name: open_corpus(
+            name, corpus_docs_dir, corpus_data_dir,
+            embedder, executor, query_cache, query_batcher
+        )
+        for name, corpus_docs_dir, corpus_data_dir in list_corpora(docs_dir, data_dir, app_config)
+    }
+    logger.debug(f"Corpora initialized: {', '.join(corpora)}")
     
     logger.info("All components initialized successfully")
 
 
-async def handle_search(query: str, top_k: int = None) -> Dict[str, Any]:
+async def handle_search(
+    query: str,
+    top_k: int = None,
+    search_ef: int = None,
+    corpus: Optional[str] = None,
+    filters: Optional[SearchFilters] = None,
+    mode: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Handle search request.
     
     Args:
         query: Search query
         top_k: Number of results to return
+        search_ef: HNSW search breadth (None = configured hnsw_search_ef)
+        corpus: Corpus to search (None = the --docs-dir corpus)
+        filters: Restrict results by path, extension or heading
+        mode: "vector", "hybrid" or "lexical" (None = configured search.mode)
         
     Returns:
         Search results dictionary
     """
     if top_k is None:
         top_k = app_config.search.default_top_k
+    selected = get_corpus(corpora, corpus)
     
-    logger.info(f"Search request: query='{query}', top_k={top_k}")
+    logger.info(
+        f"Search request: query='{query}', top_k={top_k}, search_ef={search_ef}, "
+        f"corpus={selected.name}, filters={filters}, mode={mode}"
+    )
     
+    loop = asyncio.get_running_loop()
+
     # Check if index is empty, auto-reindex if needed
-    if vector_store.count() == 0:
+    if await loop.run_in_executor(executor, selected.vector_store.count) == 0:
         logger.info("Index is empty, performing initial indexing...")
-        await handle_reindex()
+        await handle_reindex(selected.name)
     
     # Perform search with timing
     with timer("search_total"):
         with timer("query_embedding"):
-            results = searcher.search(query, top_k)
+            results = await selected.searcher.search_async(
+                query, top_k, search_ef=search_ef, filters=filters, mode=mode
+            )
         
         logger.debug(f"Search returned {len(results)} results")
+        logger.debug(f"Query cache stats: {selected.searcher.get_stats()}")
         
         # Log results in debug mode
         for i, result in enumerate(results, 1):
@@ -169,22 +208,27 @@ async def handle_search(query: str, top_k: int = None) -> Dict[str, Any]:
             }
             for r in results
         ],
-        "total_chunks": vector_store.count(),
-        "query": query
+        "total_chunks": await loop.run_in_executor(executor, selected.vector_store.count),
+        "query": query,
+        "corpus": selected.name
     }
 
 
-async def handle_reindex() -> Dict[str, Any]:
+async def handle_reindex(corpus: Optional[str] = None) -> Dict[str, Any]:
     """
     Handle reindex request.
 
+    Args:
+        corpus: Corpus to reindex (None = the --docs-dir corpus)
+
     Returns:
         Reindex summary dictionary
     """
-    logger.info("Reindex request received")
+    selected = get_corpus(corpora, corpus)
+    logger.info(f"Reindex request received: corpus={selected.name}")
 
     with timer("reindex_total"):
-        summary = indexer.update()
+        summary = await selected.indexer.update_async()
 
     # Format response
     return {
@@ -193,7 +237,9 @@ async def handle_reindex() -> Dict[str, Any]:
         "deleted": summary.deleted,
         "unchanged": summary.unchanged,
         "total_chunks": summary.total_chunks,
-        "api_call_count": summary.api_call_count
+        "api_call_count": summary.api_call_count,
+        "cache_hits": summary.cache_hits,
+        "cache_misses": summary.cache_misses
     }
 
 
@@ -209,6 +255,12 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
         MCP Server instance
     """
     server = Server("local-rag")
+
+    corpus_schema = {
+        "type": "string",
+        "enum": list(corpora),
+        "description": f"Corpus to use (default: {next(iter(corpora))})"
+    }
     
     @server.list_tools()
     async def list_tools() -> list[types.Tool]:
@@ -216,7 +268,7 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
         return [
             types.Tool(
                 name="search",
-                description="Search local documents using semantic search",
+                description="Search local documents using semantic, full-text or hybrid search",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -228,6 +280,40 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
                             "type": "integer",
                             "description": "Number of results to return (default: 5)",
                             "default": 5
+                        },
+                        "search_ef": {
+                            "type": "integer",
+                            "description": (
+                                "HNSW search breadth; raise (e.g. 200-500) for higher "
+                                "recall at the cost of latency (default: configured value)"
+                            )
+                        },
+                        "corpus": corpus_schema,
+                        "path_prefix": {
+                            "type": "string",
+                            "description": "Only search files under this path prefix (e.g. docs/runbooks/)"
+                        },
+                        "path_glob": {
+                            "type": "string",
+                            "description": "Only search files matching this glob; * also matches / (e.g. docs/*/setup*.md)"
+                        },
+                        "extensions": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Only search files with these extensions (e.g. [\".md\"])"
+                        },
+                        "heading": {
+                            "type": "string",
+                            "description": "Only search chunks whose heading contains this text (case-insensitive)"
+                        },
+                        "mode": {
+                            "type": "string",
+                            "enum": list(SEARCH_MODES),
+                            "description": (
+                                "vector = embeddings, lexical = BM25 full-text (exact terms, "
+                                "identifiers; no embedding API call), hybrid = both fused "
+                                "by rank (default: configured value)"
+                            )
                         }
                     },
                     "required": ["query"]
@@ -238,7 +324,9 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
                 description="Rebuild document index (differential update)",
                 inputSchema={
                     "type": "object",
-                    "properties": {}
+                    "properties": {
+                        "corpus": corpus_schema
+                    }
                 }
             )
         ]
@@ -250,15 +338,27 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
             if name == "search":
                 query = arguments.get("query")
                 top_k = arguments.get("top_k")
+                search_ef = arguments.get("search_ef")
+                corpus = arguments.get("corpus")
+                filters = SearchFilters(
+                    path_prefix=arguments.get("path_prefix") or "",
+                    path_glob=arguments.get("path_glob") or "",
+                    extensions=arguments.get("extensions") or [],
+                    heading=arguments.get("heading") or ""
+                )
                 
                 if not query:
                     raise ValueError("query parameter is required")
                 
-                result = await handle_search(query, top_k)
+                result = await handle_search(
+                    query, top_k, search_ef, corpus, filters, arguments.get("mode")
+                )
                 
                 # Format results as text
                 text_parts = [f"Found {len(result['results'])} results for query: '{query}'\n"]
-                text_parts.append(f"Total chunks in index: {result['total_chunks']}\n\n")
+                text_parts.append(
+                    f"Total chunks in index '{result['corpus']}': {result['total_chunks']}\n\n"
+                )
                 
                 for i, r in enumerate(result['results'], 1):
                     text_parts.append(f"--- Result {i} (score: {r['score']:.3f}) ---\n")
@@ -273,7 +373,7 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
                 )]
             
             elif name == "reindex":
-                result = await handle_reindex()
+                result = await handle_reindex(arguments.get("corpus"))
 
                 text = (
                     f"Index update complete:\n"
@@ -283,6 +383,8 @@ def create_server(docs_dir: Path, data_dir: Path) -> Server:
                     f"  Unchanged: {result['unchanged']}\n"
                     f"  Total chunks: {result['total_chunks']}\n"
                     f"  API calls: {result['api_call_count']}\n"
+                    f"  Cache hits: {result['cache_hits']}\n"
+                    f"  Cache misses: {result['cache_misses']}\n"
                 )
 
                 return [types.TextContent(
@@ -355,7 +457,6 @@ def main():
     
     args = parser.parse_args()
     
-    import asyncio
     asyncio.run(main_async(args))
 
 
@@ -8,12 +8,23 @@ import yaml
 
 @dataclass
 class EmbeddingConfig:
-    """Gemini Embedding API configuration."""
+    """Embedding configuration (Gemini API or local backends)."""
+    backend: str = "gemini"
     model: str = "gemini-embedding-001"
+    base_url: str = ""
     output_dimensionality: int = 768
     batch_size: int = 100
+    max_batch_chars: int = 50000
     task_type_document: str = "RETRIEVAL_DOCUMENT"
     task_type_query: str = "RETRIEVAL_QUERY"
+    cache_enabled: bool = True
+    cache_max_entries: int = 200000
+    max_concurrent_requests: int = 4
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    local_model: str = "intfloat/multilingual-e5-small"
+    local_query_prefix: str = "query: "
+    local_document_prefix: str = "passage: "
 
 
 @dataclass
@@ -34,10 +45,31 @@ class ChromaDBConfig:
     hnsw_M: int = 16
 
 
+@dataclass
+class VectorStoreConfig:
+    """Vector store backend configuration."""
+    backend: str = "chroma"
+    shards: int = 1
+    shard_by: str = "directory"
+    quantization: str = "none"
+    coarse_dims: int = 0
+    rescore_factor: int = 10
+    ivf_lists: int = 0
+    ivf_probes: int = 16
+    ivf_recluster_growth: float = 2.0
+
+
 @dataclass
 class SearchConfig:
     """Search configuration."""
     default_top_k: int = 5
+    mode: str = "vector"
+    query_cache_size: int = 1024
+    query_cache_ttl: float = 0.0
+    query_cache_persist: bool = False
+    query_batching: bool = True
+    query_batch_max_wait_ms: float = 5.0
+    query_batch_max_size: int = 32
 
 
 @dataclass
@@ -57,6 +89,20 @@ class ScannerConfig:
     ])
 
 
+@dataclass
+class ConcurrencyConfig:
+    """Concurrency configuration for async entry points."""
+    max_workers: int = 8
+
+
+@dataclass
+class CorpusConfig:
+    """Additional corpus served next to the main documents directory."""
+    name: str
+    docs_dir: str
+    data_dir: str = ""
+
+
 @dataclass
 class AppConfig:
     """Application configuration."""
@@ -66,6 +112,9 @@ class AppConfig:
     search: SearchConfig
     retry: RetryConfig
     scanner: ScannerConfig
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    vector_store: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    corpora: list[CorpusConfig] = field(default_factory=list)
 
 
 def load_config(config_path: Optional[Path] = None, docs_dir: Optional[Path] = None) -> AppConfig:
@@ -143,12 +192,27 @@ def load_config(config_path: Optional[Path] = None, docs_dir: Optional[Path] = N
         scanner_cfg.file_extensions = config_dict['scanner']['file_extensions']
     if 'exclude_dirs' in config_dict.get('scanner', {}):
         scanner_cfg.exclude_dirs = config_dict['scanner']['exclude_dirs']
-    
+
+    concurrency_cfg = ConcurrencyConfig(
+        **config_dict.get('concurrency', {})
+    )
+
+    vector_store_cfg = VectorStoreConfig(
+        **config_dict.get('vector_store', {})
+    )
+
+    corpora_cfg = [
+        CorpusConfig(**corpus) for corpus in config_dict.get('corpora') or []
+    ]
+
     return AppConfig(
         embedding=embedding_cfg,
         chunker=chunker_cfg,
         chromadb=chromadb_cfg,
         search=search_cfg,
         retry=retry_cfg,
-        scanner=scanner_cfg
+        scanner=scanner_cfg,
+        concurrency=concurrency_cfg,
+        vector_store=vector_store_cfg,
+        corpora=corpora_cfg
     )
@@ -0,0 +1,154 @@
+"""Named document corpora served by one process."""
+
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import AppConfig, load_config
+from .db import BaseVectorStore, FileDB, create_vector_store
+from .embedder import Embedder
+from .indexer import Indexer
+from .query_batcher import QueryBatcher
+from .query_cache import QueryEmbeddingCache
+from .searcher import Searcher
+
+
+logger = logging.getLogger(__name__)
+
+# Name of the corpus in the main documents directory
+DEFAULT_CORPUS = "default"
+
+
+@dataclass
+class Corpus:
+    """One documents directory with its own index, searcher and indexer."""
+    name: str
+    docs_dir: Path
+    data_dir: Path
+    file_db: FileDB
+    vector_store: BaseVectorStore
+    searcher: Searcher
+    indexer: Indexer
+
+    def close(self):
+        """Close the index databases."""
+        self.vector_store.close()
+        self.file_db.close()
+
+
+def list_corpora(docs_dir: Path, data_dir: Path, app_config: AppConfig) -> List[Tuple[str, Path, Path]]:
+    """
+    List the corpora to serve: the main documents directory and config.corpora.
+
+    Args:
+        docs_dir: Main documents directory
+        data_dir: Data directory of the main documents directory
+        app_config: Configuration of the main documents directory
+
+    Returns:
+        (name, docs_dir, data_dir) per corpus, the default corpus first
+
+    Raises:
+        ValueError: If a corpus name is empty or used twice
+    """
+    corpora = [(DEFAULT_CORPUS, docs_dir, data_dir)]
+    names = {DEFAULT_CORPUS}
+    for corpus in app_config.corpora:
+        if not corpus.name or corpus.name in names:
+            raise ValueError(f"Corpus names must be unique and non-empty: '{corpus.name}'")
+        names.add(corpus.name)
+
+        # Relative paths are relative to the main documents directory
+        corpus_docs_dir = (docs_dir / corpus.docs_dir).resolve()
+        if corpus.data_dir:
+            corpus_data_dir = (docs_dir / corpus.data_dir).resolve()
+        else:
+            corpus_data_dir = corpus_docs_dir / ".rag-index"
+        corpora.append((corpus.name, corpus_docs_dir, corpus_data_dir))
+    return corpora
+
+
+def open_corpus(
+    name: str,
+    docs_dir: Path,
+    data_dir: Path,
+    embedder: Embedder,
+    executor: Optional[Executor] = None,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    query_batcher: Optional[QueryBatcher] = None
+) -> Corpus:
+    """
+    Open the index of a corpus on top of shared embedding components.
+
+    Chunking, scanning and vector store settings come from the corpus's own
+    config.yaml; the embedder, query cache and batcher are shared, so every
+    corpus must be indexed with the shared embedding model.
+
+    Args:
+        name: Corpus name
+        docs_dir: Documents directory
+        data_dir: Data directory for persistence
+        embedder: Shared Embedder instance
+        executor: Shared executor for blocking work
+        query_cache: Shared query embedding cache
+        query_batcher: Shared query batcher
+
+    Returns:
+        Corpus instance
+    """
+    config = load_config(docs_dir=docs_dir)
+    if (config.embedding.model, config.embedding.output_dimensionality) != (
+        embedder.embedding_config.model, embedder.embedding_config.output_dimensionality
+    ):
+        logger.warning(
+            f"Corpus '{name}' configures embedding model {config.embedding.model} "
+            f"({config.embedding.output_dimensionality} dims); using the shared "
+            f"{embedder.embedding_config.model} "
+            f"({embedder.embedding_config.output_dimensionality} dims)"
+        )
+
+    file_db = FileDB(data_dir / "files.db")
+    vector_store = create_vector_store(data_dir, config.vector_store, config.chromadb)
+    searcher = Searcher(
+        embedder, vector_store, executor, query_cache, query_batcher, file_db,
+        mode=config.search.mode
+    )
+    indexer = Indexer(
+        docs_dir, file_db, vector_store, embedder,
+        config.scanner, config.chunker, executor
+    )
+    logger.info(f"Corpus '{name}' opened: {docs_dir}")
+
+    return Corpus(
+        name=name,
+        docs_dir=docs_dir,
+        data_dir=data_dir,
+        file_db=file_db,
+        vector_store=vector_store,
+        searcher=searcher,
+        indexer=indexer
+    )
+
+
+def get_corpus(corpora: Dict[str, Corpus], name: Optional[str] = None) -> Corpus:
+    """
+    Look a corpus up by name.
+
+    Args:
+        corpora: Corpora by name
+        name: Corpus name (None = the default corpus)
+
+    Returns:
+        Corpus instance
+
+    Raises:
+        KeyError: If no corpus has that name
+    """
+    corpus = corpora.get(name or DEFAULT_CORPUS)
+    if corpus is None:
+        raise KeyError(
+            f"Unknown corpus: {name} (available: {', '.join(corpora)})"
+        )
+    return corpus
@@ -1,18 +1,48 @@
 """Database layer for file metadata and vector storage."""
 
 import sqlite3
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import chromadb
+from chromadb.types import SegmentScope
+import numpy as np
 
-from .config import ChromaDBConfig
+from .config import ChromaDBConfig, VectorStoreConfig
 from .chunker import Chunk
+from .lexical import build_match_query, ngram_text
 
 
 logger = logging.getLogger(__name__)
 
+# HNSW settings that are fixed once the index is built
+_IMMUTABLE_HNSW_KEYS = ("hnsw:space", "hnsw:construction_ef", "hnsw:M")
+# ChromaDB's values for collections created without HNSW metadata
+_CHROMA_DEFAULTS = {"hnsw:space": "l2", "hnsw:construction_ef": 100, "hnsw:M": 16}
+_CHROMA_DEFAULT_SEARCH_EF = 10
+# Chunks copied per request when migrating a collection
+_MIGRATION_BATCH = 1000
+# File paths per filtered delete (bounded by SQLite's bound parameter limit)
+_DELETE_BATCH = 500
+# FileDB connection tuning
+_SQLITE_BUSY_TIMEOUT = 30.0  # seconds to wait for another process's write lock
+_SQLITE_CACHE_KIB = 16384
+# Hex digits of the content hash used in chunk IDs
+_CHUNK_ID_HASH_CHARS = 16
+# Sorts after every string starting with a given prefix
+_PREFIX_UPPER_BOUND = "\U0010ffff"
+# BM25 weights of the indexed heading and content columns of chunks_fts
+_BM25_WEIGHTS = (2.0, 1.0)
+# Shard suffix written by create_vector_store: {shard_by}{shards}-{index}
+_SHARD_NAME_PATTERN = r"(?:directory|hash)\d+-\d+"
+
 
 @dataclass
 class FileRecord:
@@ -22,6 +52,29 @@ class FileRecord:
     mtime: float
 
 
+def chunk_content_hash(chunk: Chunk) -> str:
+    """
+    Compute the content hash of a chunk.
+
+    Args:
+        chunk: Chunk
+
+    Returns:
+        SHA256 hash of heading and content as hex string
+    """
+    data = f"{chunk.heading}\0{chunk.content}".encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class ChunkRecord:
+    """Stored chunk of an indexed file."""
+    chunk_index: int
+    chunk_id: str
+    content_hash: str
+    heading: str = ""
+
+
 @dataclass
 class QueryResult:
     """Vector search result."""
@@ -32,8 +85,81 @@ class QueryResult:
     chunk_index: int
 
 
+@dataclass
+class SearchFilters:
+    """
+    Restrictions on the chunks a search may return.
+
+    Paths may use / or \\ as separator. path_glob uses SQLite GLOB syntax,
+    where * also matches path separators (e.g. "docs/runbooks/*.md").
+    heading is a case-insensitive substring of the chunk heading.
+    """
+    path_prefix: str = ""
+    path_glob: str = ""
+    extensions: List[str] = field(default_factory=list)
+    heading: str = ""
+
+    def is_empty(self) -> bool:
+        """Whether no restriction is set."""
+        return not (self.path_prefix or self.path_glob or self.extensions or self.heading)
+
+
+@dataclass
+class MetadataFilter:
+    """
+    Metadata values query results must match, resolved from SearchFilters.
+
+    None leaves a field unrestricted; an empty list matches nothing.
+    """
+    file_paths: Optional[List[str]] = None
+    headings: Optional[List[str]] = None
+
+    def matches_nothing(self) -> bool:
+        """Whether no chunk can pass the filter."""
+        return self.file_paths == [] or self.headings == []
+
+
+def _native_path(path: str) -> str:
+    """
+    Convert a filter path to the separator used by stored paths.
+
+    Args:
+        path: Path with / or \\ separators
+
+    Returns:
+        Path with os.sep separators
+    """
+    return path.replace("\\", "/").removeprefix("./").replace("/", os.sep)
+
+
+def distance_to_score(distance: float, space: str) -> float:
+    """
+    Convert a ChromaDB distance to a similarity score in [0, 1].
+
+    Args:
+        distance: Distance returned by the collection
+        space: Distance function (cosine / l2 / ip)
+
+    Returns:
+        Similarity score (higher is more similar)
+    """
+    if space == "l2":
+        # Squared L2 distance; equals 2 - 2 * cosine for unit vectors
+        similarity = 1.0 - distance / 2.0
+    else:
+        # cosine: 1 - cos, ip: 1 - dot
+        similarity = 1.0 - distance
+    return min(1.0, max(0.0, similarity))
+
+
 class FileDB:
-    """SQLite database for file metadata management."""
+    """
+    SQLite database for file metadata management.
+
+    Runs in WAL mode so readers never block the indexing writer. Each thread
+    gets its own connections: a read-write one, whose writes are serialized
+    by _write_lock, and a read-only one used by scans and status queries.
+    """
     
     def __init__(self, db_path: Path):
         """
@@ -45,22 +171,112 @@ class FileDB:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        self.conn = sqlite3.connect(str(db_path))
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        # Every connection opened by any thread, closed together by close()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._writer()
+        # WAL is persistent, so setting it once per database file is enough
+        conn.execute("PRAGMA journal_mode=WAL")
         self._create_tables()
+
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        """
+        Open a tuned connection for the current thread.
+
+        Args:
+            read_only: Open with mode=ro so the connection can never write
+
+        Returns:
+            SQLite connection
+        """
+        # Used by a single thread; check_same_thread=False only lets close()
+        # run from another thread
+        if read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                timeout=_SQLITE_BUSY_TIMEOUT,
+                check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=_SQLITE_BUSY_TIMEOUT,
+                check_same_thread=False
+            )
+
+        # Durable at checkpoints; commits no longer fsync in WAL mode
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{_SQLITE_CACHE_KIB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _writer(self) -> sqlite3.Connection:
+        """
+        Get the current thread's read-write connection.
+
+        Returns:
+            SQLite connection
+        """
+        conn = getattr(self._local, "writer", None)
+        if conn is None:
+            conn = self._local.writer = self._open(read_only=False)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """
+        Get the current thread's read-only connection.
+
+        Returns:
+            SQLite connection
+        """
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            conn = self._local.reader = self._open(read_only=True)
+        return conn
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS files (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                path TEXT UNIQUE NOT NULL,
-                hash TEXT NOT NULL,
-                mtime REAL NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        self.conn.commit()
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS files (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        path TEXT UNIQUE NOT NULL,
+                        hash TEXT NOT NULL,
+                        mtime REAL NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS chunks (
+                        file_path TEXT NOT NULL,
+                        chunk_index INTEGER NOT NULL,
+                        chunk_id TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        heading TEXT NOT NULL DEFAULT '',
+                        PRIMARY KEY (file_path, chunk_index)
+                    )
+                """)
+                # Full-text index of the chunk texts, tokenized by ngram_text
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                        heading_tokens,
+                        content_tokens,
+                        file_path UNINDEXED,
+                        chunk_index UNINDEXED,
+                        heading UNINDEXED,
+                        content UNINDEXED,
+                        tokenize = 'unicode61'
+                    )
+                """)
     
     def get_all_files(self) -> Dict[str, FileRecord]:
         """
@@ -69,11 +285,10 @@ class FileDB:
         Returns:
             Dictionary mapping file path to FileRecord
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT path, hash, mtime FROM files")
-        
+        rows = self._reader().execute("SELECT path, hash, mtime FROM files").fetchall()
+
         records = {}
-        for row in cursor.fetchall():
+        for row in rows:
             records[row[0]] = FileRecord(
                 path=row[0],
                 hash=row[1],
@@ -81,6 +296,130 @@ class FileDB:
             )
         
         return records
+
+    def get_chunks(self, path: str) -> List[ChunkRecord]:
+        """
+        Get the stored chunks of a file.
+
+        Args:
+            path: Relative file path
+
+        Returns:
+            ChunkRecord objects ordered by chunk_index (empty if the file was
+            indexed before chunks were tracked)
+        """
+        rows = self._reader().execute("""
+            SELECT chunk_index, chunk_id, content_hash, heading FROM chunks
+            WHERE file_path = ? ORDER BY chunk_index
+        """, (path,)).fetchall()
+        return [ChunkRecord(*row) for row in rows]
+
+    def resolve_filters(self, filters: SearchFilters) -> MetadataFilter:
+        """
+        Resolve search filters to the file paths and headings they match.
+
+        The files table serves as the path index: prefixes are range scans
+        on its path index, so directory-scoped searches stay cheap.
+
+        Args:
+            filters: Search filters
+
+        Returns:
+            MetadataFilter for the vector store
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if filters.path_prefix:
+            prefix = _native_path(filters.path_prefix)
+            conditions.append("path >= ? AND path < ?")
+            params.extend([prefix, prefix + _PREFIX_UPPER_BOUND])
+        if filters.path_glob:
+            conditions.append("path GLOB ?")
+            params.append(_native_path(filters.path_glob))
+        if filters.extensions:
+            extensions = [
+                ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+                for ext in filters.extensions
+            ]
+            conditions.append(
+                "(" + " OR ".join("lower(substr(path, -?)) = ?" for _ in extensions) + ")"
+            )
+            for ext in extensions:
+                params.extend([len(ext), ext])
+
+        conn = self._reader()
+        path_sql = "SELECT path FROM files WHERE " + " AND ".join(conditions)
+        file_paths = None
+        if conditions:
+            file_paths = [row[0] for row in conn.execute(path_sql, params)]
+
+        headings = None
+        if filters.heading and file_paths != []:
+            heading_sql = "SELECT DISTINCT heading FROM chunks WHERE instr(lower(heading), lower(?)) > 0"
+            heading_params: List[Any] = [filters.heading]
+            if conditions:
+                heading_sql += f" AND file_path IN ({path_sql})"
+                heading_params.extend(params)
+            headings = [row[0] for row in conn.execute(heading_sql, heading_params)]
+
+        return MetadataFilter(file_paths=file_paths, headings=headings)
+
+    def count_files(self) -> int:
+        """
+        Get number of indexed files.
+
+        Returns:
+            Number of file records
+        """
+        return self._reader().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def has_texts(self) -> bool:
+        """
+        Check whether the full-text index holds any chunk.
+
+        Returns:
+            False for an empty index, e.g. one built before it was maintained
+        """
+        return self._reader().execute("SELECT 1 FROM chunks_fts LIMIT 1").fetchone() is not None
+
+    def search_text(
+        self,
+        query: str,
+        top_k: int,
+        where: Optional[MetadataFilter] = None
+    ) -> List[QueryResult]:
+        """
+        Rank chunks by BM25 against the query.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            where: Only return chunks matching this filter
+
+        Returns:
+            List of QueryResult objects, best first; distance is the BM25
+            rank (negative, lower is better)
+        """
+        match = build_match_query(query)
+        if not match or top_k <= 0 or (where is not None and where.matches_nothing()):
+            return []
+
+        sql = f"""
+            SELECT file_path, content, heading, bm25(chunks_fts, {_BM25_WEIGHTS[0]}, {_BM25_WEIGHTS[1]}) AS rank,
+                   chunk_index
+            FROM chunks_fts WHERE chunks_fts MATCH ?
+        """
+        params: List[Any] = [match]
+        if where is not None and where.file_paths is not None:
+            sql += " AND file_path IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(where.file_paths))
+        if where is not None and where.headings is not None:
+            sql += " AND heading IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(where.headings))
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(top_k)
+
+        return [QueryResult(*row) for row in self._reader().execute(sql, params)]
     
     def upsert_file(self, path: str, hash: str, mtime: float):
         """
@@ -91,17 +430,94 @@ class FileDB:
             hash: SHA256 hash
             mtime: Modification time
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO files (path, hash, mtime, updated_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(path) DO UPDATE SET
-                hash = excluded.hash,
-                mtime = excluded.mtime,
-                updated_at = CURRENT_TIMESTAMP
-        """, (path, hash, mtime))
-        self.conn.commit()
+        self.upsert_files([FileRecord(path=path, hash=hash, mtime=mtime)])
+
+    def upsert_files(
+        self,
+        records: List[FileRecord],
+        chunks: Optional[Dict[str, List[ChunkRecord]]] = None,
+        texts: Optional[Dict[str, List[Chunk]]] = None
+    ):
+        """
+        Insert or update many file records in one transaction.
+
+        Args:
+            records: File records
+            chunks: New chunk lists by file path, replacing the stored ones
+            texts: Complete chunk lists by file path, replacing their rows in
+                the full-text index
+        """
+        if not records:
+            return
+
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                if chunks:
+                    conn.executemany(
+                        "DELETE FROM chunks WHERE file_path = ?",
+                        [(path,) for path in chunks]
+                    )
+                    conn.executemany("""
+                        INSERT INTO chunks (file_path, chunk_index, chunk_id, content_hash, heading)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, [
+                        (path, c.chunk_index, c.chunk_id, c.content_hash, c.heading)
+                        for path, file_chunks in chunks.items()
+                        for c in file_chunks
+                    ])
+                if texts:
+                    self._write_texts(conn, texts)
+                conn.executemany("""
+                    INSERT INTO files (path, hash, mtime, updated_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(path) DO UPDATE SET
+                        hash = excluded.hash,
+                        mtime = excluded.mtime,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [(r.path, r.hash, r.mtime) for r in records])
     
+    def replace_texts(self, texts: Dict[str, List[Chunk]]):
+        """
+        Replace the full-text index rows of files, leaving their records as is.
+
+        Args:
+            texts: Complete chunk lists by file path
+        """
+        if not texts:
+            return
+
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                self._write_texts(conn, texts)
+
+    @staticmethod
+    def _write_texts(conn: sqlite3.Connection, texts: Dict[str, List[Chunk]]):
+        """
+        Replace full-text index rows inside the caller's transaction.
+
+        Args:
+            conn: Read-write connection
+            texts: Complete chunk lists by file path
+        """
+        conn.executemany(
+            "DELETE FROM chunks_fts WHERE file_path = ?",
+            [(path,) for path in texts]
+        )
+        conn.executemany("""
+            INSERT INTO chunks_fts (
+                heading_tokens, content_tokens, file_path, chunk_index, heading, content
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                ngram_text(c.heading), ngram_text(c.content),
+                path, c.chunk_index, c.heading, c.content
+            )
+            for path, file_chunks in texts.items()
+            for c in file_chunks
+        ])
+
     def delete_file(self, path: str):
         """
         Delete file record.
@@ -109,16 +525,187 @@ class FileDB:
         Args:
             path: Relative file path
         """
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM files WHERE path = ?", (path,))
-        self.conn.commit()
+        self.delete_files([path])
+
+    def delete_files(self, paths: List[str]):
+        """
+        Delete many file records in one transaction.
+
+        Args:
+            paths: Relative file paths
+        """
+        if not paths:
+            return
+
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                conn.executemany(
+                    "DELETE FROM files WHERE path = ?", [(path,) for path in paths]
+                )
+                conn.executemany(
+                    "DELETE FROM chunks WHERE file_path = ?", [(path,) for path in paths]
+                )
+                conn.executemany(
+                    "DELETE FROM chunks_fts WHERE file_path = ?", [(path,) for path in paths]
+                )
     
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Close the connections of every thread."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+
+class BaseVectorStore(ABC):
+    """Interface for vector stores holding document chunks."""
+
+    @property
+    @abstractmethod
+    def space(self) -> str:
+        """Distance function of the stored vectors (cosine / l2 / ip)."""
+
+    @staticmethod
+    def make_chunk_ids(file_path: str, chunks: List[Chunk]) -> List[str]:
+        """
+        Build the vector store IDs of the chunks of a file.
+
+        IDs are derived from the file path and the chunk's heading and content,
+        so a chunk keeps its ID when sections are inserted or removed around
+        it. Identical chunks within a file get "~1", "~2", ... suffixes in
+        order of appearance.
+
+        Args:
+            file_path: Relative file path
+            chunks: Complete chunk list of the file
+
+        Returns:
+            Chunk IDs aligned with chunks
+        """
+        ids = []
+        seen: Dict[str, int] = {}
+        for chunk in chunks:
+            chunk_id = f"{file_path}::{chunk_content_hash(chunk)[:_CHUNK_ID_HASH_CHARS]}"
+            count = seen.get(chunk_id, 0)
+            seen[chunk_id] = count + 1
+            ids.append(f"{chunk_id}~{count}" if count else chunk_id)
+        return ids
+
+    def add_chunks(
+        self,
+        file_path: str,
+        chunks: List[Chunk],
+        embeddings: np.ndarray
+    ):
+        """
+        Add chunks with embeddings to the store.
+
+        Args:
+            file_path: Relative file path
+            chunks: List of Chunk objects
+            embeddings: float32 array with one row per chunk
+        """
+        self.add_chunks_bulk([(file_path, chunks, embeddings)])
+
+    @abstractmethod
+    def add_chunks_bulk(
+        self,
+        files: List[Tuple[str, List[Chunk], np.ndarray]],
+        chunk_ids: Optional[List[List[str]]] = None
+    ):
+        """
+        Add the chunks of many files. Chunks whose ID already exists are overwritten.
+
+        Args:
+            files: (file path, chunks, embeddings) per file; embeddings is a
+                float32 array with one row per chunk
+            chunk_ids: IDs of the chunks per file (None = chunks are complete
+                chunk lists and IDs are built with make_chunk_ids)
+        """
+
+    def delete_by_file(self, file_path: str):
+        """
+        Delete all chunks for a specific file.
+
+        Args:
+            file_path: Relative file path
+        """
+        self.delete_by_files([file_path])
+
+    @abstractmethod
+    def delete_by_files(self, file_paths: List[str]):
+        """
+        Delete all chunks of many files.
+
+        Args:
+            file_paths: Relative file paths
+        """
+
+    @abstractmethod
+    def delete_ids(self, ids: List[str]):
+        """
+        Delete chunks by ID.
+
+        Args:
+            ids: Chunk IDs
+        """
+
+    @abstractmethod
+    def update_chunk_indices(self, indices: Dict[str, int]):
+        """
+        Record new positions of chunks whose content did not change.
+
+        Args:
+            indices: New chunk_index by chunk ID
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        search_ef: Optional[int] = None,
+        where: Optional[MetadataFilter] = None
+    ) -> List[QueryResult]:
+        """
+        Search for similar chunks.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            search_ef: Candidate list size for approximate indexes (ignored
+                by exact stores)
+            where: Only return chunks matching this filter
+
+        Returns:
+            List of QueryResult objects, nearest first
+        """
+
+    @abstractmethod
+    def get_all_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Read every stored chunk vector.
+
+        Returns:
+            Tuple of (chunk IDs, float32 array with one row per chunk)
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Get total number of chunks in the store.
+
+        Returns:
+            Number of chunks
+        """
+
+    @abstractmethod
+    def close(self):
+        """Release resources held by the store."""
 
 
-class VectorStore:
+class VectorStore(BaseVectorStore):
     """ChromaDB vector store for document chunks."""
     
     def __init__(self, persist_dir: Path, config: ChromaDBConfig):
@@ -138,80 +725,235 @@ class VectorStore:
         self.client = chromadb.PersistentClient(path=str(persist_dir))
         logger.debug("ChromaDB client initialized")
 
-        # Get or create collection (simplified metadata for ChromaDB 1.4.1)
         logger.debug(f"Getting or creating collection: {config.collection_name}")
-        self.collection = self.client.get_or_create_collection(
-            name=config.collection_name
+        self.collection = self._open_collection()
+        # search_ef baked into the HNSW index when it was loaded
+        self._index_search_ef = (self.collection.metadata or {}).get(
+            "hnsw:search_ef", _CHROMA_DEFAULT_SEARCH_EF
         )
         logger.debug(f"Collection ready: {config.collection_name}")
+
+    @property
+    def space(self) -> str:
+        """Distance function of the collection (cosine / l2 / ip)."""
+        return self.config.hnsw_space
+
+    def _hnsw_metadata(self) -> Dict[str, Any]:
+        """
+        Build the collection metadata holding the configured HNSW settings.
+
+        Returns:
+            ChromaDB collection metadata
+        """
+        return {
+            "hnsw:space": self.config.hnsw_space,
+            "hnsw:construction_ef": self.config.hnsw_construction_ef,
+            "hnsw:search_ef": self.config.hnsw_search_ef,
+            "hnsw:M": self.config.hnsw_M,
+        }
+
+    def _open_collection(self):
+        """
+        Open the collection, creating or migrating it to the configured HNSW settings.
+
+        space, construction_ef and M are fixed when an HNSW index is built, so
+        a collection created with different values (or none, as older versions
+        of this tool did) is copied into a new collection with the configured
+        settings. search_ef only affects queries, so a changed value is written
+        into the existing collection instead of forcing a migration.
+
+        Returns:
+            ChromaDB collection
+        """
+        name = self.config.collection_name
+        migrating_name = f"{name}-migrating"
+        metadata = self._hnsw_metadata()
+
+        existing = {collection.name for collection in self.client.list_collections()}
+
+        if name not in existing:
+            if migrating_name in existing:
+                # A previous migration finished copying but was interrupted
+                # before the rename
+                logger.warning(f"Resuming interrupted migration of collection: {name}")
+                collection = self.client.get_collection(migrating_name)
+                collection.modify(name=name)
+                return collection
+            return self.client.create_collection(name=name, metadata=metadata)
+
+        collection = self.client.get_collection(name)
+        current = collection.metadata or {}
+        wanted = {key: metadata[key] for key in _IMMUTABLE_HNSW_KEYS}
+        actual = {key: current.get(key, _CHROMA_DEFAULTS[key]) for key in _IMMUTABLE_HNSW_KEYS}
+        if actual == wanted:
+            if current.get("hnsw:search_ef", _CHROMA_DEFAULT_SEARCH_EF) != self.config.hnsw_search_ef:
+                self._apply_search_ef(collection)
+            return collection
+
+        logger.warning(f"Migrating collection {name} from HNSW settings {actual} to {wanted}")
+        if migrating_name in existing:
+            self.client.delete_collection(migrating_name)
+        target = self.client.create_collection(name=migrating_name, metadata=metadata)
+
+        total = collection.count()
+        for offset in range(0, total, _MIGRATION_BATCH):
+            page = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=_MIGRATION_BATCH,
+                offset=offset
+            )
+            if page["ids"]:
+                target.add(
+                    ids=page["ids"],
+                    embeddings=page["embeddings"],
+                    documents=page["documents"],
+                    metadatas=page["metadatas"]
+                )
+
+        self.client.delete_collection(name)
+        target.modify(name=name)
+        logger.info(f"Migrated {total} chunks to collection {name}")
+        return target
     
-    def add_chunks(
+    def _apply_search_ef(self, collection) -> None:
+        """
+        Write the configured search_ef into an existing collection.
+
+        Collection.modify rejects metadata carrying hnsw:space, and the HNSW
+        segment reads search_ef from its own metadata rather than the
+        collection's, so the collection, its vector segment and an index
+        this process already loaded are updated through the client internals
+        of the pinned ChromaDB 0.4.24.
+
+        Args:
+            collection: Collection whose HNSW settings are otherwise current
+        """
+        ef = self.config.hnsw_search_ef
+        logger.info(f"Updating search_ef of collection {collection.name} to {ef}")
+
+        server = self.client._server
+        metadata = {**(collection.metadata or {}), "hnsw:search_ef": ef}
+        server._modify(id=collection.id, new_metadata=metadata)
+        collection.metadata = metadata
+
+        for segment in server._sysdb.get_segments(collection=collection.id, scope=SegmentScope.VECTOR):
+            server._sysdb.update_segment(segment["id"], metadata={"hnsw:search_ef": ef})
+            # Drop the cached segment record so a reload sees the new metadata
+            server._manager.segment_cache[SegmentScope.VECTOR].pop(collection.id)
+            instance = server._manager._instances.get(segment["id"])
+            if instance is not None:
+                instance._params.search_ef = ef
+                if instance._index is not None:
+                    instance._index.set_ef(ef)
+
+    def add_chunks_bulk(
         self,
-        file_path: str,
-        chunks: List[Chunk],
-        embeddings: List[List[float]]
+        files: List[Tuple[str, List[Chunk], np.ndarray]],
+        chunk_ids: Optional[List[List[str]]] = None
     ):
         """
-        Add chunks with embeddings to the collection.
+        Add the chunks of many files, in as few calls as ChromaDB allows.
+
+        Chunks whose ID already exists are overwritten.
 
         Args:
-            file_path: Relative file path
-            chunks: List of Chunk objects
-            embeddings: List of embedding vectors
+            files: (file path, chunks, embeddings) per file; embeddings is a
+                float32 array with one row per chunk
+            chunk_ids: IDs of the chunks per file (None = chunks are complete
+                chunk lists and IDs are built with make_chunk_ids)
         """
-        if not chunks or not embeddings:
-            return
+        ids: List[str] = []
+        documents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        vectors: List[np.ndarray] = []
+
+        if chunk_ids is None:
+            chunk_ids = [self.make_chunk_ids(file_path, chunks) for file_path, chunks, _ in files]
 
-        if len(chunks) != len(embeddings):
-            raise ValueError(
-                f"Chunks and embeddings length mismatch: "
-                f"{len(chunks)} vs {len(embeddings)}"
+        for (file_path, chunks, embeddings), file_ids in zip(files, chunk_ids):
+            if not chunks or len(embeddings) == 0:
+                continue
+
+            if len(chunks) != len(embeddings):
+                raise ValueError(
+                    f"Chunks and embeddings length mismatch for {file_path}: "
+                    f"{len(chunks)} vs {len(embeddings)}"
+                )
+
+            ids.extend(file_ids)
+            documents.extend(chunk.content for chunk in chunks)
+            metadatas.extend(
+                {
+                    "file_path": file_path,
+                    "chunk_index": chunk.chunk_index,
+                    "chunk_id": chunk_id,
+                    "heading": chunk.heading
+                }
+                for chunk, chunk_id in zip(chunks, file_ids)
             )
+            vectors.append(np.asarray(embeddings, dtype=np.float32))
 
-        logger.debug(f"    Preparing {len(chunks)} chunks for ChromaDB...")
-        ids = [f"{file_path}::chunk_{chunk.chunk_index}" for chunk in chunks]
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [
-            {
-                "file_path": file_path,
-                "chunk_index": chunk.chunk_index,
-                "heading": chunk.heading
-            }
-            for chunk in chunks
-        ]
-
-        logger.debug(f"    Calling ChromaDB collection.add()...")
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas
-        )
-        logger.debug(f"    ChromaDB collection.add() completed")
+        if not ids:
+            return
+
+        all_vectors = np.concatenate(vectors)
+        batch_size = self.client.max_batch_size
+        logger.debug(f"    Adding {len(ids)} chunks from {len(files)} files to ChromaDB...")
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                embeddings=all_vectors[start:end],
+                metadatas=metadatas[start:end]
+            )
+        logger.debug(f"    ChromaDB add completed")
     
-    def delete_by_file(self, file_path: str):
+    def update_chunk_indices(self, indices: Dict[str, int]):
         """
-        Delete all chunks for a specific file.
-        
+        Record new positions of chunks whose content did not change.
+
         Args:
-            file_path: Relative file path
+            indices: New chunk_index by chunk ID
         """
-        # Get existing chunks for this file
-        try:
-            existing = self.collection.get(
-                where={"file_path": file_path}
+        ids = list(indices)
+        batch_size = self.client.max_batch_size
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            self.collection.update(
+                ids=batch,
+                metadatas=[{"chunk_index": indices[chunk_id]} for chunk_id in batch]
             )
-            
-            if existing and existing['ids']:
-                self.collection.delete(ids=existing['ids'])
-        except Exception:
-            # If no chunks exist, that's fine
-            pass
+
+    def delete_ids(self, ids: List[str]):
+        """
+        Delete chunks by ID.
+
+        Args:
+            ids: Chunk IDs
+        """
+        batch_size = self.client.max_batch_size
+        for start in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[start:start + batch_size])
+
+    def delete_by_files(self, file_paths: List[str]):
+        """
+        Delete all chunks of many files with one filtered delete per batch.
+
+        Args:
+            file_paths: Relative file paths
+        """
+        for start in range(0, len(file_paths), _DELETE_BATCH):
+            batch = file_paths[start:start + _DELETE_BATCH]
+            where = {"file_path": {"$in": batch}} if len(batch) > 1 else {"file_path": batch[0]}
+            self.collection.delete(where=where)
     
     def query(
         self, 
-        query_embedding: List[float], 
-        top_k: int
+        query_embedding: np.ndarray, 
+        top_k: int,
+        search_ef: Optional[int] = None,
+        where: Optional[MetadataFilter] = None
     ) -> List[QueryResult]:
         """
         Search for similar chunks.
@@ -219,20 +961,35 @@ class VectorStore:
         Args:
             query_embedding: Query vector
             top_k: Number of results to return
+            search_ef: HNSW candidate list size for this query
+                (default: ChromaDBConfig.hnsw_search_ef)
+            where: Only return chunks matching this filter (pushed down as
+                a ChromaDB metadata filter)
             
         Returns:
             List of QueryResult objects
         """
+        if where is not None and where.matches_nothing():
+            return []
+
+        # ChromaDB has no per-query ef, but hnswlib searches with
+        # max(ef, n_results): asking for more results widens the search
+        ef = search_ef or self.config.hnsw_search_ef
+        n_results = top_k
+        if ef > max(top_k, self._index_search_ef):
+            n_results = min(ef, max(top_k, self.collection.count()))
+
         results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
+            query_embeddings=np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
+            n_results=n_results,
+            where=self._where(where),
             include=["documents", "metadatas", "distances"]
         )
         
         query_results = []
         
         if results and results['ids'] and results['ids'][0]:
-            for i in range(len(results['ids'][0])):
+            for i in range(min(top_k, len(results['ids'][0]))):
                 metadata = results['metadatas'][0][i]
                 query_results.append(QueryResult(
                     file_path=metadata['file_path'],
@@ -244,6 +1001,51 @@ class VectorStore:
         
         return query_results
     
+    @staticmethod
+    def _where(where: Optional[MetadataFilter]) -> Optional[Dict[str, Any]]:
+        """
+        Build the ChromaDB where clause of a metadata filter.
+
+        Args:
+            where: Metadata filter
+
+        Returns:
+            ChromaDB where clause, or None for no restriction
+        """
+        if where is None:
+            return None
+        clauses = []
+        if where.file_paths is not None:
+            clauses.append({"file_path": {"$in": where.file_paths}})
+        if where.headings is not None:
+            clauses.append({"heading": {"$in": where.headings}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def get_all_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Read every stored chunk vector.
+
+        Returns:
+            Tuple of (chunk IDs, float32 array with one row per chunk)
+        """
+        ids: List[str] = []
+        parts: List[np.ndarray] = []
+        for offset in range(0, self.collection.count(), _MIGRATION_BATCH):
+            page = self.collection.get(
+                include=["embeddings"],
+                limit=_MIGRATION_BATCH,
+                offset=offset
+            )
+            if page["ids"]:
+                ids.extend(page["ids"])
+                parts.append(np.asarray(page["embeddings"], dtype=np.float32))
+
+        if not parts:
+            return ids, np.empty((0, 0), dtype=np.float32)
+        return ids, np.concatenate(parts)
+
     def count(self) -> int:
         """
         Get total number of chunks in the collection.
@@ -252,3 +1054,122 @@ class VectorStore:
             Number of chunks
         """
         return self.collection.count()
+
+    def close(self):
+        """
+        Release resources held by the store.
+
+        The ChromaDB client of this version has no close; its system is shared
+        by every client of the same directory and released at exit.
+        """
+
+
+def create_vector_store(data_dir: Path, config: VectorStoreConfig, chroma_config: ChromaDBConfig) -> BaseVectorStore:
+    """
+    Create the vector store selected by config.backend, sharded if config.shards > 1.
+
+    Args:
+        data_dir: Index data directory
+        config: Vector store configuration
+        chroma_config: ChromaDB configuration (used by the chroma backend)
+
+    Returns:
+        BaseVectorStore instance
+    """
+    if config.shards <= 1:
+        store = _create_backend(data_dir, config, chroma_config)
+        _warn_stale_layouts(data_dir, config, chroma_config, store, [""])
+        return store
+
+    from .sharded_store import SHARD_KEYS, ShardedVectorStore
+    if config.shard_by not in SHARD_KEYS:
+        raise ValueError(
+            f"Unknown shard_by: {config.shard_by} (expected one of: {', '.join(SHARD_KEYS)})"
+        )
+    # The layout is part of the name, so changing it starts from empty shards
+    names = [f"{config.shard_by}{config.shards}-{i}" for i in range(config.shards)]
+    shards = [_create_backend(data_dir, config, chroma_config, name) for name in names]
+    _warn_stale_layouts(data_dir, config, chroma_config, shards[0], names)
+    return ShardedVectorStore(shards, config.shard_by)
+
+
+def _warn_stale_layouts(
+    data_dir: Path,
+    config: VectorStoreConfig,
+    chroma_config: ChromaDBConfig,
+    store: BaseVectorStore,
+    shard_names: List[str]
+):
+    """
+    Warn about stores left behind by another shards/shard_by setting.
+
+    They are never read again (the new layout is indexed from scratch) but
+    keep their disk space until deleted; they are not removed automatically
+    because switching back would otherwise re-embed everything.
+
+    Args:
+        data_dir: Index data directory
+        config: Vector store configuration
+        chroma_config: ChromaDB configuration
+        store: One store of the current layout
+        shard_names: Shard names of the current layout ("" = unsharded)
+    """
+    stale: List[str] = []
+    if config.backend == "chroma":
+        base = chroma_config.collection_name
+        pattern = re.compile(rf"{re.escape(base)}-{_SHARD_NAME_PATTERN}")
+        current = {f"{base}-{name}" if name else base for name in shard_names}
+        for collection in store.client.list_collections():
+            name = getattr(collection, "name", collection)
+            if name not in current and (name == base or pattern.fullmatch(name)):
+                stale.append(f"collection '{name}' in {data_dir / 'chroma'}")
+    else:
+        root = data_dir / ("vectors" if config.backend == "numpy" else "ivf")
+        pattern = re.compile(_SHARD_NAME_PATTERN)
+        entries = sorted(root.iterdir()) if root.is_dir() else []
+        for path in entries:
+            if path.is_dir() and pattern.fullmatch(path.name) and path.name not in shard_names:
+                stale.append(str(path))
+        if "" not in shard_names and any(path.is_file() for path in entries):
+            stale.append(f"unsharded files in {root}")
+
+    if stale:
+        logger.warning(
+            "Vector store data of a previous shards/shard_by setting is no longer used "
+            f"and can be deleted: {', '.join(stale)}"
+        )
+
+
+def _create_backend(
+    data_dir: Path,
+    config: VectorStoreConfig,
+    chroma_config: ChromaDBConfig,
+    shard: str = ""
+) -> BaseVectorStore:
+    """
+    Create one store of the configured backend.
+
+    Args:
+        data_dir: Index data directory
+        config: Vector store configuration
+        chroma_config: ChromaDB configuration (used by the chroma backend)
+        shard: Shard name, appended to the collection name or directory
+
+    Returns:
+        BaseVectorStore instance
+    """
+    if config.backend == "chroma":
+        if shard:
+            chroma_config = replace(
+                chroma_config, collection_name=f"{chroma_config.collection_name}-{shard}"
+            )
+        return VectorStore(data_dir / "chroma", chroma_config)
+    if config.backend == "numpy":
+        from .numpy_store import NumpyVectorStore
+        return NumpyVectorStore(data_dir / "vectors" / shard, config)
+    if config.backend == "ivf":
+        from .ivf_store import IVFVectorStore
+        return IVFVectorStore(data_dir / "ivf" / shard, config)
+    raise ValueError(
+        f"Unknown vector store backend: {config.backend} (expected one of: chroma, numpy, ivf)"
+    )
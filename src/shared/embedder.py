@@ -1,88 +1,662 @@
-"""Embedding generation module using Gemini API."""
+"""Embedding generation module (Gemini API or pluggable backends)."""
 
-import os
+import asyncio
+import heapq
+import re
+import threading
 import time
-from typing import List
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 import logging
 
-try:
-    from google import genai
-    from google.genai import types
-except ImportError:
-    import google.generativeai as genai
-    types = None
+import numpy as np
 
 from .config import EmbeddingConfig, RetryConfig
+from .embedding_backends import EmbeddingBackend, create_backend
+from .embedding_cache import EmbeddingCache
+from .rate_limiter import RateLimiter
 
 
 logger = logging.getLogger(__name__)
 
+# Error messages of requests rejected for their size
+_PAYLOAD_TOO_LARGE = re.compile(
+    r"payload size exceeds|request entity too large", re.IGNORECASE
+)
+_TOO_MANY_TEXTS = re.compile(r"at most \d+ requests", re.IGNORECASE)
+
+
+@dataclass
+class EmbeddingStats:
+    """
+    Embedding work done on behalf of one caller, e.g. one index update.
+
+    The Embedder is shared by every corpus and by searches, so its own
+    counters mix everyone's work; pass an instance to embed_texts to count
+    only the calls made for that request.
+    """
+    api_calls: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
 
 class Embedder:
-    """Gemini Embedding API client."""
-    
-    def __init__(self, embedding_config: EmbeddingConfig, retry_config: RetryConfig):
+    """Embedding client with batching, retries, caching and rate limiting."""
+
+    # Consecutive successful requests before the batch limits grow again
+    _GROW_AFTER = 10
+    _GROW_FACTOR = 1.25
+
+    def __init__(
+        self,
+        embedding_config: EmbeddingConfig,
+        retry_config: RetryConfig,
+        cache: Optional[EmbeddingCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        backend: Optional[EmbeddingBackend] = None
+    ):
         """
         Initialize Embedder.
 
         Args:
             embedding_config: Embedding configuration
             retry_config: Retry configuration
+            cache: Optional persistent embedding cache
+            rate_limiter: Rate limiter to share with other embedders
+                (default: one built from embedding_config)
+            backend: Embedding backend
+                (default: the one selected by embedding_config.backend)
         """
         self.embedding_config = embedding_config
         self.retry_config = retry_config
+        self.cache = cache
+        self.rate_limiter = rate_limiter or RateLimiter(
+            embedding_config.requests_per_minute,
+            embedding_config.tokens_per_minute
+        )
+        self._counter_lock = threading.Lock()
         self.api_call_count = 0  # API call counter
+        self.cache_hit_count = 0
+        self.cache_miss_count = 0
 
-        # Get API key from environment
-        api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError(
-                "GEMINI_API_KEY or GOOGLE_API_KEY environment variable must be set"
-            )
+        # Adaptive batch limits: shrunk when a request is rejected as too
+        # large, grown back towards the configured limits after successes
+        self._limit_lock = threading.Lock()
+        self._batch_texts_limit = max(1, embedding_config.batch_size)
+        self._batch_chars_limit = embedding_config.max_batch_chars
+        self._success_streak = 0
+
+        self.backend = backend or create_backend(embedding_config)
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the embedding model, used in cache keys."""
+        return self.backend.model_id
+
+    @property
+    def dimensions(self) -> int:
+        """Dimensionality of the vectors the backend actually returns."""
+        return self.backend.dimensions
 
-        # Initialize client
-        try:
-            # Try new google-genai SDK
-            self.client = genai.Client(api_key=api_key)
-            self.use_new_sdk = True
-        except Exception:
-            # Fallback to old google-generativeai SDK
-            genai.configure(api_key=api_key)
-            self.use_new_sdk = False
-    
     def embed_texts(
         self, 
         texts: List[str], 
-        task_type: str = None
-    ) -> List[List[float]]:
+        task_type: str = None,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
         """
         Generate embeddings for multiple texts.
         
         Args:
             texts: List of texts to embed
             task_type: Task type (RETRIEVAL_DOCUMENT or RETRIEVAL_QUERY)
+            stats: Optional counters of this call's API requests and cache hits
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimensionality)
         """
         if not texts:
-            return []
+            return self._empty()
         
         if task_type is None:
             task_type = self.embedding_config.task_type_document
-        
-        all_embeddings = []
-        batch_size = self.embedding_config.batch_size
-        
+
+        if self.cache is None:
+            return self._embed_uncached(texts, task_type, stats)
+
+        # Consult the cache first and only send misses to the API
+        hashes, embeddings, missing = self._cache_lookup(texts, task_type, stats)
+        if missing:
+            new_embeddings = dict(zip(
+                missing.keys(),
+                self._embed_uncached(list(missing.values()), task_type, stats)
+            ))
+            return self._cache_fill(hashes, embeddings, new_embeddings, task_type)
+
+        return np.stack(embeddings)
+
+    async def embed_texts_async(
+        self,
+        texts: List[str],
+        task_type: str = None,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts without blocking the event loop.
+
+        Args:
+            texts: List of texts to embed
+            task_type: Task type (RETRIEVAL_DOCUMENT or RETRIEVAL_QUERY)
+            stats: Optional counters of this call's API requests and cache hits
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        if not texts:
+            return self._empty()
+
+        if task_type is None:
+            task_type = self.embedding_config.task_type_document
+
+        if self.cache is None:
+            return await self._embed_uncached_async(texts, task_type, stats)
+
+        hashes, embeddings, missing = await asyncio.to_thread(
+            self._cache_lookup, texts, task_type, stats
+        )
+        if missing:
+            new_embeddings = dict(zip(
+                missing.keys(),
+                await self._embed_uncached_async(list(missing.values()), task_type, stats)
+            ))
+            return await asyncio.to_thread(
+                self._cache_fill, hashes, embeddings, new_embeddings, task_type
+            )
+
+        return np.stack(embeddings)
+
+    def _cache_lookup(
+        self,
+        texts: List[str],
+        task_type: str,
+        stats: Optional[EmbeddingStats] = None
+    ) -> Tuple[List[str], List[Optional[np.ndarray]], Dict[str, str]]:
+        """
+        Look texts up in the cache and update the hit/miss counters.
+
+        Args:
+            texts: List of texts
+            task_type: Task type
+            stats: Optional per-caller counters to update as well
+
+        Returns:
+            Tuple of (content hashes, cached vectors or None,
+            unique missing texts keyed by hash)
+        """
+        hashes = [EmbeddingCache.hash_text(text) for text in texts]
+        embeddings = self.cache.get_many(
+            hashes,
+            self.model_id,
+            self.dimensions,
+            task_type
+        )
+
+        missing: Dict[str, str] = {}
+        for text_hash, text, embedding in zip(hashes, texts, embeddings):
+            if embedding is None:
+                missing.setdefault(text_hash, text)
+
+        miss_total = sum(1 for embedding in embeddings if embedding is None)
+        with self._counter_lock:
+            self.cache_hit_count += len(texts) - miss_total
+            self.cache_miss_count += miss_total
+            if stats is not None:
+                stats.cache_hits += len(texts) - miss_total
+                stats.cache_misses += miss_total
+
+        return hashes, embeddings, missing
+
+    def _cache_fill(
+        self,
+        hashes: List[str],
+        embeddings: List[Optional[np.ndarray]],
+        new_embeddings: Dict[str, np.ndarray],
+        task_type: str
+    ) -> np.ndarray:
+        """
+        Store freshly computed vectors and merge them with the cached ones.
+
+        Args:
+            hashes: Content hashes of all texts
+            embeddings: Cached vectors or None, aligned with hashes
+            new_embeddings: Newly computed vectors keyed by hash
+            task_type: Task type
+
+        Returns:
+            float32 array of all embedding vectors
+        """
+        self.cache.put_many(
+            new_embeddings,
+            self.model_id,
+            self.dimensions,
+            task_type
+        )
+        return np.stack([
+            embedding if embedding is not None else new_embeddings[text_hash]
+            for text_hash, embedding in zip(hashes, embeddings)
+        ])
+
+    def _embed_uncached(
+        self,
+        texts: List[str],
+        task_type: str,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Generate embeddings via the API, split into batches.
+
+        Args:
+            texts: List of texts to embed
+            task_type: Task type
+            stats: Optional per-caller counters
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        batches = self._make_batches(texts)
+
+        if len(batches) > 1 and self.embedding_config.max_concurrent_requests > 1:
+            return self._embed_batches_concurrent(batches, task_type, stats)
+
         # Process in batches
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_embeddings = self._embed_batch_with_retry(batch, task_type)
-            all_embeddings.extend(batch_embeddings)
-        
-        return all_embeddings
+        return self._concat([
+            self._embed_batch_adaptive(batch, task_type, stats) for batch in batches
+        ])
+
+    def _count_api_call(self, stats: Optional[EmbeddingStats]):
+        """
+        Count one API request against the caller's counters.
+
+        Args:
+            stats: Per-caller counters (None = not counted)
+        """
+        if stats is not None:
+            with self._counter_lock:
+                stats.api_calls += 1
+
+    def _empty(self) -> np.ndarray:
+        """
+        Build an empty embedding matrix.
+
+        Returns:
+            float32 array of shape (0, dimensions)
+        """
+        return np.empty((0, self.dimensions), dtype=np.float32)
+
+    def _concat(self, parts: List[np.ndarray]) -> np.ndarray:
+        """
+        Join per-batch embedding arrays into one contiguous float32 matrix.
+
+        Args:
+            parts: Embedding arrays in input order
+
+        Returns:
+            float32 array of all rows
+        """
+        if not parts:
+            return self._empty()
+        if len(parts) == 1:
+            return np.asarray(parts[0], dtype=np.float32)
+        return np.concatenate([np.asarray(part, dtype=np.float32) for part in parts])
+
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Pack texts into batches within the current text count and character limits.
+
+        A single text larger than the character limit gets a batch of its own.
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Batches of texts in input order
+        """
+        with self._limit_lock:
+            max_texts = self._batch_texts_limit
+            max_chars = self._batch_chars_limit
+
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_chars = 0
+        for text in texts:
+            if current and (
+                len(current) >= max_texts
+                or (max_chars > 0 and current_chars + len(text) > max_chars)
+            ):
+                batches.append(current)
+                current = []
+                current_chars = 0
+            current.append(text)
+            current_chars += len(text)
+
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _is_payload_too_large(error: Exception) -> bool:
+        """
+        Check whether a request was rejected because of its size.
+
+        Such requests fail on every retry, so the batch is split instead.
+
+        Args:
+            error: Exception raised by the backend
+
+        Returns:
+            True if the error indicates an oversized request
+        """
+        if getattr(error, "code", None) == 413:
+            return True
+        message = str(error)
+        return bool(_PAYLOAD_TOO_LARGE.search(message) or _TOO_MANY_TEXTS.search(message))
+
+    def _shrink_batch_limits(self, texts: List[str], error: Exception):
+        """
+        Halve the batch limit named by the error below the size of the rejected request.
+
+        Args:
+            texts: Batch that was rejected as too large
+            error: Exception raised by the backend
+        """
+        with self._limit_lock:
+            if _TOO_MANY_TEXTS.search(str(error)):
+                half_texts = max(1, len(texts) // 2)
+                self._batch_texts_limit = min(self._batch_texts_limit, half_texts)
+            else:
+                half_chars = max(1, sum(len(text) for text in texts) // 2)
+                if self._batch_chars_limit <= 0:
+                    self._batch_chars_limit = half_chars
+                else:
+                    self._batch_chars_limit = min(self._batch_chars_limit, half_chars)
+            self._success_streak = 0
+            max_texts, max_chars = self._batch_texts_limit, self._batch_chars_limit
+
+        logger.warning(
+            f"Embedding request too large ({len(texts)} texts); "
+            f"batch limits reduced to {max_texts} texts / {max_chars} chars"
+        )
+
+    def _record_batch_success(self):
+        """Grow the batch limits back after a streak of successful requests."""
+        with self._limit_lock:
+            self._success_streak += 1
+            if self._success_streak < self._GROW_AFTER:
+                return
+            self._success_streak = 0
+
+            configured_texts = max(1, self.embedding_config.batch_size)
+            self._batch_texts_limit = min(
+                configured_texts,
+                int(self._batch_texts_limit * self._GROW_FACTOR) + 1
+            )
+
+            configured_chars = self.embedding_config.max_batch_chars
+            if self._batch_chars_limit > 0:
+                grown = int(self._batch_chars_limit * self._GROW_FACTOR) + 1
+                if configured_chars > 0:
+                    grown = min(configured_chars, grown)
+                self._batch_chars_limit = grown
+
+    def _embed_batch_adaptive(
+        self,
+        texts: List[str],
+        task_type: str,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Embed a batch with retries, splitting it in half if it is too large.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+            stats: Optional per-caller counters
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        try:
+            return self._embed_batch_with_retry(texts, task_type, stats)
+        except Exception as e:
+            if len(texts) < 2 or not self._is_payload_too_large(e):
+                raise
+
+        mid = len(texts) // 2
+        return self._concat([
+            self._embed_batch_adaptive(texts[:mid], task_type, stats),
+            self._embed_batch_adaptive(texts[mid:], task_type, stats)
+        ])
+
+    def _embed_batches_concurrent(
+        self,
+        batches: List[List[str]],
+        task_type: str,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Embed batches with up to max_concurrent_requests requests in flight.
+
+        Failed batches are scheduled for a later attempt instead of sleeping
+        in a worker, so backoff never holds a worker slot. Batches rejected as
+        too large are split in half and resubmitted immediately.
+
+        Args:
+            batches: Batches of texts
+            task_type: Task type
+            stats: Optional per-caller counters
+
+        Returns:
+            float32 array of embedding vectors in input order
+        """
+        max_workers = self.embedding_config.max_concurrent_requests
+        # Work items are keyed by the offset of their first text
+        results: Dict[int, np.ndarray] = {}
+        attempts: Dict[int, int] = {}
+        ready: deque = deque()
+        offset = 0
+        for batch in batches:
+            ready.append((offset, batch))
+            offset += len(batch)
+        delayed: List[Tuple[float, int, List[str]]] = []  # heap of (ready_at, offset, batch)
+        in_flight: Dict[Future, Tuple[int, List[str]]] = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while ready or delayed or in_flight:
+                # Requeue batches whose backoff has elapsed
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, offset, batch = heapq.heappop(delayed)
+                    ready.append((offset, batch))
+
+                # Fill free worker slots, waiting on the rate limiter here
+                while ready and len(in_flight) < max_workers:
+                    offset, batch = ready.popleft()
+                    self.rate_limiter.acquire(self._estimate_tokens(batch))
+                    self._count_api_call(stats)
+                    future = pool.submit(self._embed_batch, batch, task_type)
+                    in_flight[future] = (offset, batch)
+
+                if not in_flight:
+                    # Only backoff retries are pending
+                    time.sleep(max(0.0, delayed[0][0] - time.monotonic()))
+                    continue
+
+                timeout = None
+                if delayed:
+                    timeout = max(0.0, delayed[0][0] - time.monotonic())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    offset, batch = in_flight.pop(future)
+                    try:
+                        results[offset] = future.result()
+                    except Exception as e:
+                        if len(batch) > 1 and self._is_payload_too_large(e):
+                            # Retrying the same request cannot succeed
+                            attempts.pop(offset, None)
+                            mid = len(batch) // 2
+                            ready.appendleft((offset + mid, batch[mid:]))
+                            ready.appendleft((offset, batch[:mid]))
+                            continue
+
+                        attempts[offset] = attempts.get(offset, 0) + 1
+                        if attempts[offset] >= self.retry_config.max_retries:
+                            logger.error(
+                                f"Failed to embed batch after "
+                                f"{self.retry_config.max_retries} attempts: {e}"
+                            )
+                            for pending in in_flight:
+                                pending.cancel()
+                            raise
+
+                        delay = self.retry_config.base_delay * (
+                            self.retry_config.backoff_factor ** (attempts[offset] - 1)
+                        )
+                        logger.warning(
+                            f"Embedding attempt {attempts[offset]} failed: {e}. "
+                            f"Retrying in {delay}s..."
+                        )
+                        heapq.heappush(delayed, (time.monotonic() + delay, offset, batch))
+
+        return self._concat([results[offset] for offset in sorted(results)])
+
+    async def _embed_uncached_async(
+        self,
+        texts: List[str],
+        task_type: str,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Generate embeddings via the async API, split into concurrent batches.
+
+        Args:
+            texts: List of texts to embed
+            task_type: Task type
+            stats: Optional per-caller counters
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        batches = self._make_batches(texts)
+        semaphore = asyncio.Semaphore(max(1, self.embedding_config.max_concurrent_requests))
+
+        results = await asyncio.gather(*(
+            self._embed_batch_adaptive_async(batch, task_type, semaphore, stats)
+            for batch in batches
+        ))
+
+        return self._concat(list(results))
+
+    async def _embed_batch_adaptive_async(
+        self,
+        texts: List[str],
+        task_type: str,
+        semaphore: asyncio.Semaphore,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Embed a batch with retries asynchronously, splitting it if it is too large.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+            semaphore: Limits the number of requests in flight
+            stats: Optional per-caller counters
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        try:
+            return await self._embed_batch_with_retry_async(texts, task_type, semaphore, stats)
+        except Exception as e:
+            if len(texts) < 2 or not self._is_payload_too_large(e):
+                raise
+
+        mid = len(texts) // 2
+        left, right = await asyncio.gather(
+            self._embed_batch_adaptive_async(texts[:mid], task_type, semaphore, stats),
+            self._embed_batch_adaptive_async(texts[mid:], task_type, semaphore, stats)
+        )
+        return self._concat([left, right])
+
+    async def _embed_batch_with_retry_async(
+        self,
+        texts: List[str],
+        task_type: str,
+        semaphore: asyncio.Semaphore,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
+        """
+        Embed a batch of texts with retry logic, asynchronously.
+
+        The concurrency slot is released while backing off.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+            semaphore: Limits the number of requests in flight
+            stats: Optional per-caller counters
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        for attempt in range(self.retry_config.max_retries):
+            delay = self.rate_limiter.reserve(self._estimate_tokens(texts))
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                async with semaphore:
+                    self._count_api_call(stats)
+                    return await self._embed_batch_async(texts, task_type)
+            except Exception as e:
+                if len(texts) > 1 and self._is_payload_too_large(e):
+                    # Let the caller split the batch instead of retrying
+                    raise
+                if attempt == self.retry_config.max_retries - 1:
+                    logger.error(f"Failed to embed batch after {self.retry_config.max_retries} attempts: {e}")
+                    raise
+
+                delay = self.retry_config.base_delay * (
+                    self.retry_config.backoff_factor ** attempt
+                )
+                logger.warning(
+                    f"Embedding attempt {attempt + 1} failed: {e}. "
+                    f"Retrying in {delay}s..."
+                )
+                await asyncio.sleep(delay)
+
+        return self._empty()
+
+    @staticmethod
+    def _estimate_tokens(texts: List[str]) -> int:
+        """
+        Estimate the token count of a request for rate limiting.
+
+        Uses the character count, which over-estimates English text but is
+        close for Japanese, so the limiter errs on the safe side.
+
+        Args:
+            texts: Batch of texts
+
+        Returns:
+            Estimated number of tokens
+        """
+        return sum(len(text) for text in texts)
     
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str) -> np.ndarray:
         """
         Generate embedding for a query.
 
@@ -90,17 +664,33 @@ class Embedder:
             query: Query text
 
         Returns:
-            Embedding vector
+            float32 embedding vector (empty on failure)
         """
         embeddings = self.embed_texts(
             [query],
             task_type=self.embedding_config.task_type_query
         )
-        return embeddings[0] if embeddings else []
+        return embeddings[0] if len(embeddings) else np.empty(0, dtype=np.float32)
+
+    async def embed_query_async(self, query: str) -> np.ndarray:
+        """
+        Generate embedding for a query without blocking the event loop.
+
+        Args:
+            query: Query text
+
+        Returns:
+            float32 embedding vector (empty on failure)
+        """
+        embeddings = await self.embed_texts_async(
+            [query],
+            task_type=self.embedding_config.task_type_query
+        )
+        return embeddings[0] if len(embeddings) else np.empty(0, dtype=np.float32)
 
     def get_api_call_count(self) -> int:
         """
-        Get the number of API calls made.
+        Get the number of API calls made by all users of this embedder.
 
         Returns:
             Number of API calls
@@ -110,26 +700,47 @@ class Embedder:
     def reset_api_call_count(self):
         """Reset the API call counter."""
         self.api_call_count = 0
+
+    def get_cache_stats(self) -> Tuple[int, int]:
+        """
+        Get embedding cache hit and miss counts of all users of this embedder.
+
+        Returns:
+            Tuple of (hits, misses)
+        """
+        return self.cache_hit_count, self.cache_miss_count
+
+    def reset_cache_stats(self):
+        """Reset the cache hit/miss counters."""
+        self.cache_hit_count = 0
+        self.cache_miss_count = 0
     
     def _embed_batch_with_retry(
         self, 
         texts: List[str], 
-        task_type: str
-    ) -> List[List[float]]:
+        task_type: str,
+        stats: Optional[EmbeddingStats] = None
+    ) -> np.ndarray:
         """
         Embed a batch of texts with retry logic.
         
         Args:
             texts: Batch of texts
             task_type: Task type
+            stats: Optional per-caller counters
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimensionality)
         """
         for attempt in range(self.retry_config.max_retries):
+            self.rate_limiter.acquire(self._estimate_tokens(texts))
+            self._count_api_call(stats)
             try:
                 return self._embed_batch(texts, task_type)
             except Exception as e:
+                if len(texts) > 1 and self._is_payload_too_large(e):
+                    # Let the caller split the batch instead of retrying
+                    raise
                 if attempt == self.retry_config.max_retries - 1:
                     logger.error(f"Failed to embed batch after {self.retry_config.max_retries} attempts: {e}")
                     raise
@@ -143,46 +754,55 @@ class Embedder:
                 )
                 time.sleep(delay)
         
-        return []
+        return self._empty()
     
-    def _embed_batch(self, texts: List[str], task_type: str) -> List[List[float]]:
+    def _embed_batch(self, texts: List[str], task_type: str) -> np.ndarray:
         """
-        Embed a batch of texts using Gemini API.
+        Embed a batch of texts using the backend.
 
         Args:
             texts: Batch of texts
             task_type: Task type
 
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimensionality)
         """
-        # Increment API call counter
-        self.api_call_count += 1
+        # Increment API call counter (batches may run on worker threads)
+        with self._counter_lock:
+            self.api_call_count += 1
 
-        if self.use_new_sdk:
-            # New google-genai SDK
-            config = types.EmbedContentConfig(
-                task_type=task_type,
-                output_dimensionality=self.embedding_config.output_dimensionality
-            )
-            
-            result = self.client.models.embed_content(
-                model=self.embedding_config.model,
-                contents=texts,
-                config=config
-            )
-            
-            return [embedding.values for embedding in result.embeddings]
-        else:
-            # Old google-generativeai SDK
-            result = genai.embed_content(
-                model=f"models/{self.embedding_config.model}",
-                content=texts,
-                task_type=task_type,
-                output_dimensionality=self.embedding_config.output_dimensionality
+        try:
+            embeddings = np.asarray(self.backend.embed(texts, task_type), dtype=np.float32)
+        except Exception as e:
+            if len(texts) > 1 and self._is_payload_too_large(e):
+                self._shrink_batch_limits(texts, e)
+            raise
+
+        self._record_batch_success()
+        return embeddings
+
+    async def _embed_batch_async(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts using the backend's async API.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        with self._counter_lock:
+            self.api_call_count += 1
+
+        try:
+            embeddings = np.asarray(
+                await self.backend.embed_async(texts, task_type), dtype=np.float32
             )
-            
-            if isinstance(result['embedding'][0], list):
-                return result['embedding']
-            else:
-                return [result['embedding']]
+        except Exception as e:
+            if len(texts) > 1 and self._is_payload_too_large(e):
+                self._shrink_batch_limits(texts, e)
+            raise
+
+        self._record_batch_success()
+        return embeddings
@@ -0,0 +1,371 @@
+"""Embedding backends used by Embedder."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+
+from .config import EmbeddingConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    """Interface for embedding providers."""
+
+    @property
+    @abstractmethod
+    def model_id(self) -> str:
+        """Identifier of the model, used in cache keys."""
+
+    @property
+    def dimensions(self) -> int:
+        """Dimensionality of the returned vectors (default: the configured one)."""
+        return self.config.output_dimensionality
+
+    @abstractmethod
+    def embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type (RETRIEVAL_DOCUMENT or RETRIEVAL_QUERY)
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+
+    async def embed_async(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts without blocking the event loop.
+
+        The default implementation runs embed() on a worker thread.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        return await asyncio.to_thread(self.embed, texts, task_type)
+
+
+class GeminiBackend(EmbeddingBackend):
+    """Gemini Embedding API backend."""
+
+    def __init__(self, config: EmbeddingConfig):
+        """
+        Initialize GeminiBackend.
+
+        Args:
+            config: Embedding configuration
+        """
+        self.config = config
+
+        # Get API key from environment
+        api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError(
+                "GEMINI_API_KEY or GOOGLE_API_KEY environment variable must be set"
+            )
+
+        # Initialize client
+        try:
+            # Try new google-genai SDK
+            from google import genai
+            from google.genai import types
+            self.types = types
+            http_options = None
+            if config.base_url:
+                # e.g. the local fake server (python -m src.fake_gemini.server)
+                http_options = types.HttpOptions(base_url=config.base_url)
+            self.client = genai.Client(api_key=api_key, http_options=http_options)
+            self.use_new_sdk = True
+        except ImportError:
+            # Fallback to old google-generativeai SDK
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self.genai = genai
+            self.use_new_sdk = False
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the model, used in cache keys."""
+        return self.config.model
+
+    def embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts using Gemini API.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        if self.use_new_sdk:
+            # New google-genai SDK
+            result = self.client.models.embed_content(
+                model=self.config.model,
+                contents=texts,
+                config=self._embed_config(task_type)
+            )
+
+            return np.asarray(
+                [embedding.values for embedding in result.embeddings], dtype=np.float32
+            )
+        else:
+            # Old google-generativeai SDK
+            result = self.genai.embed_content(
+                model=f"models/{self.config.model}",
+                content=texts,
+                task_type=task_type,
+                output_dimensionality=self.config.output_dimensionality
+            )
+
+            if isinstance(result['embedding'][0], list):
+                return np.asarray(result['embedding'], dtype=np.float32)
+            else:
+                return np.asarray([result['embedding']], dtype=np.float32)
+
+    async def embed_async(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts using the Gemini async API.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        if not self.use_new_sdk:
+            # The old SDK has no async client
+            return await super().embed_async(texts, task_type)
+
+        result = await self.client.aio.models.embed_content(
+            model=self.config.model,
+            contents=texts,
+            config=self._embed_config(task_type)
+        )
+
+        return np.asarray(
+            [embedding.values for embedding in result.embeddings], dtype=np.float32
+        )
+
+    def _embed_config(self, task_type: str):
+        """
+        Build the request config for the google-genai SDK.
+
+        Args:
+            task_type: Task type
+
+        Returns:
+            EmbedContentConfig instance
+        """
+        return self.types.EmbedContentConfig(
+            task_type=task_type,
+            output_dimensionality=self.config.output_dimensionality
+        )
+
+
+class LocalBackend(EmbeddingBackend):
+    """
+    CPU-only local model backend using sentence-transformers.
+
+    The model is loaded lazily on first use so that importing and configuring
+    the backend stays cheap. Requires the optional `local` extra.
+    """
+
+    def __init__(self, config: EmbeddingConfig):
+        """
+        Initialize LocalBackend.
+
+        Args:
+            config: Embedding configuration
+        """
+        self.config = config
+        self._model = None
+        self._dimensions = 0
+        self._load_lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the model, used in cache keys."""
+        return f"local:{self.config.local_model}"
+
+    def _get_model(self):
+        """
+        Load the sentence-transformers model on first use.
+
+        Returns:
+            SentenceTransformer instance
+        """
+        with self._load_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ImportError(
+                        "The local embedding backend requires sentence-transformers: "
+                        "pip install -e \".[local]\""
+                    ) from e
+
+                logger.info(f"Loading local embedding model: {self.config.local_model}")
+                self._model = SentenceTransformer(self.config.local_model, device="cpu")
+            return self._model
+
+    @property
+    def dimensions(self) -> int:
+        """
+        Dimensionality of the returned vectors.
+
+        The configured output_dimensionality if the model can be truncated to
+        it, otherwise the model's own dimension. Loads the model on first use.
+        """
+        if self._dimensions:
+            return self._dimensions
+
+        model_dim = self._get_model().get_sentence_embedding_dimension()
+        configured = self.config.output_dimensionality
+        if configured > model_dim:
+            logger.warning(
+                f"output_dimensionality {configured} exceeds the {model_dim} dimensions "
+                f"of {self.config.local_model}; using {model_dim}"
+            )
+        self._dimensions = min(configured, model_dim) if configured > 0 else model_dim
+        return self._dimensions
+
+    def embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts with the local model.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type, mapped to the model's query/document prefix
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        if task_type == self.config.task_type_query:
+            prefix = self.config.local_query_prefix
+        else:
+            prefix = self.config.local_document_prefix
+
+        vectors = self._get_model().encode(
+            [prefix + text for text in texts],
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype(np.float32, copy=False)
+
+        # Matryoshka-style truncation when a smaller dimensionality is requested
+        dim = self.dimensions
+        if dim < vectors.shape[1]:
+            vectors = vectors[:, :dim]
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        return np.ascontiguousarray(vectors)
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Deterministic feature-hashing backend for tests and offline use.
+
+    Words and character trigrams are hashed into output_dimensionality signed
+    buckets and L2-normalized, so texts sharing vocabulary get similar vectors
+    without any model or network access.
+    """
+
+    _WORD_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, config: EmbeddingConfig):
+        """
+        Initialize HashingBackend.
+
+        Args:
+            config: Embedding configuration
+        """
+        self.config = config
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the model, used in cache keys."""
+        return "hashing"
+
+    def embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Embed a batch of texts by feature hashing.
+
+        Args:
+            texts: Batch of texts
+            task_type: Task type (ignored)
+
+        Returns:
+            float32 array of shape (len(texts), dimensionality)
+        """
+        dim = self.config.output_dimensionality
+        vectors = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in zip(vectors, texts):
+            self._embed_one(text, row)
+        return vectors
+
+    def _embed_one(self, text: str, vector: np.ndarray):
+        """
+        Embed a single text into a zeroed row.
+
+        Args:
+            text: Text to embed
+            vector: Output row of length output_dimensionality
+        """
+        dim = len(vector)
+        normalized = unicodedata.normalize("NFKC", text).lower()
+
+        features = self._WORD_PATTERN.findall(normalized)
+        compact = "".join(normalized.split())
+        features.extend(compact[i:i + 3] for i in range(max(0, len(compact) - 2)))
+
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            vector[value % dim] += 1.0 if (value >> 63) & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            # Empty text: use a fixed unit vector
+            vector[0] = 1.0
+        else:
+            vector /= norm
+
+
+def create_backend(config: EmbeddingConfig) -> EmbeddingBackend:
+    """
+    Create the embedding backend selected by config.backend.
+
+    Args:
+        config: Embedding configuration
+
+    Returns:
+        EmbeddingBackend instance
+    """
+    backends = {
+        "gemini": GeminiBackend,
+        "local": LocalBackend,
+        "hashing": HashingBackend,
+    }
+    if config.backend not in backends:
+        raise ValueError(
+            f"Unknown embedding backend: {config.backend} "
+            f"(expected one of: {', '.join(backends)})"
+        )
+    return backends[config.backend](config)
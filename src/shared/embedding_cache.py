@@ -0,0 +1,220 @@
+"""Persistent content-addressed embedding cache."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache with size-bounded LRU eviction.
+
+    Entries are keyed by (text hash, model, output_dimensionality, task_type),
+    so a vector is reused whenever the exact same text is embedded again with
+    the same model settings, regardless of which file it came from.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 100000):
+        """
+        Initialize EmbeddingCache.
+
+        Args:
+            db_path: Path to SQLite database file
+            max_entries: Maximum number of cached vectors (0 = unbounded)
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._create_tables()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """
+        Compute the content hash used as cache key.
+
+        Args:
+            text: Text to hash
+
+        Returns:
+            SHA256 hash as hex string
+        """
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _create_tables(self):
+        """Create database tables if they don't exist."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dimensionality INTEGER NOT NULL,
+                task_type TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (text_hash, model, dimensionality, task_type)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used
+            ON embeddings (last_used)
+        """)
+        self.conn.commit()
+
+    def get_many(
+        self,
+        text_hashes: List[str],
+        model: str,
+        dimensionality: int,
+        task_type: str
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors and mark hits as recently used.
+
+        Args:
+            text_hashes: Content hashes (see hash_text)
+            model: Embedding model name
+            dimensionality: Output dimensionality
+            task_type: Task type
+
+        Returns:
+            float32 vectors aligned with text_hashes; None for cache misses
+        """
+        found: Dict[str, np.ndarray] = {}
+        unique_hashes = list(dict.fromkeys(text_hashes))
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            for i in range(0, len(unique_hashes), _SQL_BATCH):
+                batch = unique_hashes[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                cursor.execute(f"""
+                    SELECT text_hash, vector FROM embeddings
+                    WHERE model = ? AND dimensionality = ? AND task_type = ?
+                      AND text_hash IN ({placeholders})
+                """, (model, dimensionality, task_type, *batch))
+                for text_hash, blob in cursor.fetchall():
+                    # Read-only view over the blob, no per-element boxing
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                cursor.executemany("""
+                    UPDATE embeddings SET last_used = ?
+                    WHERE text_hash = ? AND model = ? AND dimensionality = ? AND task_type = ?
+                """, [(now, h, model, dimensionality, task_type) for h in found])
+                self.conn.commit()
+
+        return [found.get(h) for h in text_hashes]
+
+    def put_many(
+        self,
+        entries: Dict[str, np.ndarray],
+        model: str,
+        dimensionality: int,
+        task_type: str
+    ):
+        """
+        Store vectors and evict least recently used entries beyond max_entries.
+
+        Args:
+            entries: Mapping of content hash to embedding vector
+            model: Embedding model name
+            dimensionality: Output dimensionality
+            task_type: Task type
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        rows = [
+            (text_hash, model, dimensionality, task_type,
+             np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text_hash, vector in entries.items()
+        ]
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO embeddings
+                    (text_hash, model, dimensionality, task_type, vector, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._evict(cursor)
+            self.conn.commit()
+
+    def delete_many(
+        self,
+        text_hashes: List[str],
+        model: str,
+        dimensionality: int,
+        task_type: str
+    ):
+        """
+        Remove entries from the cache.
+
+        Args:
+            text_hashes: Content hashes (see hash_text)
+            model: Embedding model name
+            dimensionality: Output dimensionality
+            task_type: Task type
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.executemany("""
+                DELETE FROM embeddings
+                WHERE text_hash = ? AND model = ? AND dimensionality = ? AND task_type = ?
+            """, [(h, model, dimensionality, task_type) for h in text_hashes])
+            self.conn.commit()
+
+    def _evict(self, cursor: sqlite3.Cursor):
+        """
+        Delete least recently used entries beyond max_entries.
+
+        Args:
+            cursor: Cursor of the current transaction
+        """
+        if self.max_entries <= 0:
+            return
+
+        cursor.execute("SELECT COUNT(*) FROM embeddings")
+        overflow = cursor.fetchone()[0] - self.max_entries
+        if overflow <= 0:
+            return
+
+        cursor.execute("""
+            DELETE FROM embeddings WHERE rowid IN (
+                SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?
+            )
+        """, (overflow,))
+        logger.debug(f"Evicted {overflow} entries from embedding cache")
+
+    def count(self) -> int:
+        """
+        Get number of cached vectors.
+
+        Returns:
+            Number of entries
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM embeddings")
+            return cursor.fetchone()[0]
+
+    def close(self):
+        """Close database connection."""
+        self.conn.close()
@@ -1,19 +1,27 @@
 """Index management module for file scanning and differential updates."""
 
+import asyncio
 import hashlib
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import logging
 
+import numpy as np
+
 from .config import ScannerConfig, ChunkerConfig
-from .db import FileDB, VectorStore
-from .chunker import chunk_file
-from .embedder import Embedder
+from .db import BaseVectorStore, ChunkRecord, FileDB, FileRecord, chunk_content_hash
+from .chunker import Chunk, chunk_file
+from .embedder import Embedder, EmbeddingStats
 
 
 logger = logging.getLogger(__name__)
 
+# Files per transaction when filling an empty full-text index
+_BACKFILL_BATCH_FILES = 500
+
 
 @dataclass
 class ScanResult:
@@ -33,6 +41,129 @@ class UpdateSummary:
     unchanged: int
     total_chunks: int
     api_call_count: int
+    cache_hits: int
+    cache_misses: int
+
+
+@dataclass
+class PreparedFile:
+    """File that has been read and chunked, waiting for embeddings."""
+    path: str
+    chunks: List[Chunk]                 # Chunks to embed and write (new or changed)
+    hash: str
+    mtime: float
+    is_update: bool
+    records: List[ChunkRecord] = field(default_factory=list)  # Complete new chunk list
+    chunk_ids: List[str] = field(default_factory=list)        # IDs aligned with chunks
+    removed_ids: List[str] = field(default_factory=list)      # Vanished chunk IDs
+    moved: Dict[str, int] = field(default_factory=dict)       # New index of unchanged chunks
+    replace: bool = False               # Delete all stored vectors first (no chunk list stored)
+    all_chunks: List[Chunk] = field(default_factory=list)     # Complete new chunk list (full-text index)
+
+
+class _BatchPacker:
+    """
+    Packs chunks from many files into full embedding batches.
+
+    Chunks are queued in file order and embedded only once a full batch is
+    available, so small files share API requests instead of each issuing its
+    own. Several batches are handed over at once so the embedder can send them
+    concurrently. After each embed call, every file whose chunks all have
+    vectors is handed to the writer in one group.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        batch_size: int,
+        write_files: Callable[[List[Tuple[PreparedFile, np.ndarray]]], None],
+        batches_per_flush: int = 1,
+        stats: Optional[EmbeddingStats] = None
+    ):
+        """
+        Initialize _BatchPacker.
+
+        Args:
+            embedder: Embedder instance
+            batch_size: Number of texts per embedding batch
+            write_files: Callback storing a group of files with their embeddings
+            batches_per_flush: Number of full batches to collect per embed call
+            stats: Counters of the embedding work done for this update
+        """
+        self.embedder = embedder
+        self.batch_size = max(1, batch_size)
+        self.flush_size = self.batch_size * max(1, batches_per_flush)
+        self.write_files = write_files
+        self.stats = stats
+        self.files: List[PreparedFile] = []
+        self.texts: List[str] = []
+        # Embedded rows not yet written, aligned with the start of self.texts
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
+
+    def add(self, prepared: PreparedFile):
+        """
+        Queue a prepared file, embedding any full batches.
+
+        Args:
+            prepared: Prepared file
+        """
+        self.files.append(prepared)
+        self.texts.extend(chunk.content for chunk in prepared.chunks)
+
+        pending = len(self.texts) - len(self.embeddings)
+        if pending >= self.flush_size:
+            self._embed(pending - pending % self.batch_size)
+
+    def flush(self):
+        """Embed all remaining chunks and write the remaining files."""
+        self._embed(len(self.texts) - len(self.embeddings))
+
+    def _embed(self, count: int):
+        """
+        Embed the next `count` queued texts and write completed files.
+
+        Args:
+            count: Number of texts to embed
+        """
+        if count > 0:
+            start = len(self.embeddings)
+            try:
+                new_embeddings = self.embedder.embed_texts(
+                    self.texts[start:start + count], stats=self.stats
+                )
+            except Exception as e:
+                # Files touching the failed batch stay out of FileDB and are
+                # picked up again by the next update
+                for prepared in self.files:
+                    logger.error(f"Failed to process {prepared.path}: {e}")
+                self.files, self.texts = [], []
+                self.embeddings = np.empty((0, 0), dtype=np.float32)
+                return
+
+            if len(self.embeddings):
+                new_embeddings = np.concatenate([self.embeddings, new_embeddings])
+            self.embeddings = new_embeddings
+
+        # Write out every leading file whose chunks are all embedded
+        offset = 0
+        completed: List[Tuple[PreparedFile, np.ndarray]] = []
+        for prepared in self.files:
+            end = offset + len(prepared.chunks)
+            if end > len(self.embeddings):
+                break
+            completed.append((prepared, self.embeddings[offset:end]))
+            offset = end
+
+        if completed:
+            try:
+                self.write_files(completed)
+            except Exception as e:
+                for prepared, _ in completed:
+                    logger.error(f"Failed to process {prepared.path}: {e}")
+
+        self.files = self.files[len(completed):]
+        self.texts = self.texts[offset:]
+        self.embeddings = self.embeddings[offset:]
 
 
 class Indexer:
@@ -42,10 +173,11 @@ class Indexer:
         self,
         docs_dir: Path,
         file_db: FileDB,
-        vector_store: VectorStore,
+        vector_store: BaseVectorStore,
         embedder: Embedder,
         scanner_config: ScannerConfig,
-        chunker_config: ChunkerConfig
+        chunker_config: ChunkerConfig,
+        executor: Optional[Executor] = None
     ):
         """
         Initialize Indexer.
@@ -53,10 +185,12 @@ class Indexer:
         Args:
             docs_dir: Documents directory
             file_db: FileDB instance
-            vector_store: VectorStore instance
+            vector_store: Vector store instance
             embedder: Embedder instance
             scanner_config: Scanner configuration
             chunker_config: Chunker configuration
+            executor: Executor running update_async
+                (default: the event loop's default executor)
         """
         self.docs_dir = Path(docs_dir)
         self.file_db = file_db
@@ -64,6 +198,8 @@ class Indexer:
         self.embedder = embedder
         self.scanner_config = scanner_config
         self.chunker_config = chunker_config
+        self.executor = executor
+        self._update_lock = threading.Lock()
     
     def scan(self) -> ScanResult:
         """
@@ -118,17 +254,54 @@ class Indexer:
         """
         Perform differential index update.
 
+        Concurrent calls are serialized.
+
+        Returns:
+            UpdateSummary with statistics
+        """
+        with self._update_lock:
+            return self._update()
+
+    async def update_async(self) -> UpdateSummary:
+        """
+        Perform differential index update on the executor.
+
+        The event loop stays free to serve searches while the update runs.
+
+        Returns:
+            UpdateSummary with statistics
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.update)
+
+    def _update(self) -> UpdateSummary:
+        """
+        Perform differential index update (caller holds _update_lock).
+
         Returns:
             UpdateSummary with statistics
         """
         logger.info("Starting index update...")
 
-        # Reset API call counter
-        self.embedder.reset_api_call_count()
+        # Counted per update: the embedder is shared with other corpora and searches
+        stats = EmbeddingStats()
+
+        # An empty vector store next to recorded files (e.g. after switching
+        # vector store backends): index every file again
+        if self.vector_store.count() == 0 and self.file_db.count_files() > 0:
+            logger.warning("Vector store is empty; reindexing all recorded files")
+            self.file_db.delete_files(list(self.file_db.get_all_files()))
 
         # Scan for changes
         scan_result = self.scan()
 
+        # Recorded files but an empty full-text index (built before it was
+        # maintained): chunk the unchanged files again and write only their
+        # texts; their vectors and records are already up to date
+        if scan_result.unchanged_files and not self.file_db.has_texts():
+            logger.warning("Full-text index is empty; filling it from unchanged files")
+            self._backfill_texts(scan_result.unchanged_files)
+
         logger.info(
             f"Scan complete: {len(scan_result.new_files)} new, "
             f"{len(scan_result.updated_files)} updated, "
@@ -137,23 +310,37 @@ class Indexer:
         )
 
         # Process deletions
-        for path in scan_result.deleted_files:
-            logger.debug(f"Deleting: {path}")
-            self.vector_store.delete_by_file(path)
-            self.file_db.delete_file(path)
+        if scan_result.deleted_files:
+            logger.debug(f"Deleting {len(scan_result.deleted_files)} files")
+            self.vector_store.delete_by_files(scan_result.deleted_files)
+            self.file_db.delete_files(scan_result.deleted_files)
 
-        # Process new and updated files
+        # Process new and updated files, packing chunks across files
         files_to_process = scan_result.new_files + scan_result.updated_files
+        updated_paths = set(scan_result.updated_files)
+        embedding_config = self.embedder.embedding_config
+        packer = _BatchPacker(
+            self.embedder,
+            embedding_config.batch_size,
+            self._write_files,
+            batches_per_flush=embedding_config.max_concurrent_requests,
+            stats=stats
+        )
 
         for path in files_to_process:
             try:
-                self._process_file(path, is_update=(path in scan_result.updated_files))
+                prepared = self._prepare_file(path, is_update=(path in updated_paths))
             except Exception as e:
                 logger.error(f"Failed to process {path}: {e}")
+                continue
+
+            if prepared is not None:
+                packer.add(prepared)
 
-        # Get total chunks and API call count
+        packer.flush()
+
+        # Get total chunks
         total_chunks = self.vector_store.count()
-        api_call_count = self.embedder.get_api_call_count()
 
         summary = UpdateSummary(
             added=len(scan_result.new_files),
@@ -161,34 +348,92 @@ class Indexer:
             deleted=len(scan_result.deleted_files),
             unchanged=len(scan_result.unchanged_files),
             total_chunks=total_chunks,
-            api_call_count=api_call_count
+            api_call_count=stats.api_calls,
+            cache_hits=stats.cache_hits,
+            cache_misses=stats.cache_misses
         )
 
         logger.info(
             f"Index update complete: {summary.added} added, "
             f"{summary.updated} updated, {summary.deleted} deleted, "
             f"{summary.total_chunks} total chunks, "
-            f"{summary.api_call_count} API calls"
+            f"{summary.api_call_count} API calls, "
+            f"{summary.cache_hits} cache hits, {summary.cache_misses} cache misses"
         )
 
         return summary
     
-    def _process_file(self, relative_path: str, is_update: bool = False):
+    def _prepare_file(self, relative_path: str, is_update: bool = False) -> Optional[PreparedFile]:
         """
-        Process a single file (new or updated).
-        
+        Read and chunk a single file (new or updated).
+
         Args:
             relative_path: Relative path from docs_dir
             is_update: Whether this is an update (vs new file)
+
+        Returns:
+            PreparedFile, or None if the file produced no chunks
         """
         full_path = self.docs_dir / relative_path
-        
+
         logger.debug(f"Processing: {relative_path}")
-        
-        # Delete old chunks if updating
+
+        # Capture hash and mtime of the content we are about to chunk
+        file_hash = self._compute_hash(full_path)
+        file_mtime = full_path.stat().st_mtime
+
+        chunks = self._read_chunks(relative_path)
+
+        if not chunks:
+            logger.warning(f"No chunks generated for {relative_path}")
+            if is_update:
+                self.vector_store.delete_by_file(relative_path)
+                self.file_db.delete_files([relative_path])
+            return None
+
+        logger.debug(f"  Generated {len(chunks)} chunks")
+
+        chunk_ids = BaseVectorStore.make_chunk_ids(relative_path, chunks)
+        records = [
+            ChunkRecord(
+                chunk_index=chunk.chunk_index,
+                chunk_id=chunk_id,
+                content_hash=chunk_content_hash(chunk),
+                heading=chunk.heading
+            )
+            for chunk, chunk_id in zip(chunks, chunk_ids)
+        ]
+        prepared = PreparedFile(
+            path=relative_path,
+            chunks=chunks,
+            hash=file_hash,
+            mtime=file_mtime,
+            is_update=is_update,
+            records=records,
+            chunk_ids=chunk_ids,
+            replace=is_update,
+            all_chunks=chunks
+        )
+
         if is_update:
-            self.vector_store.delete_by_file(relative_path)
-        
+            stored = self.file_db.get_chunks(relative_path)
+            if stored:
+                self._diff_chunks(prepared, stored)
+
+        return prepared
+
+    def _read_chunks(self, relative_path: str) -> List[Chunk]:
+        """
+        Read and chunk a single file.
+
+        Args:
+            relative_path: Relative path from docs_dir
+
+        Returns:
+            Chunks of the file
+        """
+        full_path = self.docs_dir / relative_path
+
         # Read file content
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
@@ -197,34 +442,108 @@ class Indexer:
             # Try with different encoding
             with open(full_path, 'r', encoding='latin-1') as f:
                 content = f.read()
-        
+
         # Chunk the content
-        chunks = chunk_file(Path(relative_path), content, self.chunker_config)
-        
-        if not chunks:
-            logger.warning(f"No chunks generated for {relative_path}")
-            return
-        
-        logger.debug(f"  Generated {len(chunks)} chunks")
+        return chunk_file(Path(relative_path), content, self.chunker_config)
+
+    def _backfill_texts(self, paths: List[str]):
+        """
+        Write the full-text index rows of already indexed files.
+
+        Args:
+            paths: Relative paths of files whose vectors are up to date
+        """
+        texts: Dict[str, List[Chunk]] = {}
+        for path in paths:
+            try:
+                texts[path] = self._read_chunks(path)
+            except Exception as e:
+                logger.error(f"Failed to read {path} for the full-text index: {e}")
+                continue
+
+            if len(texts) >= _BACKFILL_BATCH_FILES:
+                self.file_db.replace_texts(texts)
+                texts = {}
+
+        self.file_db.replace_texts(texts)
+
+    @staticmethod
+    def _diff_chunks(prepared: PreparedFile, stored: List[ChunkRecord]):
+        """
+        Reduce an updated file to its added/changed chunks and vanished IDs.
+
+        Chunks are matched by ID, so unchanged chunks keep their vectors even
+        when sections before them were inserted or removed; only their new
+        position is recorded.
 
-        # Generate embeddings
-        texts = [chunk.content for chunk in chunks]
-        logger.debug(f"  Generating embeddings for {len(texts)} chunks...")
-        embeddings = self.embedder.embed_texts(texts)
-        logger.debug(f"  Embeddings generated: {len(embeddings)} vectors")
+        Args:
+            prepared: Prepared file holding the complete new chunk list
+            stored: Chunks stored for the previous version of the file
+        """
+        stored_by_id = {record.chunk_id: record for record in stored}
+        new_ids = {record.chunk_id for record in prepared.records}
+
+        changed = []
+        for chunk, record in zip(prepared.chunks, prepared.records):
+            old = stored_by_id.get(record.chunk_id)
+            if old is None or old.content_hash != record.content_hash:
+                changed.append((chunk, record.chunk_id))
+            elif old.chunk_index != record.chunk_index:
+                prepared.moved[record.chunk_id] = record.chunk_index
+
+        prepared.chunks = [chunk for chunk, _ in changed]
+        prepared.chunk_ids = [chunk_id for _, chunk_id in changed]
+        prepared.removed_ids = [
+            record.chunk_id for record in stored if record.chunk_id not in new_ids
+        ]
+        prepared.replace = False
+
+        logger.debug(
+            f"  {len(prepared.chunks)} changed, {len(prepared.removed_ids)} removed, "
+            f"{len(prepared.moved)} moved, "
+            f"{len(prepared.records) - len(prepared.chunks)} unchanged chunks"
+        )
+
+    def _write_files(self, files: List[Tuple[PreparedFile, np.ndarray]]):
+        """
+        Store embedded files in the vector store and file database.
+
+        Args:
+            files: Prepared files with embedding vectors aligned with their chunks
+        """
+        # Delete all old chunks of updated files without a stored chunk list,
+        # and only the vanished ones of the others
+        replaced = [prepared.path for prepared, _ in files if prepared.replace]
+        if replaced:
+            self.vector_store.delete_by_files(replaced)
+        removed_ids = [chunk_id for prepared, _ in files for chunk_id in prepared.removed_ids]
+        if removed_ids:
+            self.vector_store.delete_ids(removed_ids)
+        moved = {
+            chunk_id: index
+            for prepared, _ in files for chunk_id, index in prepared.moved.items()
+        }
+        if moved:
+            self.vector_store.update_chunk_indices(moved)
 
         # Add to vector store
-        logger.debug(f"  Adding chunks to vector store...")
-        self.vector_store.add_chunks(relative_path, chunks, embeddings)
-        logger.debug(f"  Chunks added to vector store")
+        logger.debug(f"  Adding chunks of {len(files)} files to vector store...")
+        self.vector_store.add_chunks_bulk(
+            [(prepared.path, prepared.chunks, embeddings) for prepared, embeddings in files],
+            chunk_ids=[prepared.chunk_ids for prepared, _ in files]
+        )
 
         # Update file database
-        logger.debug(f"  Updating file database...")
-        file_hash = self._compute_hash(full_path)
-        file_mtime = full_path.stat().st_mtime
-        self.file_db.upsert_file(relative_path, file_hash, file_mtime)
-        logger.debug(f"  File processing complete: {relative_path}")
-    
+        self.file_db.upsert_files(
+            [
+                FileRecord(path=prepared.path, hash=prepared.hash, mtime=prepared.mtime)
+                for prepared, _ in files
+            ],
+            chunks={prepared.path: prepared.records for prepared, _ in files},
+            texts={prepared.path: prepared.all_chunks for prepared, _ in files}
+        )
+        logger.debug(f"  File processing complete: {len(files)} files")
+
     def _collect_files(self) -> Dict[str, float]:
         """
         Collect all target files in docs_dir.
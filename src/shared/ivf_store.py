@@ -0,0 +1,263 @@
+"""Inverted-file (k-means partitioned) vector store for large corpora."""
+
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chunker import Chunk
+from .config import VectorStoreConfig
+from .numpy_store import NumpyVectorStore
+
+
+logger = logging.getLogger(__name__)
+
+# Below this many chunks the store is searched exhaustively
+_MIN_TRAIN_CHUNKS = 10000
+# Training sample size per list and k-means iterations
+_TRAIN_POINTS_PER_LIST = 32
+_KMEANS_ITERATIONS = 10
+# Vectors assigned to lists at a time
+_ASSIGN_BLOCK = 8192
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Assign normalized vectors to their most similar centroid.
+
+    Args:
+        vectors: float32 array of shape (n, dim)
+        centroids: float32 array of shape (num_lists, dim)
+
+    Returns:
+        int32 list number per vector
+    """
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK):
+        end = start + _ASSIGN_BLOCK
+        lists[start:end] = np.argmax(np.asarray(vectors[start:end]) @ centroids.T, axis=1)
+    return lists
+
+
+def train_kmeans(
+    vectors: np.ndarray,
+    num_lists: int,
+    iterations: int = _KMEANS_ITERATIONS,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Cluster normalized vectors with spherical k-means.
+
+    Args:
+        vectors: float32 array of shape (n, dim), n >= num_lists
+        num_lists: Number of clusters
+        iterations: Number of assignment/update rounds
+        seed: Random seed for initialization and empty-cluster reseeding
+
+    Returns:
+        Normalized float32 centroids of shape (num_lists, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=num_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        lists = assign_lists(vectors, centroids)
+        counts = np.bincount(lists, minlength=num_lists)
+
+        # Sum the members of every cluster in one pass over the sorted vectors
+        order = np.argsort(lists, kind="stable")
+        sorted_lists = lists[order]
+        starts = np.flatnonzero(np.r_[True, sorted_lists[1:] != sorted_lists[:-1]])
+        sums = np.zeros_like(centroids)
+        sums[sorted_lists[starts]] = np.add.reduceat(vectors[order], starts)
+
+        # Reseed empty clusters with random vectors
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms == 0, 1.0, norms)
+
+    return centroids.astype(np.float32)
+
+
+class IVFVectorStore(NumpyVectorStore):
+    """
+    NumpyVectorStore partitioned into k-means lists.
+
+    Once the store holds enough chunks, the vectors are clustered into
+    ivf_lists lists and every chunk is assigned to its nearest centroid; new
+    chunks are assigned as they are added. A query compares itself with the
+    centroids and scans only the ivf_probes nearest lists, so its cost
+    follows the probed partitions rather than the corpus size. Quantized and
+    truncated codes apply within the probed lists as usual.
+
+    The lists are re-clustered automatically whenever the store has grown by
+    ivf_recluster_growth since the last clustering, or on recluster().
+    """
+
+    def __init__(self, persist_dir: Path, config: Optional[VectorStoreConfig] = None):
+        """
+        Initialize IVFVectorStore.
+
+        Args:
+            persist_dir: Directory holding the matrices, centroids and chunks.db
+            config: Vector store configuration
+        """
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_count = 0
+        # Live slots grouped by list, with list boundaries (rebuilt lazily)
+        self._list_slots = np.zeros(0, dtype=np.int64)
+        self._list_offsets = np.zeros(1, dtype=np.int64)
+        self._lists_dirty = True
+        super().__init__(persist_dir, config)
+
+    def _array_specs(self, dim: int) -> Dict[str, Tuple[np.dtype, Tuple[int, ...]]]:
+        """
+        Describe the per-slot matrices, adding the list assignment.
+
+        Args:
+            dim: Vector dimensionality
+
+        Returns:
+            (dtype, row shape) by array name
+        """
+        specs = super()._array_specs(dim)
+        specs["lists"] = (np.int32, ())
+        return specs
+
+    def _load(self):
+        """Load the centroids, then map the matrices (caller holds _lock)."""
+        path = self.persist_dir / "centroids.npy"
+        self._centroids = np.load(path) if path.exists() else None
+        row = self._conn.execute(
+            "SELECT value FROM settings WHERE key = 'ivf_trained_count'"
+        ).fetchone()
+        self._trained_count = int(row[0]) if row else 0
+        self._lists_dirty = True
+        super()._load()
+
+    def _write_codes(self, slots: np.ndarray, vectors: np.ndarray):
+        """
+        Store the codes and list assignment of normalized vectors.
+
+        Args:
+            slots: Slots to write
+            vectors: Normalized float32 vectors, one row per slot
+        """
+        super()._write_codes(slots, vectors)
+        if self._centroids is None:
+            self._arrays["lists"][slots] = -1
+        else:
+            self._arrays["lists"][slots] = assign_lists(vectors, self._centroids)
+        self._lists_dirty = True
+
+    def _delete_slots(self, found: List[Tuple[str, int]]):
+        """
+        Delete chunks and free their slots (caller holds _lock).
+
+        Args:
+            found: (chunk ID, slot) pairs from _find
+        """
+        super()._delete_slots(found)
+        self._lists_dirty = True
+
+    def add_chunks_bulk(
+        self,
+        files: List[Tuple[str, List[Chunk], np.ndarray]],
+        chunk_ids: Optional[List[List[str]]] = None
+    ):
+        """
+        Add the chunks of many files, re-clustering once the store has grown enough.
+
+        Args:
+            files: (file path, chunks, embeddings) per file; embeddings is a
+                float32 array with one row per chunk
+            chunk_ids: IDs of the chunks per file (None = chunks are complete
+                chunk lists and IDs are built with make_chunk_ids)
+        """
+        with self._lock:
+            super().add_chunks_bulk(files, chunk_ids)
+            count = int(self._live.sum())
+            if (count >= _MIN_TRAIN_CHUNKS
+                    and count >= self._trained_count * self.config.ivf_recluster_growth):
+                self.recluster()
+
+    def recluster(self):
+        """Cluster the current vectors and reassign every chunk to a list."""
+        with self._lock:
+            self._sync()
+            live_slots = np.flatnonzero(self._live)
+            if len(live_slots) == 0:
+                return
+
+            num_lists = self.config.ivf_lists or int(math.sqrt(len(live_slots)))
+            num_lists = max(1, min(num_lists, len(live_slots)))
+            sample_size = min(len(live_slots), num_lists * _TRAIN_POINTS_PER_LIST)
+            sample = np.sort(np.random.default_rng(0).choice(
+                live_slots, size=sample_size, replace=False
+            ))
+
+            logger.info(
+                f"Clustering {len(live_slots)} chunks into {num_lists} lists "
+                f"(trained on {sample_size})"
+            )
+            centroids = train_kmeans(np.asarray(self._matrix[sample]), num_lists)
+
+            lists = self._arrays["lists"]
+            for start in range(0, len(live_slots), _ASSIGN_BLOCK):
+                block = live_slots[start:start + _ASSIGN_BLOCK]
+                lists[block] = assign_lists(self._matrix[block], centroids)
+            lists.flush()
+
+            tmp_path = self.persist_dir / "centroids.tmp.npy"
+            np.save(tmp_path, centroids)
+            os.replace(tmp_path, self.persist_dir / "centroids.npy")
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO settings (key, value) "
+                    "VALUES ('ivf_trained_count', ?)",
+                    (str(len(live_slots)),)
+                )
+
+            self._centroids = centroids
+            self._trained_count = len(live_slots)
+            self._lists_dirty = True
+
+    def _build_inverted_lists(self):
+        """Group the live slots by list (caller holds _lock)."""
+        live_slots = np.flatnonzero(self._live)
+        lists = np.asarray(self._arrays["lists"][live_slots])
+        order = np.argsort(lists, kind="stable")
+        self._list_slots = live_slots[order]
+        self._list_offsets = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+        self._lists_dirty = False
+
+    def _scan_slots(self, query: np.ndarray, used: int) -> Optional[np.ndarray]:
+        """
+        Choose the slots of the lists nearest to the query (caller holds _lock).
+
+        Args:
+            query: Normalized query vector
+            used: Number of leading slots in use
+
+        Returns:
+            Ascending slot numbers, or None before the first clustering
+        """
+        if self._centroids is None:
+            return None
+        if self._lists_dirty:
+            self._build_inverted_lists()
+
+        probes = max(1, min(self.config.ivf_probes, len(self._centroids)))
+        probed = np.argpartition(-(self._centroids @ query), probes - 1)[:probes]
+        slots = np.concatenate([
+            self._list_slots[self._list_offsets[i]:self._list_offsets[i + 1]]
+            for i in probed
+        ])
+        slots.sort()
+        return slots[slots < used]
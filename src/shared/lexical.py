@@ -0,0 +1,81 @@
+"""N-gram text normalization for the full-text (BM25) index."""
+
+import re
+from typing import List
+
+
+# Runs of Japanese/Chinese characters, which are not separated by spaces
+_CJK_RUN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]+"
+)
+# Word characters outside CJK runs (split on punctuation such as _ . -)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _bigrams(run: str) -> List[str]:
+    """
+    Split a CJK run into overlapping character bigrams.
+
+    Args:
+        run: Run of CJK characters
+
+    Returns:
+        Bigrams, or the run itself if it is a single character
+    """
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index tokens: CJK bigrams and lowercased words.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Tokens in order of appearance
+    """
+    tokens = []
+    position = 0
+    for match in _CJK_RUN.finditer(text):
+        tokens.extend(word.lower() for word in _WORD.findall(text[position:match.start()]))
+        tokens.extend(_bigrams(match.group()))
+        position = match.end()
+    tokens.extend(word.lower() for word in _WORD.findall(text[position:]))
+    return tokens
+
+
+def ngram_text(text: str) -> str:
+    """
+    Convert text to the space-separated tokens stored in the FTS5 index.
+
+    FTS5's unicode61 tokenizer then splits on the spaces, so Japanese text
+    is matched by bigrams (two-character words included) and identifiers
+    such as max_chunk_chars by their parts.
+
+    Args:
+        text: Text to index
+
+    Returns:
+        Space-separated tokens
+    """
+    return " ".join(tokenize(text))
+
+
+def build_match_query(query: str) -> str:
+    """
+    Build an FTS5 MATCH expression for a search query.
+
+    Every distinct token is an alternative, so chunks matching more (and
+    rarer) tokens rank higher under BM25.
+
+    Args:
+        query: Search query
+
+    Returns:
+        FTS5 query, or "" if the query has no indexable tokens
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    return " OR ".join('"' + token.replace('"', '""') + '"' for token in tokens)
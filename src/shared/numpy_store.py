@@ -0,0 +1,760 @@
+"""Exact-search vector store backed by memory-mapped NumPy matrices."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chunker import Chunk
+from .config import VectorStoreConfig
+from .db import BaseVectorStore, MetadataFilter, QueryResult
+
+
+logger = logging.getLogger(__name__)
+
+# Rows allocated for the first vectors; the matrices double when full
+_INITIAL_CAPACITY = 1024
+# Values per IN (...) query (bounded by SQLite's bound parameter limit)
+_SELECT_BATCH = 500
+_SQLITE_BUSY_TIMEOUT = 30.0
+# Rows decoded at a time when scanning codes
+_SCAN_BLOCK = 2048
+# Number of set bits of every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize vectors to int8 with one scale per row.
+
+    Args:
+        vectors: float32 array of shape (n, dim)
+
+    Returns:
+        Tuple of (int8 codes of shape (n, dim), float32 scales of shape (n,))
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def truncate_dims(vectors: np.ndarray, dims: int) -> np.ndarray:
+    """
+    Keep the leading dimensions of Matryoshka embeddings and renormalize.
+
+    Args:
+        vectors: float32 array of shape (n, dim)
+        dims: Number of leading dimensions to keep
+
+    Returns:
+        L2-normalized float32 array of shape (n, dims)
+    """
+    truncated = vectors[:, :dims]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms == 0, 1.0, norms)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """
+    Quantize vectors to one sign bit per dimension.
+
+    Args:
+        vectors: float32 array of shape (n, dim)
+
+    Returns:
+        uint8 array of shape (n, ceil(dim / 8)) with packed bits
+    """
+    return np.packbits(vectors > 0, axis=1)
+
+
+class NumpyVectorStore(BaseVectorStore):
+    """
+    Exact cosine-similarity vector store for small and medium corpora.
+
+    Normalized float32 vectors live in a memory-mapped `vectors.npy` whose
+    rows are slots, and a SQLite table maps every live slot to its chunk ID
+    and metadata. A search is one matrix-vector product over the used slots,
+    so results are exact and opening the store only maps the file. Slots of
+    deleted chunks are reused by later adds.
+
+    With quantization or coarse_dims enabled, compact codes of every vector
+    are kept next to it: the leading coarse_dims dimensions (renormalized,
+    which suits Matryoshka embeddings such as Gemini's), optionally quantized
+    to int8 or 1 bit. Searches scan only the codes and rescore the best
+    candidates against the full-precision vectors, so only the codes and the
+    candidates' rows need to be in memory.
+
+    Changes committed by another process are picked up on the next call, but
+    only one process may write at a time.
+    """
+
+    def __init__(self, persist_dir: Path, config: Optional[VectorStoreConfig] = None):
+        """
+        Initialize NumpyVectorStore.
+
+        Args:
+            persist_dir: Directory holding the matrices and chunks.db
+            config: Vector store configuration (quantization and coarse_dims)
+        """
+        self.persist_dir = persist_dir
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        self.config = config or VectorStoreConfig()
+        if self.config.quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown quantization: {self.config.quantization} "
+                f"(expected one of: {', '.join(QUANTIZATIONS)})"
+            )
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(persist_dir / "chunks.db"),
+            timeout=_SQLITE_BUSY_TIMEOUT,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    slot INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    file_path TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    heading TEXT NOT NULL,
+                    content TEXT NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chunks_file_path ON chunks (file_path)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+
+        # Per-slot matrices by name ("vectors", plus the codes in use)
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._live = np.zeros(0, dtype=bool)
+        # Bumped whenever a slot is freed, so a search can tell a reused slot
+        self._slot_versions = np.zeros(0, dtype=np.int64)
+        self._data_version = None
+        with self._lock:
+            self._load()
+        logger.debug(f"NumpyVectorStore ready: {self.count()} chunks in {persist_dir}")
+
+    @property
+    def space(self) -> str:
+        """Distance function of the stored vectors (always cosine)."""
+        return "cosine"
+
+    @property
+    def _matrix(self) -> Optional[np.ndarray]:
+        """Full-precision vectors, or None before the first add."""
+        return self._arrays.get("vectors")
+
+    def _coarse_dim(self, dim: int) -> int:
+        """
+        Number of dimensions kept in the codes.
+
+        Args:
+            dim: Vector dimensionality
+
+        Returns:
+            coarse_dims if it truncates the vectors, else dim
+        """
+        coarse_dims = self.config.coarse_dims
+        return coarse_dims if 0 < coarse_dims < dim else dim
+
+    def _array_specs(self, dim: int) -> Dict[str, Tuple[np.dtype, Tuple[int, ...]]]:
+        """
+        Describe the per-slot matrices for the configured codes.
+
+        Args:
+            dim: Vector dimensionality
+
+        Returns:
+            (dtype, row shape) by array name
+        """
+        specs = {"vectors": (np.float32, (dim,))}
+        coarse_dim = self._coarse_dim(dim)
+        if self.config.quantization == "int8":
+            specs["codes"] = (np.int8, (coarse_dim,))
+            specs["scales"] = (np.float32, ())
+        elif self.config.quantization == "binary":
+            specs["codes"] = (np.uint8, ((coarse_dim + 7) // 8,))
+        elif coarse_dim < dim:
+            specs["codes"] = (np.float32, (coarse_dim,))
+        return specs
+
+    def _codes_layout(self, dim: int) -> str:
+        """
+        Describe the configured codes, to detect setting changes.
+
+        Args:
+            dim: Vector dimensionality
+
+        Returns:
+            Layout string stored in the settings table
+        """
+        return f"{self.config.quantization}:{self._coarse_dim(dim)}"
+
+    def _save_codes_layout(self, dim: int):
+        """
+        Record the layout of the codes on disk.
+
+        Args:
+            dim: Vector dimensionality
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('codes', ?)",
+                (self._codes_layout(dim),)
+            )
+
+    def _path(self, name: str) -> Path:
+        """File holding the named matrix."""
+        return self.persist_dir / f"{name}.npy"
+
+    def _load(self):
+        """Map the matrices and rebuild the live-slot mask (caller holds _lock)."""
+        self._arrays = {}
+        if self._path("vectors").exists():
+            vectors = np.load(self._path("vectors"), mmap_mode="r+")
+            self._arrays["vectors"] = vectors
+            self._load_codes(vectors)
+
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        live = np.zeros(capacity, dtype=bool)
+        slots = [row[0] for row in self._conn.execute("SELECT slot FROM chunks")]
+        if slots:
+            live[np.asarray(slots)] = True
+
+        # Slots another process freed or filled count as reused
+        previous = np.zeros(capacity, dtype=bool)
+        kept = min(capacity, len(self._live))
+        previous[:kept] = self._live[:kept]
+        self._resize_slot_versions(capacity)
+        self._slot_versions[previous != live] += 1
+        self._live = live
+
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load_codes(self, vectors: np.ndarray):
+        """
+        Map the codes, rebuilding them if the settings changed.
+
+        Args:
+            vectors: Mapped full-precision vectors
+        """
+        dim = vectors.shape[1]
+        row = self._conn.execute("SELECT value FROM settings WHERE key = 'codes'").fetchone()
+        stored = row[0] if row else f"none:{dim}"
+        specs = self._array_specs(dim)
+
+        if stored == self._codes_layout(dim):
+            for name in specs:
+                if name != "vectors" and self._path(name).exists():
+                    self._arrays[name] = np.load(self._path(name), mmap_mode="r+")
+            if all(
+                name in self._arrays and len(self._arrays[name]) == len(vectors)
+                for name in specs
+            ):
+                return
+
+        if len(specs) > 1:
+            logger.info(f"Building {self._codes_layout(dim)} codes for {len(vectors)} slots")
+        for name, (dtype, row_shape) in specs.items():
+            if name == "vectors":
+                continue
+            self._arrays.pop(name, None)
+            self._arrays[name] = self._create_array(name, dtype, (len(vectors), *row_shape))
+        for start in range(0, len(vectors), _SCAN_BLOCK):
+            end = start + _SCAN_BLOCK
+            self._write_codes(np.arange(start, min(end, len(vectors))), vectors[start:end])
+        for name in specs:
+            self._arrays[name].flush()
+
+        self._save_codes_layout(dim)
+
+    def _create_array(
+        self,
+        name: str,
+        dtype: np.dtype,
+        shape: Tuple[int, ...],
+        old: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Create (or replace) a memory-mapped matrix, copying rows of the old one.
+
+        Args:
+            name: Array name
+            dtype: Element type
+            shape: Shape of the new matrix
+            old: Matrix whose rows are copied to the front
+
+        Returns:
+            Mapped matrix
+        """
+        tmp_path = self.persist_dir / f"{name}.tmp.npy"
+        array = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+        if old is not None:
+            array[:len(old)] = old
+        array.flush()
+        del array
+
+        # The old mapping must be released before the file is replaced (Windows)
+        os.replace(tmp_path, self._path(name))
+        return np.load(self._path(name), mmap_mode="r+")
+
+    def _grow(self, dim: int, min_capacity: int):
+        """
+        Reallocate the matrices with room for at least min_capacity rows.
+
+        Args:
+            dim: Vector dimensionality
+            min_capacity: Required number of slots
+        """
+        capacity = max(_INITIAL_CAPACITY, len(self._live))
+        while capacity < min_capacity:
+            capacity *= 2
+
+        for name, (dtype, row_shape) in self._array_specs(dim).items():
+            old = self._arrays.pop(name, None)
+            self._arrays[name] = self._create_array(name, dtype, (capacity, *row_shape), old)
+            del old
+
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+        self._resize_slot_versions(capacity)
+
+        self._save_codes_layout(dim)
+        logger.debug(f"Vector files grown to {capacity} slots")
+
+    def _write_codes(self, slots: np.ndarray, vectors: np.ndarray):
+        """
+        Store the codes of normalized vectors.
+
+        Args:
+            slots: Slots to write
+            vectors: Normalized float32 vectors, one row per slot
+        """
+        if "codes" not in self._arrays:
+            return
+
+        coarse_dim = self._coarse_dim(vectors.shape[1])
+        if coarse_dim < vectors.shape[1]:
+            vectors = truncate_dims(vectors, coarse_dim)
+
+        if self.config.quantization == "int8":
+            codes, scales = quantize_int8(vectors)
+            self._arrays["codes"][slots] = codes
+            self._arrays["scales"][slots] = scales
+        elif self.config.quantization == "binary":
+            self._arrays["codes"][slots] = quantize_binary(vectors)
+        else:
+            self._arrays["codes"][slots] = vectors
+
+    def _resize_slot_versions(self, capacity: int):
+        """Resize the slot versions, keeping those of the remaining slots (caller holds _lock)."""
+        versions = np.zeros(capacity, dtype=np.int64)
+        kept = min(capacity, len(self._slot_versions))
+        versions[:kept] = self._slot_versions[:kept]
+        self._slot_versions = versions
+
+    def _sync(self):
+        """Reload if another process committed changes (caller holds _lock)."""
+        if self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+            logger.debug("Vector store changed on disk, reloading")
+            self._load()
+
+    def _find(self, column: str, values: List[str]) -> List[Tuple[str, int]]:
+        """
+        Look up the chunks whose column matches any of the values.
+
+        Args:
+            column: chunk_id or file_path
+            values: Values to match
+
+        Returns:
+            (chunk ID, slot) pairs
+        """
+        found = []
+        for start in range(0, len(values), _SELECT_BATCH):
+            batch = values[start:start + _SELECT_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.extend(self._conn.execute(
+                f"SELECT chunk_id, slot FROM chunks WHERE {column} IN ({placeholders})",
+                batch
+            ))
+        return found
+
+    def add_chunks_bulk(
+        self,
+        files: List[Tuple[str, List[Chunk], np.ndarray]],
+        chunk_ids: Optional[List[List[str]]] = None
+    ):
+        """
+        Add the chunks of many files. Chunks whose ID already exists are overwritten.
+
+        Args:
+            files: (file path, chunks, embeddings) per file; embeddings is a
+                float32 array with one row per chunk
+            chunk_ids: IDs of the chunks per file (None = chunks are complete
+                chunk lists and IDs are built with make_chunk_ids)
+        """
+        if chunk_ids is None:
+            chunk_ids = [self.make_chunk_ids(file_path, chunks) for file_path, chunks, _ in files]
+
+        rows: List[Tuple[str, str, int, str, str]] = []
+        vectors: List[np.ndarray] = []
+        for (file_path, chunks, embeddings), file_ids in zip(files, chunk_ids):
+            if not chunks or len(embeddings) == 0:
+                continue
+
+            if len(chunks) != len(embeddings):
+                raise ValueError(
+                    f"Chunks and embeddings length mismatch for {file_path}: "
+                    f"{len(chunks)} vs {len(embeddings)}"
+                )
+
+            rows.extend(
+                (chunk_id, file_path, chunk.chunk_index, chunk.heading, chunk.content)
+                for chunk, chunk_id in zip(chunks, file_ids)
+            )
+            vectors.append(np.asarray(embeddings, dtype=np.float32))
+
+        if not rows:
+            return
+
+        all_vectors = np.concatenate(vectors)
+        norms = np.linalg.norm(all_vectors, axis=1, keepdims=True)
+        all_vectors = all_vectors / np.where(norms == 0, 1.0, norms)
+        dim = all_vectors.shape[1]
+
+        with self._lock:
+            self._sync()
+
+            if self._matrix is not None and self._matrix.shape[1] != dim:
+                if self._live.any():
+                    raise ValueError(
+                        f"Embedding dimensionality changed from {self._matrix.shape[1]} "
+                        f"to {dim}; delete {self.persist_dir} and reindex"
+                    )
+                self._arrays = {}
+                self._live = np.zeros(0, dtype=bool)
+
+            existing = dict(self._find("chunk_id", [row[0] for row in rows]))
+            needed = sum(1 for row in rows if row[0] not in existing)
+            free = np.flatnonzero(~self._live)
+            if self._matrix is None or len(free) < needed:
+                self._grow(dim, len(self._live) - len(free) + needed)
+                free = np.flatnonzero(~self._live)
+
+            # Fill the lowest free slots so live rows stay packed at the front
+            free_iter = iter(free.tolist())
+            slots = np.array([
+                existing[row[0]] if row[0] in existing else next(free_iter)
+                for row in rows
+            ])
+
+            self._matrix[slots] = all_vectors
+            self._write_codes(slots, all_vectors)
+            for array in self._arrays.values():
+                array.flush()
+            with self._conn:
+                self._conn.executemany("""
+                    INSERT OR REPLACE INTO chunks
+                        (slot, chunk_id, file_path, chunk_index, heading, content)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(slot, *row) for slot, row in zip(slots.tolist(), rows)])
+            self._live[slots] = True
+
+        logger.debug(f"    Added {len(rows)} chunks from {len(files)} files")
+
+    def _delete_slots(self, found: List[Tuple[str, int]]):
+        """
+        Delete chunks and free their slots (caller holds _lock).
+
+        Args:
+            found: (chunk ID, slot) pairs from _find
+        """
+        if not found:
+            return
+
+        slots = [slot for _, slot in found]
+        with self._conn:
+            self._conn.executemany("DELETE FROM chunks WHERE slot = ?", [(slot,) for slot in slots])
+        self._live[slots] = False
+        self._slot_versions[slots] += 1
+
+    def delete_by_files(self, file_paths: List[str]):
+        """
+        Delete all chunks of many files.
+
+        Args:
+            file_paths: Relative file paths
+        """
+        with self._lock:
+            self._sync()
+            self._delete_slots(self._find("file_path", file_paths))
+
+    def delete_ids(self, ids: List[str]):
+        """
+        Delete chunks by ID.
+
+        Args:
+            ids: Chunk IDs
+        """
+        with self._lock:
+            self._sync()
+            self._delete_slots(self._find("chunk_id", ids))
+
+    def update_chunk_indices(self, indices: Dict[str, int]):
+        """
+        Record new positions of chunks whose content did not change.
+
+        Args:
+            indices: New chunk_index by chunk ID
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE chunks SET chunk_index = ? WHERE chunk_id = ?",
+                    [(index, chunk_id) for chunk_id, index in indices.items()]
+                )
+
+    def _coarse_scores(self, arrays: Dict[str, np.ndarray], query: np.ndarray) -> np.ndarray:
+        """
+        Approximate similarities from the codes.
+
+        Args:
+            arrays: Per-slot matrices truncated to the used slots
+            query: Normalized query vector
+
+        Returns:
+            float32 array with one score per slot (higher is more similar)
+        """
+        codes = arrays["codes"]
+        scores = np.empty(len(codes), dtype=np.float32)
+
+        coarse_dim = self._coarse_dim(len(query))
+        if coarse_dim < len(query):
+            query = truncate_dims(query.reshape(1, -1), coarse_dim)[0]
+
+        if self.config.quantization == "none":
+            for start in range(0, len(codes), _SCAN_BLOCK):
+                end = start + _SCAN_BLOCK
+                scores[start:end] = codes[start:end] @ query
+        elif self.config.quantization == "int8":
+            scales = arrays["scales"]
+            for start in range(0, len(codes), _SCAN_BLOCK):
+                end = start + _SCAN_BLOCK
+                block = codes[start:end].astype(np.float32)
+                scores[start:end] = (block @ query) * scales[start:end]
+        else:
+            query_bits = quantize_binary(query.reshape(1, -1))[0]
+            for start in range(0, len(codes), _SCAN_BLOCK):
+                end = start + _SCAN_BLOCK
+                hamming = _POPCOUNT[codes[start:end] ^ query_bits].sum(axis=1, dtype=np.int32)
+                scores[start:end] = -hamming
+
+        return scores
+
+    def _scan_slots(self, query: np.ndarray, used: int) -> Optional[np.ndarray]:
+        """
+        Choose the slots a query scans (caller holds _lock).
+
+        Args:
+            query: Normalized query vector
+            used: Number of leading slots in use
+
+        Returns:
+            Ascending slot numbers, or None to scan every used slot
+        """
+        return None
+
+    def _filtered_slots(self, where: MetadataFilter) -> np.ndarray:
+        """
+        Look up the slots of the chunks matching a filter (caller holds _lock).
+
+        Args:
+            where: Metadata filter
+
+        Returns:
+            Ascending slot numbers
+        """
+        conditions = []
+        params = []
+        if where.file_paths is not None:
+            conditions.append("file_path IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(where.file_paths))
+        if where.headings is not None:
+            conditions.append("heading IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(where.headings))
+        sql = "SELECT slot FROM chunks"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = self._conn.execute(sql + " ORDER BY slot", params)
+        return np.fromiter((row[0] for row in rows), dtype=np.int64)
+
+    def query(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        search_ef: Optional[int] = None,
+        where: Optional[MetadataFilter] = None
+    ) -> List[QueryResult]:
+        """
+        Search for the most similar chunks by cosine similarity.
+
+        Without codes every vector is compared exactly. With them, the codes
+        are scanned and the best candidates are rescored exactly. A filter is
+        resolved to slots in chunks.db, so only matching chunks are scanned.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            search_ef: Number of candidates to rescore when codes are used
+                (default: top_k * VectorStoreConfig.rescore_factor)
+            where: Only return chunks matching this filter
+
+        Returns:
+            List of QueryResult objects, nearest first
+        """
+        if where is not None and where.matches_nothing():
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self._lock:
+            self._sync()
+            live_slots = np.flatnonzero(self._live)
+            if len(live_slots) == 0 or top_k <= 0:
+                return []
+            used = int(live_slots[-1]) + 1
+            arrays = {name: array[:used] for name, array in self._arrays.items()}
+            live = self._live[:used].copy()
+            versions = self._slot_versions[:used].copy()
+            scan = self._scan_slots(query, used)
+            if where is not None:
+                allowed = self._filtered_slots(where)
+                allowed = allowed[allowed < used]
+                if scan is None or len(allowed) <= len(scan):
+                    scan = allowed
+                else:
+                    narrowed = np.intersect1d(scan, allowed, assume_unique=True)
+                    # Too few matches in the probed lists: scan the whole scope
+                    scan = narrowed if len(narrowed) >= top_k else allowed
+
+        # Scoring runs outside the lock so concurrent searches overlap
+        if scan is not None:
+            live = live[scan]
+        num_live = int(live.sum())
+        if num_live == 0:
+            return []
+
+        k = min(top_k, num_live)
+        if "codes" in arrays:
+            coarse = self._coarse_scores({
+                name: arrays[name] if scan is None else arrays[name][scan]
+                for name in ("codes", "scales") if name in arrays
+            }, query)
+            coarse[~live] = -np.inf
+            num_candidates = min(
+                num_live,
+                max(top_k * max(1, self.config.rescore_factor), search_ef or 0)
+            )
+            picked = np.argpartition(-coarse, num_candidates - 1)[:num_candidates]
+            candidates = picked if scan is None else scan[picked]
+            # Ascending slots read the memory-mapped vectors sequentially
+            candidates.sort()
+            candidate_scores = arrays["vectors"][candidates] @ query
+        else:
+            candidates = np.arange(used) if scan is None else scan
+            vectors = arrays["vectors"] if scan is None else arrays["vectors"][scan]
+            candidate_scores = vectors @ query
+            candidate_scores[~live] = -np.inf
+
+        best = np.argpartition(-candidate_scores, k - 1)[:k]
+        best = best[np.argsort(-candidate_scores[best], kind="stable")]
+        best_pairs = list(zip(candidates[best].tolist(), candidate_scores[best].tolist()))
+
+        with self._lock:
+            self._sync()
+            # A slot freed while the search was running holds another chunk or none
+            best_pairs = [
+                (slot, score) for slot, score in best_pairs
+                if slot < len(self._slot_versions) and self._slot_versions[slot] == versions[slot]
+            ]
+            if not best_pairs:
+                return []
+            best_slots = [slot for slot, _ in best_pairs]
+            placeholders = ",".join("?" * len(best_slots))
+            rows = {
+                row[0]: row[1:]
+                for row in self._conn.execute(
+                    f"SELECT slot, file_path, chunk_index, heading, content "
+                    f"FROM chunks WHERE slot IN ({placeholders})",
+                    best_slots
+                )
+            }
+
+        results = []
+        for slot, score in best_pairs:
+            if slot not in rows:
+                # Deleted while the search was running
+                continue
+            file_path, chunk_index, heading, content = rows[slot]
+            results.append(QueryResult(
+                file_path=file_path,
+                content=content,
+                heading=heading,
+                distance=float(1.0 - score),
+                chunk_index=chunk_index
+            ))
+        return results
+
+    def get_all_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Read every stored chunk vector.
+
+        Returns:
+            Tuple of (chunk IDs, float32 array with one row per chunk)
+        """
+        with self._lock:
+            self._sync()
+            rows = self._conn.execute("SELECT chunk_id, slot FROM chunks ORDER BY slot").fetchall()
+            if not rows:
+                return [], np.empty((0, 0), dtype=np.float32)
+            slots = [slot for _, slot in rows]
+            return [chunk_id for chunk_id, _ in rows], np.array(self._matrix[slots])
+
+    def count(self) -> int:
+        """
+        Get total number of chunks in the store.
+
+        Returns:
+            Number of chunks
+        """
+        with self._lock:
+            self._sync()
+            return int(self._live.sum())
+
+    def close(self):
+        """Close the metadata database and unmap the matrices."""
+        with self._lock:
+            self._arrays = {}
+            self._conn.close()
@@ -0,0 +1,104 @@
+"""Dynamic micro-batching of concurrent query embeddings."""
+
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from .embedder import Embedder
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent query embeddings into batched API requests.
+
+    Queries arriving within max_wait_ms of each other are sent together as a
+    single RETRIEVAL_QUERY request of up to max_batch_size texts, and each
+    caller's future is resolved with its own vector. Must be used from a single
+    event loop.
+    """
+
+    def __init__(self, embedder: Embedder, max_wait_ms: float = 5.0, max_batch_size: int = 32):
+        """
+        Initialize QueryBatcher.
+
+        Args:
+            embedder: Embedder instance
+            max_wait_ms: Maximum time to hold a query waiting for others
+            max_batch_size: Maximum number of queries per request
+                (capped at EmbeddingConfig.batch_size)
+        """
+        self.embedder = embedder
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, min(max_batch_size, embedder.embedding_config.batch_size))
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Keep references so running batches are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, query: str) -> np.ndarray:
+        """
+        Embed a query, batched with other concurrent queries.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Embedding vector
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send all pending queries as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        """
+        Embed a batch and resolve the callers' futures.
+
+        Args:
+            batch: Pending (query, future) pairs
+        """
+        # Identical concurrent queries only need to be sent once
+        texts = list(dict.fromkeys(query for query, _ in batch))
+        logger.debug(f"Embedding {len(texts)} queries for {len(batch)} callers in one batch")
+
+        try:
+            embeddings = await self.embedder.embed_texts_async(
+                texts,
+                task_type=self.embedder.embedding_config.task_type_query
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        vectors = dict(zip(texts, embeddings))
+        for query, future in batch:
+            if not future.done():
+                future.set_result(vectors[query])
@@ -0,0 +1,219 @@
+"""In-memory LRU cache for query embeddings."""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache
+
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings with optional TTL and on-disk persistence.
+
+    Keys are built from the normalized query text, model and dimensionality
+    only, so one cache can be shared by every index that uses the same
+    embedding settings.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 0.0,
+        persist_path: Optional[Path] = None,
+        task_type: str = "RETRIEVAL_QUERY"
+    ):
+        """
+        Initialize QueryEmbeddingCache.
+
+        Args:
+            max_entries: Maximum number of cached queries
+            ttl_seconds: Entry lifetime in seconds (0 = no expiry)
+            persist_path: SQLite file to persist entries to (None = memory only)
+            task_type: Task type stored with persisted entries
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.task_type = task_type
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # key -> (vector, stored_at)
+        self._entries: OrderedDict = OrderedDict()
+
+        self._store = None
+        if persist_path is not None:
+            self._store = EmbeddingCache(persist_path, max_entries)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Normalize query text so trivially different spellings share an entry.
+
+        Applies NFKC (full-width/half-width folding) and collapses whitespace.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Normalized query text
+        """
+        return " ".join(unicodedata.normalize("NFKC", query).split())
+
+    @staticmethod
+    def make_key(normalized_query: str, model: str, dimensionality: int) -> Tuple[str, str, int]:
+        """
+        Build the cache key for a normalized query.
+
+        Args:
+            normalized_query: Query text returned by normalize()
+            model: Embedding model name
+            dimensionality: Output dimensionality
+
+        Returns:
+            Cache key
+        """
+        return (EmbeddingCache.hash_text(normalized_query), model, dimensionality)
+
+    @property
+    def persistent(self) -> bool:
+        """Whether misses in memory are looked up on disk."""
+        return self._store is not None
+
+    def get_in_memory(self, key: Tuple[str, str, int]) -> Optional[np.ndarray]:
+        """
+        Look up a query embedding in memory only, counting hits.
+
+        Cheap enough to call on the event loop. A None result is not counted
+        as a miss; follow it with get(), which also consults the persistent
+        store and handles expired entries.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Embedding vector, or None if not in memory or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1]):
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[np.ndarray]:
+        """
+        Look up a query embedding, counting the hit or miss.
+
+        Blocks on SQLite when persistence is enabled and the entry is not in
+        memory.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Embedding vector, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._store is not None:
+                entry = self._load(key)
+
+            if entry is not None and self._expired(entry[1]):
+                self._entries.pop(key)
+                if self._store is not None:
+                    text_hash, model, dimensionality = key
+                    self._store.delete_many([text_hash], model, dimensionality, self.task_type)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[str, str, int], vector: np.ndarray):
+        """
+        Store a query embedding, evicting the least recently used entry.
+
+        Args:
+            key: Cache key from make_key()
+            vector: Embedding vector
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (vector, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+            if self._store is not None:
+                text_hash, model, dimensionality = key
+                self._store.put_many({text_hash: vector}, model, dimensionality, self.task_type)
+
+    def _load(self, key: Tuple[str, str, int]) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Load an entry from the persistent store into memory.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (vector, stored_at) tuple, or None if not persisted
+        """
+        text_hash, model, dimensionality = key
+        vector = self._store.get_many([text_hash], model, dimensionality, self.task_type)[0]
+        if vector is None:
+            return None
+
+        # Persisted entries are treated as fresh when reloaded
+        entry = (vector, time.time())
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _expired(self, stored_at: float) -> bool:
+        """
+        Check whether an entry has outlived the TTL.
+
+        Args:
+            stored_at: Time the entry was stored
+
+        Returns:
+            True if the entry is expired
+        """
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries)
+            }
+
+    def close(self):
+        """Close the persistent store, if any."""
+        if self._store is not None:
+            self._store.close()
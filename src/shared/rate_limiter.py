@@ -0,0 +1,85 @@
+"""Token-bucket rate limiting for embedding API requests."""
+
+import threading
+import time
+
+
+class _Bucket:
+    """Single token bucket refilled continuously at `limit` per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, cost: float, now: float) -> float:
+        """
+        Take `cost` from the bucket, going into debt if necessary.
+
+        Args:
+            cost: Amount to consume
+            now: Current monotonic time
+
+        Returns:
+            Seconds until the debt is repaid (0 if none)
+        """
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A single request larger than the bucket can never fit; cap it so it
+        # waits for a full bucket instead of forever
+        self.level -= min(cost, self.capacity)
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter on requests/minute and tokens/minute.
+
+    Callers reserve capacity before sending a request and wait for the
+    returned delay. Reservations are granted in call order, so a limiter can be
+    shared by every thread (and event loop) talking to the same API quota.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Initialize RateLimiter.
+
+        Args:
+            requests_per_minute: Maximum requests per minute (0 = unlimited)
+            tokens_per_minute: Maximum tokens per minute (0 = unlimited)
+        """
+        self._lock = threading.Lock()
+        self._requests = _Bucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = _Bucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve capacity for one request.
+
+        Args:
+            tokens: Estimated tokens in the request
+
+        Returns:
+            Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            return delay
+
+    def acquire(self, tokens: int):
+        """
+        Reserve capacity for one request and block until it may be sent.
+
+        Args:
+            tokens: Estimated tokens in the request
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
@@ -1,16 +1,58 @@
-"""Semantic search module."""
+"""Search module: semantic, lexical (BM25) and hybrid retrieval."""
 
+import asyncio
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import logging
 
+import numpy as np
+
 from .embedder import Embedder
-from .db import VectorStore
+from .db import BaseVectorStore, FileDB, MetadataFilter, QueryResult, SearchFilters, distance_to_score
+from .query_batcher import QueryBatcher
+from .query_cache import QueryEmbeddingCache
 
 
 logger = logging.getLogger(__name__)
 
 
+# Search modes: embeddings only, BM25 only, or both fused by reciprocal rank
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+# Rank offset of reciprocal rank fusion; damps the weight of the top ranks
+_RRF_K = 60
+# Minimum number of candidates taken from each list before fusing
+_FUSION_DEPTH = 50
+
+
+def _depth(top_k: int, mode: str) -> int:
+    """
+    Number of candidates to fetch from each retriever.
+
+    Args:
+        top_k: Number of results requested
+        mode: Search mode
+
+    Returns:
+        top_k, or at least _FUSION_DEPTH in hybrid mode
+    """
+    return max(top_k, _FUSION_DEPTH) if mode == "hybrid" else top_k
+
+
+def bm25_to_score(rank: float) -> float:
+    """
+    Convert an FTS5 BM25 rank to a similarity score in [0, 1).
+
+    Args:
+        rank: bm25() value (negative, lower is better)
+
+    Returns:
+        s / (1 + s) for s = -rank
+    """
+    relevance = max(0.0, -rank)
+    return relevance / (1.0 + relevance)
+
+
 @dataclass
 class SearchResult:
     """Search result with metadata."""
@@ -22,51 +64,508 @@ class SearchResult:
 
 
 class Searcher:
-    """Semantic search engine."""
+    """Semantic, lexical (BM25) and hybrid search engine."""
     
-    def __init__(self, embedder: Embedder, vector_store: VectorStore):
+    def __init__(
+        self,
+        embedder: Embedder,
+        vector_store: BaseVectorStore,
+        executor: Optional[Executor] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        query_batcher: Optional[QueryBatcher] = None,
+        file_db: Optional[FileDB] = None,
+        mode: str = "vector"
+    ):
         """
         Initialize Searcher.
         
         Args:
             embedder: Embedder instance
-            vector_store: VectorStore instance
+            vector_store: Vector store instance
+            executor: Executor for blocking vector store calls in search_async
+                (default: the event loop's default executor)
+            query_cache: Optional query embedding cache
+            query_batcher: Optional batcher coalescing concurrent query
+                embeddings in search_async
+            file_db: FileDB of the indexed files, used to resolve search
+                filters and for lexical search (required for both)
+            mode: Default search mode, one of SEARCH_MODES
+
+        Raises:
+            ValueError: If mode is unknown
         """
         self.embedder = embedder
         self.vector_store = vector_store
+        self.executor = executor
+        self.query_cache = query_cache
+        self.query_batcher = query_batcher
+        self.file_db = file_db
+        self.mode = self._check_mode(mode)
+        # (normalized query, top_k, search_ef, filters, mode) -> running search shared by identical requests
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.coalesced_count = 0
     
-    def search(self, query: str, top_k: int = 5) -> List[SearchResult]:
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        search_ef: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+        mode: Optional[str] = None
+    ) -> List[SearchResult]:
         """
-        Search for documents similar to the query.
+        Search for documents matching the query.
         
         Args:
             query: Search query
             top_k: Number of results to return
+            search_ef: HNSW search breadth for this query
+                (default: ChromaDBConfig.hnsw_search_ef); higher is slower
+                but more accurate
+            filters: Restrict results by path, extension or heading
+            mode: "vector", "hybrid" or "lexical" (default: the searcher's mode)
             
         Returns:
             List of SearchResult objects, sorted by score (descending)
+
+        Raises:
+            ValueError: If mode is unknown, or filters or a lexical mode are
+                requested without a FileDB
+        """
+        mode = self._check_mode(mode or self.mode)
+        where = self._resolve_filters(filters)
+        if where is not None and where.matches_nothing():
+            return []
+
+        lexical_results = None
+        if mode != "vector":
+            lexical_results = self._search_text(query, top_k, mode, where)
+            if mode == "lexical":
+                return self._combine([], lexical_results, top_k)
+
+        try:
+            query_results = self._search_vectors(query, top_k, search_ef, where, mode)
+        except Exception as e:
+            if lexical_results is None:
+                raise
+            logger.warning(f"Vector search failed; returning lexical results only: {e}")
+            query_results = []
+
+        return self._combine(query_results, lexical_results, top_k)
+
+    def _search_vectors(
+        self,
+        query: str,
+        top_k: int,
+        search_ef: Optional[int],
+        where: Optional[MetadataFilter],
+        mode: str
+    ) -> List[QueryResult]:
+        """
+        Embed the query and search the vector store.
+
+        Args:
+            query: Search query
+            top_k: Number of results requested
+            search_ef: HNSW search breadth for this query
+            where: Resolved metadata filter
+            mode: Search mode, which sets the retrieval depth
+
+        Returns:
+            Vector store results, nearest first
         """
         # Check if index is empty
         if self.vector_store.count() == 0:
             logger.warning("Vector store is empty. No results to return.")
             return []
+
+        # Generate query embedding (cached)
+        normalized, key, query_embedding = self._lookup_query(query)
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_query(normalized)
+            self._store_query(key, query_embedding)
         
-        # Generate query embedding
-        query_embedding = self.embedder.embed_query(query)
-        
-        if not query_embedding:
+        if query_embedding is None or len(query_embedding) == 0:
             logger.error("Failed to generate query embedding")
             return []
         
         # Search in vector store
-        query_results = self.vector_store.query(query_embedding, top_k)
-        
+        return self.vector_store.query(query_embedding, _depth(top_k, mode), search_ef, where)
+
+    async def search_async(
+        self,
+        query: str,
+        top_k: int = 5,
+        search_ef: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+        mode: Optional[str] = None
+    ) -> List[SearchResult]:
+        """
+        Search for documents without blocking the event loop.
+
+        The query embedding uses the async API and vector store and FileDB
+        calls run on the executor. Concurrent identical requests share one
+        computation.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            search_ef: HNSW search breadth for this query (see search)
+            filters: Restrict results by path, extension or heading
+            mode: "vector", "hybrid" or "lexical" (default: the searcher's mode)
+
+        Returns:
+            List of SearchResult objects, sorted by score (descending)
+
+        Raises:
+            ValueError: If mode is unknown (see search)
+        """
+        mode = self._check_mode(mode or self.mode)
+        filters_key = None
+        if filters is not None and not filters.is_empty():
+            filters_key = (
+                filters.path_prefix, filters.path_glob, tuple(filters.extensions), filters.heading
+            )
+        key = (QueryEmbeddingCache.normalize(query), top_k, search_ef, filters_key, mode)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._search_async(query, top_k, search_ef, filters, mode))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget_inflight(key, done))
+        else:
+            self.coalesced_count += 1
+            logger.debug(f"Joining in-flight search for query='{query}', top_k={top_k}")
+
+        # Shield so one caller's cancellation does not cancel the shared search
+        results = await asyncio.shield(task)
+        return list(results)
+
+    def _forget_inflight(self, key: tuple, task: asyncio.Task):
+        """
+        Remove a finished search from the in-flight table.
+
+        Args:
+            key: In-flight key
+            task: Finished task
+        """
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _search_async(
+        self,
+        query: str,
+        top_k: int,
+        search_ef: Optional[int],
+        filters: Optional[SearchFilters],
+        mode: str
+    ) -> List[SearchResult]:
+        """
+        Run one async search (see search_async).
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            search_ef: HNSW search breadth for this query
+            filters: Restrict results by path, extension or heading
+            mode: Search mode
+
+        Returns:
+            List of SearchResult objects, sorted by score (descending)
+        """
+        loop = asyncio.get_running_loop()
+
+        where = await loop.run_in_executor(self.executor, self._resolve_filters, filters)
+        if where is not None and where.matches_nothing():
+            return []
+
+        lexical_results = None
+        if mode != "vector":
+            lexical_results = await loop.run_in_executor(
+                self.executor, self._search_text, query, top_k, mode, where
+            )
+            if mode == "lexical":
+                return self._combine([], lexical_results, top_k)
+
+        try:
+            query_results = await self._search_vectors_async(query, top_k, search_ef, where, mode)
+        except Exception as e:
+            if lexical_results is None:
+                raise
+            logger.warning(f"Vector search failed; returning lexical results only: {e}")
+            query_results = []
+
+        return self._combine(query_results, lexical_results, top_k)
+
+    async def _search_vectors_async(
+        self,
+        query: str,
+        top_k: int,
+        search_ef: Optional[int],
+        where: Optional[MetadataFilter],
+        mode: str
+    ) -> List[QueryResult]:
+        """
+        Embed the query and search the vector store without blocking.
+
+        Args:
+            query: Search query
+            top_k: Number of results requested
+            search_ef: HNSW search breadth for this query
+            where: Resolved metadata filter
+            mode: Search mode, which sets the retrieval depth
+
+        Returns:
+            Vector store results, nearest first
+        """
+        loop = asyncio.get_running_loop()
+
+        # Check if index is empty
+        if await loop.run_in_executor(self.executor, self.vector_store.count) == 0:
+            logger.warning("Vector store is empty. No results to return.")
+            return []
+
+        # Generate query embedding (cached); only a persistent cache miss
+        # touches SQLite, so that lookup runs on the executor
+        normalized, key = self._query_key(query)
+        query_embedding = None
+        if key is not None:
+            query_embedding = self.query_cache.get_in_memory(key)
+            if query_embedding is None and self.query_cache.persistent:
+                query_embedding = await loop.run_in_executor(
+                    self.executor, self.query_cache.get, key
+                )
+            elif query_embedding is None:
+                query_embedding = self.query_cache.get(key)
+        if query_embedding is None:
+            if self.query_batcher is not None:
+                query_embedding = await self.query_batcher.embed(normalized)
+            else:
+                query_embedding = await self.embedder.embed_query_async(normalized)
+            if key is not None and len(query_embedding):
+                await loop.run_in_executor(
+                    self.executor, self._store_query, key, query_embedding
+                )
+
+        if query_embedding is None or len(query_embedding) == 0:
+            logger.error("Failed to generate query embedding")
+            return []
+
+        # Search in vector store
+        return await loop.run_in_executor(
+            self.executor, self.vector_store.query,
+            query_embedding, _depth(top_k, mode), search_ef, where
+        )
+
+    @staticmethod
+    def _check_mode(mode: str) -> str:
+        """
+        Validate a search mode.
+
+        Args:
+            mode: Search mode
+
+        Returns:
+            The mode
+
+        Raises:
+            ValueError: If mode is not one of SEARCH_MODES
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode: {mode} (expected one of {', '.join(SEARCH_MODES)})"
+            )
+        return mode
+
+    def _search_text(
+        self,
+        query: str,
+        top_k: int,
+        mode: str,
+        where: Optional[MetadataFilter]
+    ) -> List[QueryResult]:
+        """
+        Rank chunks by BM25 in the FileDB full-text index.
+
+        Args:
+            query: Search query
+            top_k: Number of results requested
+            mode: Search mode, which sets the retrieval depth
+            where: Resolved metadata filter
+
+        Returns:
+            FileDB results, best first
+
+        Raises:
+            ValueError: If no FileDB was given
+        """
+        if self.file_db is None:
+            raise ValueError(f"Search mode '{mode}' requires a FileDB")
+        return self.file_db.search_text(query, _depth(top_k, mode), where)
+
+    def _resolve_filters(self, filters: Optional[SearchFilters]) -> Optional[MetadataFilter]:
+        """
+        Resolve search filters to a metadata filter for the vector store.
+
+        Args:
+            filters: Search filters (None or empty = no restriction)
+
+        Returns:
+            MetadataFilter, or None for no restriction
+
+        Raises:
+            ValueError: If filters are set but no FileDB was given
+        """
+        if filters is None or filters.is_empty():
+            return None
+        if self.file_db is None:
+            raise ValueError("Search filters require a FileDB")
+        where = self.file_db.resolve_filters(filters)
+        logger.debug(
+            f"Filters {filters} matched "
+            f"{'all' if where.file_paths is None else len(where.file_paths)} files, "
+            f"{'all' if where.headings is None else len(where.headings)} headings"
+        )
+        return where
+
+    def _query_key(self, query: str) -> Tuple[str, Optional[tuple]]:
+        """
+        Normalize a query and build its query cache key.
+
+        The normalized text is embedded with or without a cache, so searches
+        coalesced by search_async on the normalized query get identical results.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Tuple of (text to embed, cache key or None if caching is disabled)
+        """
+        normalized = QueryEmbeddingCache.normalize(query)
+        if self.query_cache is None:
+            return normalized, None
+
+        key = QueryEmbeddingCache.make_key(
+            normalized,
+            self.embedder.model_id,
+            self.embedder.dimensions
+        )
+        return normalized, key
+
+    def _lookup_query(
+        self,
+        query: str
+    ) -> Tuple[str, Optional[tuple], Optional[np.ndarray]]:
+        """
+        Normalize a query and look its embedding up in the query cache.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Tuple of (text to embed, cache key or None, cached vector or None)
+        """
+        normalized, key = self._query_key(query)
+        if key is None:
+            return normalized, None, None
+        return normalized, key, self.query_cache.get(key)
+
+    def _store_query(self, key: Optional[tuple], query_embedding: np.ndarray):
+        """
+        Store a freshly computed query embedding in the query cache.
+
+        Args:
+            key: Cache key from _lookup_query (None if caching is disabled)
+            query_embedding: Embedding vector
+        """
+        if key is not None and len(query_embedding):
+            self.query_cache.put(key, query_embedding)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get search statistics.
+
+        Returns:
+            Dictionary with query cache hits, misses, hit_rate and size,
+            plus the number of searches coalesced into in-flight ones
+        """
+        if self.query_cache is None:
+            stats = {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0}
+        else:
+            stats = self.query_cache.stats()
+        stats["coalesced"] = self.coalesced_count
+        return stats
+
+    def _combine(
+        self,
+        query_results: List[QueryResult],
+        lexical_results: Optional[List[QueryResult]],
+        top_k: int
+    ) -> List[SearchResult]:
+        """
+        Merge vector and lexical results into the final ranking.
+
+        When both lists are non-empty they are fused by reciprocal rank
+        (score = sum of 1 / (_RRF_K + rank), scaled so that ranking first in
+        both gives 1.0). When one is empty the other is returned with its
+        own scores, so hybrid search degrades to either side alone.
+
+        Args:
+            query_results: Vector store results, nearest first
+            lexical_results: BM25 results, best first (None in vector mode)
+            top_k: Number of results to return
+
+        Returns:
+            List of SearchResult objects, sorted by score (descending)
+        """
+        if not lexical_results:
+            return self._to_search_results(query_results[:top_k])
+        if not query_results:
+            return [
+                SearchResult(
+                    file_path=result.file_path,
+                    content=result.content,
+                    heading=result.heading,
+                    score=bm25_to_score(result.distance),
+                    chunk_index=result.chunk_index
+                )
+                for result in lexical_results[:top_k]
+            ]
+
+        fused: Dict[Tuple[str, int], List] = {}
+        for results in (query_results, lexical_results):
+            for rank, result in enumerate(results, start=1):
+                entry = fused.setdefault((result.file_path, result.chunk_index), [result, 0.0])
+                entry[1] += 1.0 / (_RRF_K + rank)
+
+        ranked = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)[:top_k]
+        best = 2.0 / (_RRF_K + 1)
+        return [
+            SearchResult(
+                file_path=result.file_path,
+                content=result.content,
+                heading=result.heading,
+                score=min(1.0, score / best),
+                chunk_index=result.chunk_index
+            )
+            for result, score in ranked
+        ]
+
+    def _to_search_results(self, query_results: List[QueryResult]) -> List[SearchResult]:
+        """
+        Convert vector store results to search results.
+
+        Args:
+            query_results: Results from VectorStore.query
+
+        Returns:
+            List of SearchResult objects
+        """
         # Convert to SearchResult with score conversion
         search_results = []
         for result in query_results:
-            # Convert distance to similarity score
-            # For cosine distance: similarity = 1 - distance
-            score = 1.0 - result.distance
+            # Convert distance to similarity score for the collection's space
+            score = distance_to_score(result.distance, self.vector_store.space)
             
             search_results.append(SearchResult(
                 file_path=result.file_path,
@@ -0,0 +1,244 @@
+"""Vector store spreading chunks over several independent shards."""
+
+import heapq
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chunker import Chunk
+from .db import BaseVectorStore, MetadataFilter, QueryResult
+
+
+SHARD_KEYS = ("directory", "hash")
+
+_PATH_SEPARATOR = re.compile(r"[\\/]")
+
+
+class ShardedVectorStore(BaseVectorStore):
+    """
+    Vector store that routes every file to one of several child stores.
+
+    With shard_by "directory" all files below the same top-level directory
+    share a shard, so reindexing one subtree leaves the other shards
+    untouched; with "hash" files are spread evenly by a hash of their path.
+    Queries run on every shard in parallel and the per-shard results are
+    merged by distance.
+    """
+
+    def __init__(self, shards: List[BaseVectorStore], shard_by: str = "directory"):
+        """
+        Initialize ShardedVectorStore.
+
+        Args:
+            shards: Child stores, all of the same backend and distance function
+            shard_by: "directory" (top-level directory) or "hash" (file path)
+        """
+        self.shards = shards
+        self.shard_by = shard_by
+        self.executor = ThreadPoolExecutor(
+            max_workers=len(shards),
+            thread_name_prefix="rag-shard"
+        )
+
+    @property
+    def space(self) -> str:
+        """Distance function of the shards."""
+        return self.shards[0].space
+
+    def shard_of(self, file_path: str) -> int:
+        """
+        Get the shard holding a file.
+
+        Args:
+            file_path: Relative file path
+
+        Returns:
+            Shard number
+        """
+        key = file_path
+        if self.shard_by == "directory":
+            parts = _PATH_SEPARATOR.split(file_path)
+            # Files directly in docs_dir share the "" shard key
+            key = parts[0] if len(parts) > 1 else ""
+        return zlib.crc32(key.encode("utf-8")) % len(self.shards)
+
+    def _shard_of_id(self, chunk_id: str) -> int:
+        """
+        Get the shard holding a chunk from the file path in its ID.
+
+        Args:
+            chunk_id: Chunk ID ("{file_path}::...")
+
+        Returns:
+            Shard number
+        """
+        return self.shard_of(chunk_id.rsplit("::", 1)[0])
+
+    def add_chunks_bulk(
+        self,
+        files: List[Tuple[str, List[Chunk], np.ndarray]],
+        chunk_ids: Optional[List[List[str]]] = None
+    ):
+        """
+        Add the chunks of many files to their shards.
+
+        Args:
+            files: (file path, chunks, embeddings) per file; embeddings is a
+                float32 array with one row per chunk
+            chunk_ids: IDs of the chunks per file (None = chunks are complete
+                chunk lists and IDs are built with make_chunk_ids)
+        """
+        if chunk_ids is None:
+            chunk_ids = [self.make_chunk_ids(file_path, chunks) for file_path, chunks, _ in files]
+
+        by_shard: Dict[int, Tuple[list, list]] = {}
+        for item, file_ids in zip(files, chunk_ids):
+            shard_files, shard_ids = by_shard.setdefault(self.shard_of(item[0]), ([], []))
+            shard_files.append(item)
+            shard_ids.append(file_ids)
+
+        for shard, (shard_files, shard_ids) in by_shard.items():
+            self.shards[shard].add_chunks_bulk(shard_files, chunk_ids=shard_ids)
+
+    def delete_by_files(self, file_paths: List[str]):
+        """
+        Delete all chunks of many files from their shards.
+
+        Args:
+            file_paths: Relative file paths
+        """
+        by_shard: Dict[int, List[str]] = {}
+        for file_path in file_paths:
+            by_shard.setdefault(self.shard_of(file_path), []).append(file_path)
+        for shard, paths in by_shard.items():
+            self.shards[shard].delete_by_files(paths)
+
+    def delete_ids(self, ids: List[str]):
+        """
+        Delete chunks by ID from their shards.
+
+        Args:
+            ids: Chunk IDs
+        """
+        by_shard: Dict[int, List[str]] = {}
+        for chunk_id in ids:
+            by_shard.setdefault(self._shard_of_id(chunk_id), []).append(chunk_id)
+        for shard, shard_ids in by_shard.items():
+            self.shards[shard].delete_ids(shard_ids)
+
+    def update_chunk_indices(self, indices: Dict[str, int]):
+        """
+        Record new positions of chunks whose content did not change.
+
+        Args:
+            indices: New chunk_index by chunk ID
+        """
+        by_shard: Dict[int, Dict[str, int]] = {}
+        for chunk_id, index in indices.items():
+            by_shard.setdefault(self._shard_of_id(chunk_id), {})[chunk_id] = index
+        for shard, shard_indices in by_shard.items():
+            self.shards[shard].update_chunk_indices(shard_indices)
+
+    def query(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        search_ef: Optional[int] = None,
+        where: Optional[MetadataFilter] = None
+    ) -> List[QueryResult]:
+        """
+        Search the shards in parallel and merge the results.
+
+        A filter on file paths is split by shard, so only the shards holding
+        matching files are searched.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            search_ef: Passed on to every shard
+            where: Only return chunks matching this filter
+
+        Returns:
+            List of QueryResult objects, nearest first
+        """
+        if where is None or where.file_paths is None:
+            targets = [(shard, where) for shard in self.shards]
+        else:
+            by_shard: Dict[int, List[str]] = {}
+            for file_path in where.file_paths:
+                by_shard.setdefault(self.shard_of(file_path), []).append(file_path)
+            targets = [
+                (self.shards[shard], MetadataFilter(file_paths=paths, headings=where.headings))
+                for shard, paths in by_shard.items()
+            ]
+
+        futures = [
+            self.executor.submit(
+                self._query_shard, shard, query_embedding, top_k, search_ef, shard_where
+            )
+            for shard, shard_where in targets
+        ]
+        results = [result for future in futures for result in future.result()]
+        return heapq.nsmallest(top_k, results, key=lambda result: result.distance)
+
+    @staticmethod
+    def _query_shard(
+        shard: BaseVectorStore,
+        query_embedding: np.ndarray,
+        top_k: int,
+        search_ef: Optional[int],
+        where: Optional[MetadataFilter]
+    ) -> List[QueryResult]:
+        """
+        Query one shard, skipping empty ones (ChromaDB rejects queries on them).
+
+        Args:
+            shard: Child store
+            query_embedding: Query vector
+            top_k: Number of results to return
+            search_ef: Candidate list size
+            where: Metadata filter for this shard
+
+        Returns:
+            List of QueryResult objects
+        """
+        if shard.count() == 0:
+            return []
+        return shard.query(query_embedding, top_k, search_ef, where)
+
+    def get_all_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Read every stored chunk vector from all shards.
+
+        Returns:
+            Tuple of (chunk IDs, float32 array with one row per chunk)
+        """
+        ids: List[str] = []
+        parts: List[np.ndarray] = []
+        for shard in self.shards:
+            shard_ids, vectors = shard.get_all_vectors()
+            if shard_ids:
+                ids.extend(shard_ids)
+                parts.append(vectors)
+
+        if not parts:
+            return ids, np.empty((0, 0), dtype=np.float32)
+        return ids, np.concatenate(parts)
+
+    def count(self) -> int:
+        """
+        Get total number of chunks in all shards.
+
+        Returns:
+            Number of chunks
+        """
+        return sum(shard.count() for shard in self.shards)
+
+    def close(self):
+        """Close every shard and stop the query threads."""
+        self.executor.shutdown(wait=False)
+        for shard in self.shards:
+            shard.close()
@@ -1,20 +1,21 @@
 """Tests for index management API endpoints."""
 
 import pytest
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
 
+from src.api.dependencies import AppState
+
 
 @pytest.fixture
-def mock_app_state():
-    """Create a mock AppState."""
+def mock_corpus():
+    """Create a mock default Corpus."""
     mock_state = MagicMock()
+    mock_state.name = "default"
+    mock_state.docs_dir = Path("/docs")
     mock_state.vector_store.count.return_value = 150
-    mock_state.file_db.get_all_files.return_value = {
-        "file1.md": MagicMock(),
-        "file2.md": MagicMock(),
-        "file3.txt": MagicMock()
-    }
+    mock_state.file_db.count_files.return_value = 3
 
     # Mock indexer.update() return value
     mock_summary = MagicMock()
@@ -24,24 +25,32 @@ def mock_app_state():
     mock_summary.unchanged = 45
     mock_summary.total_chunks = 150
     mock_summary.api_call_count = 2
-    mock_state.indexer.update.return_value = mock_summary
+    mock_summary.cache_hits = 10
+    mock_summary.cache_misses = 4
+    mock_state.indexer.update_async = AsyncMock(return_value=mock_summary)
 
     return mock_state
 
 
 @pytest.fixture
-def client(mock_app_state):
+def client(mock_corpus):
     """Create a test client with mocked dependencies."""
-    with patch('src.api.dependencies.get_app_state', return_value=mock_app_state):
+    app_state = AppState(
+        docs_dir=Path("/docs"),
+        corpora={"default": mock_corpus},
+        embedder=MagicMock(),
+        executor=MagicMock()
+    )
+    with patch('src.api.dependencies.get_app_state', return_value=app_state):
         from src.api.app import app
-        app.state.app_state = mock_app_state
+        app.state.app_state = app_state
         yield TestClient(app)
 
 
 class TestIndexRebuildEndpoint:
     """Tests for POST /api/v1/index/rebuild endpoint."""
 
-    def test_rebuild_index_success(self, client, mock_app_state):
+    def test_rebuild_index_success(self, client, mock_corpus):
         """Test successful index rebuild."""
         response = client.post(
             "/api/v1/index/rebuild",
@@ -65,23 +74,25 @@ class TestIndexRebuildEndpoint:
         assert data["unchanged"] == 45
         assert data["total_chunks"] == 150
         assert data["api_call_count"] == 2
+        assert data["cache_hits"] == 10
+        assert data["cache_misses"] == 4
         assert data["execution_time_ms"] >= 0
 
-    def test_rebuild_index_calls_indexer(self, client, mock_app_state):
-        """Test that rebuild calls indexer.update()."""
+    def test_rebuild_index_calls_indexer(self, client, mock_corpus):
+        """Test that rebuild awaits indexer.update_async()."""
         response = client.post(
             "/api/v1/index/rebuild",
             json={}
         )
 
         assert response.status_code == 200
-        mock_app_state.indexer.update.assert_called_once()
+        mock_corpus.indexer.update_async.assert_awaited_once()
 
 
 class TestIndexStatusEndpoint:
     """Tests for GET /api/v1/index/status endpoint."""
 
-    def test_index_status_success(self, client, mock_app_state):
+    def test_index_status_success(self, client, mock_corpus):
         """Test successful index status retrieval."""
         response = client.get("/api/v1/index/status")
 
@@ -94,10 +105,29 @@ class TestIndexStatusEndpoint:
         assert data["total_chunks"] == 150
         assert data["total_files"] == 3
 
-    def test_index_status_calls_correct_methods(self, client, mock_app_state):
+    def test_index_status_calls_correct_methods(self, client, mock_corpus):
         """Test that status endpoint calls correct methods."""
         response = client.get("/api/v1/index/status")
 
         assert response.status_code == 200
-        mock_app_state.vector_store.count.assert_called()
-        mock_app_state.file_db.get_all_files.assert_called()
+        mock_corpus.vector_store.count.assert_called()
+        mock_corpus.file_db.count_files.assert_called()
+
+
+class TestCorporaEndpoint:
+    """Tests for GET /api/v1/corpora endpoint."""
+
+    def test_list_corpora(self, client, mock_corpus):
+        """Test that every served corpus is listed with its size."""
+        response = client.get("/api/v1/corpora")
+
+        assert response.status_code == 200
+        assert response.json() == {"corpora": [
+            {"name": "default", "docs_dir": str(Path("/docs")), "total_chunks": 150}
+        ]}
+
+    def test_index_status_unknown_corpus(self, client):
+        """Test that an unknown corpus is rejected with 404."""
+        response = client.get("/api/v1/index/status", params={"corpus": "missing"})
+
+        assert response.status_code == 404
@@ -1,17 +1,23 @@
 """Tests for search API endpoints."""
 
 import pytest
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
 
+from src.api.dependencies import AppState
+from src.shared.db import SearchFilters
+
 
 # Mock the app state before importing the app
 @pytest.fixture
-def mock_app_state():
-    """Create a mock AppState."""
+def mock_corpus():
+    """Create a mock default Corpus."""
     mock_state = MagicMock()
+    mock_state.name = "default"
+    mock_state.docs_dir = Path("/docs")
     mock_state.vector_store.count.return_value = 100
-    mock_state.searcher.search.return_value = [
+    mock_state.searcher.search_async = AsyncMock(return_value=[
         MagicMock(
             file_path="test.md",
             heading="## Test Heading",
@@ -19,23 +25,32 @@ def mock_app_state():
             score=0.95,
             chunk_index=0
         )
-    ]
+    ])
+    mock_state.searcher.get_stats.return_value = {
+        "hits": 3, "misses": 1, "hit_rate": 0.75, "size": 1, "coalesced": 2
+    }
     return mock_state
 
 
 @pytest.fixture
-def client(mock_app_state):
+def client(mock_corpus):
     """Create a test client with mocked dependencies."""
-    with patch('src.api.dependencies.get_app_state', return_value=mock_app_state):
+    app_state = AppState(
+        docs_dir=Path("/docs"),
+        corpora={"default": mock_corpus},
+        embedder=MagicMock(),
+        executor=MagicMock()
+    )
+    with patch('src.api.dependencies.get_app_state', return_value=app_state):
         from src.api.app import app
-        app.state.app_state = mock_app_state
+        app.state.app_state = app_state
         yield TestClient(app)
 
 
 class TestSearchEndpoint:
     """Tests for POST /api/v1/search endpoint."""
 
-    def test_search_success(self, client, mock_app_state):
+    def test_search_success(self, client, mock_corpus):
         """Test successful search request."""
         response = client.post(
             "/api/v1/search",
@@ -53,7 +68,7 @@ class TestSearchEndpoint:
         assert data["total_chunks"] == 100
         assert len(data["results"]) == 1
 
-    def test_search_default_top_k(self, client, mock_app_state):
+    def test_search_default_top_k(self, client, mock_corpus):
         """Test search with default top_k value."""
         response = client.post(
             "/api/v1/search",
@@ -62,7 +77,52 @@ class TestSearchEndpoint:
 
         assert response.status_code == 200
         # Verify default top_k (5) was used
-        mock_app_state.searcher.search.assert_called_with("test query", 5)
+        mock_corpus.searcher.search_async.assert_awaited_with(
+            "test query", 5, search_ef=None, filters=SearchFilters(), mode=None
+        )
+
+    def test_search_with_search_ef(self, client, mock_corpus):
+        """Test that search_ef is passed through to the searcher."""
+        response = client.post(
+            "/api/v1/search",
+            json={"query": "test query", "top_k": 3, "search_ef": 400}
+        )
+
+        assert response.status_code == 200
+        mock_corpus.searcher.search_async.assert_awaited_with(
+            "test query", 3, search_ef=400, filters=SearchFilters(), mode=None
+        )
+
+    def test_search_with_filters(self, client, mock_corpus):
+        """Test that path, extension and heading filters reach the searcher."""
+        response = client.post(
+            "/api/v1/search",
+            json={
+                "query": "restart",
+                "path_prefix": "docs/runbooks/",
+                "path_glob": "*.md",
+                "extensions": [".md"],
+                "heading": "Rollback"
+            }
+        )
+
+        assert response.status_code == 200
+        mock_corpus.searcher.search_async.assert_awaited_with(
+            "restart", 5, search_ef=None, filters=SearchFilters(
+                path_prefix="docs/runbooks/", path_glob="*.md",
+                extensions=[".md"], heading="Rollback"
+            ), mode=None
+        )
+
+    def test_search_with_mode(self, client, mock_corpus):
+        """Test that the search mode is validated and passed to the searcher."""
+        response = client.post("/api/v1/search", json={"query": "設定", "mode": "lexical"})
+
+        assert response.status_code == 200
+        assert mock_corpus.searcher.search_async.await_args.kwargs["mode"] == "lexical"
+
+        response = client.post("/api/v1/search", json={"query": "設定", "mode": "fuzzy"})
+        assert response.status_code == 422
 
     def test_search_empty_query(self, client):
         """Test search with empty query (should fail validation)."""
@@ -98,7 +158,37 @@ class TestSearchEndpoint:
         )
         assert response.status_code == 422
 
-    def test_search_result_structure(self, client, mock_app_state):
+    def test_search_selects_corpus(self, client, mock_corpus):
+        """Test that the corpus parameter routes the search to that corpus."""
+        other = MagicMock()
+        other.name = "handbook"
+        other.vector_store.count.return_value = 7
+        other.searcher.search_async = AsyncMock(return_value=[])
+        client.app.state.app_state.corpora["handbook"] = other
+
+        response = client.post(
+            "/api/v1/search",
+            json={"query": "test", "corpus": "handbook"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["corpus"] == "handbook"
+        assert data["total_chunks"] == 7
+        other.searcher.search_async.assert_awaited_once()
+        mock_corpus.searcher.search_async.assert_not_awaited()
+
+    def test_search_unknown_corpus(self, client):
+        """Test that an unknown corpus is rejected with 404."""
+        response = client.post(
+            "/api/v1/search",
+            json={"query": "test", "corpus": "missing"}
+        )
+
+        assert response.status_code == 404
+        assert "missing" in response.json()["detail"]
+
+    def test_search_result_structure(self, client, mock_corpus):
         """Test that search result has correct structure."""
         response = client.post(
             "/api/v1/search",
@@ -118,10 +208,27 @@ class TestSearchEndpoint:
         assert "chunk_index" in result
 
 
+class TestSearchStatsEndpoint:
+    """Tests for GET /api/v1/search/stats endpoint."""
+
+    def test_search_stats(self, client, mock_corpus):
+        """Test that query cache statistics are exposed."""
+        response = client.get("/api/v1/search/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["query_cache_hits"] == 3
+        assert data["query_cache_misses"] == 1
+        assert data["query_cache_hit_rate"] == 0.75
+        assert data["query_cache_size"] == 1
+        assert data["coalesced_searches"] == 2
+
+
 class TestHealthEndpoint:
     """Tests for GET /health endpoint."""
 
-    def test_health_check(self, client, mock_app_state):
+    def test_health_check(self, client, mock_corpus):
         """Test health check endpoint."""
         response = client.get("/health")
 
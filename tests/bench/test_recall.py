@@ -0,0 +1,70 @@
+"""Tests for the recall benchmark."""
+
+import numpy as np
+import pytest
+
+from src.bench.recall import (
+    exact_search, exact_top_k, latency_percentiles, prepare_exact, recall_at_k, run_grid
+)
+
+
+def _vectors(count, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("space", ["cosine", "l2", "ip"])
+def test_exact_search_matches_naive(space):
+    """Test that exact search agrees with a naive per-pair computation."""
+    vectors = _vectors(50)
+    queries = _vectors(5, seed=1)
+
+    def naive_distance(q, v):
+        if space == "l2":
+            return float(((q - v) ** 2).sum())
+        if space == "ip":
+            return -float(q @ v)
+        return -float(q @ v / (np.linalg.norm(q) * np.linalg.norm(v)))
+
+    neighbours = exact_search(vectors, queries, 5, space)
+
+    for query, row in zip(queries, neighbours):
+        expected = sorted(range(50), key=lambda i: naive_distance(query, vectors[i]))[:5]
+        assert row.tolist() == expected
+
+
+def test_prepared_vectors_are_reused_across_queries():
+    """Test that scoring prepared vectors one query at a time matches a batch."""
+    vectors = _vectors(50)
+    queries = _vectors(5, seed=1)
+    prepared, squared_norms = prepare_exact(vectors, "cosine")
+
+    rows = [exact_top_k(prepared, squared_norms, q.reshape(1, -1), 5, "cosine")[0] for q in queries]
+
+    assert np.array_equal(np.stack(rows), exact_search(vectors, queries, 5, "cosine"))
+
+
+def test_recall_at_k():
+    """Test recall against exact neighbours."""
+    truth = np.array([[0, 1], [2, 3]])
+    assert recall_at_k([[0, 1], [2, 9]], truth) == 0.75
+
+
+def test_latency_percentiles():
+    """Test percentile summary in milliseconds."""
+    p50, p95, p99 = latency_percentiles([0.001] * 99 + [0.1])
+    assert p50 == pytest.approx(1.0)
+    assert p99 > p95 >= 1.0
+
+
+def test_run_grid_reports_every_setting():
+    """Test that every (M, ef) pair is measured and wide search is exact."""
+    vectors = _vectors(300)
+    queries = vectors[:20]
+
+    results = run_grid(vectors, queries, k=5, m_values=[4, 8], ef_values=[5, 300],
+                       construction_ef=50)
+
+    assert [(r.m, r.search_ef) for r in results] == [(4, 5), (4, 300), (8, 5), (8, 300)]
+    assert all(0.0 <= r.recall <= 1.0 for r in results)
+    assert results[1].recall == pytest.approx(1.0)
+    assert results[3].recall == pytest.approx(1.0)
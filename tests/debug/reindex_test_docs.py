@@ -17,7 +17,7 @@ if sys.platform == 'win32':
 load_dotenv()
 
 from src.shared.config import load_config
-from src.shared.db import FileDB, VectorStore
+from src.shared.db import FileDB, create_vector_store
 from src.shared.embedder import Embedder
 from src.shared.indexer import Indexer
 
@@ -44,7 +44,7 @@ def reindex_testdocs():
 
     # Initialize components
     file_db = FileDB(data_dir / "files.db")
-    vector_store = VectorStore(data_dir / "chroma", app_config.chromadb)
+    vector_store = create_vector_store(data_dir, app_config.vector_store, app_config.chromadb)
     embedder = Embedder(app_config.embedding, app_config.retry)
     indexer = Indexer(
         docs_dir, file_db, vector_store, embedder,
@@ -0,0 +1 @@
+# Fake Gemini server tests
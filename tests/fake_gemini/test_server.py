@@ -0,0 +1,85 @@
+"""Tests for the fake Gemini embedding server."""
+
+from fastapi.testclient import TestClient
+
+from src.fake_gemini.server import FakeServerConfig, create_app
+
+
+BATCH_URL = "/v1beta/models/gemini-embedding-001:batchEmbedContents"
+
+
+def _batch_body(texts, dimensionality=8):
+    """Build a batchEmbedContents request body."""
+    return {
+        "requests": [
+            {
+                "model": "models/gemini-embedding-001",
+                "content": {"parts": [{"text": text}]},
+                "outputDimensionality": dimensionality
+            }
+            for text in texts
+        ]
+    }
+
+
+def _client(**kwargs):
+    """Create a test client with zero latency."""
+    return TestClient(create_app(FakeServerConfig(latency_ms=0, seed=0, **kwargs)))
+
+
+def test_batch_embed_is_deterministic():
+    """Same text always returns the same vector."""
+    client = _client()
+
+    first = client.post(BATCH_URL, json=_batch_body(["alpha", "beta", "alpha"]))
+    second = client.post(BATCH_URL, json=_batch_body(["alpha"]))
+
+    assert first.status_code == 200
+    embeddings = first.json()["embeddings"]
+    assert len(embeddings) == 3
+    assert len(embeddings[0]["values"]) == 8
+    assert embeddings[0] == embeddings[2]
+    assert embeddings[0] != embeddings[1]
+    assert second.json()["embeddings"][0] == embeddings[0]
+
+
+def test_embed_content_single():
+    """embedContent returns a single embedding."""
+    client = _client(dimensionality=16)
+
+    response = client.post(
+        "/v1beta/models/gemini-embedding-001:embedContent",
+        json={"content": {"parts": [{"text": "hello"}]}}
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["embedding"]["values"]) == 16
+
+
+def test_injected_rate_limit_errors():
+    """error_rate_429=1 makes every request fail with RESOURCE_EXHAUSTED."""
+    client = _client(error_rate_429=1.0)
+
+    response = client.post(BATCH_URL, json=_batch_body(["a"]))
+
+    assert response.status_code == 429
+    assert response.json()["error"]["status"] == "RESOURCE_EXHAUSTED"
+    assert client.get("/stats").json()["errors"] == {"429": 1}
+
+
+def test_request_size_limits():
+    """Oversized batches and payloads are rejected with 400."""
+    client = _client(max_batch_size=2, max_payload_chars=10)
+
+    too_many = client.post(BATCH_URL, json=_batch_body(["a", "b", "c"]))
+    too_long = client.post(BATCH_URL, json=_batch_body(["x" * 11]))
+    ok = client.post(BATCH_URL, json=_batch_body(["abc", "def"]))
+
+    assert too_many.status_code == 400
+    assert too_long.status_code == 400
+    assert "payload size exceeds" in too_long.json()["error"]["message"]
+    assert ok.status_code == 200
+
+    stats = client.get("/stats").json()
+    assert stats["requests"] == 3
+    assert stats["texts"] == 2
@@ -0,0 +1,23 @@
+"""Chunk and vector factories shared by the vector store tests."""
+
+from typing import List
+
+import numpy as np
+
+from src.shared.chunker import Chunk
+
+
+def make_chunks(count: int, prefix: str = "chunk") -> List[Chunk]:
+    """Chunks "<prefix> i" with headings "# i"."""
+    return [
+        Chunk(content=f"{prefix} {i}", heading=f"# {i}", chunk_index=i)
+        for i in range(count)
+    ]
+
+
+def make_vectors(count: int, dim: int = 8, seed: int = 0, normalize: bool = False) -> np.ndarray:
+    """Random float32 vectors, optionally L2-normalized."""
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    if normalize:
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
@@ -0,0 +1,62 @@
+"""Tests for corpus module."""
+
+import pytest
+
+from src.shared.config import CorpusConfig, EmbeddingConfig, RetryConfig, load_config
+from src.shared.corpus import DEFAULT_CORPUS, get_corpus, list_corpora, open_corpus
+from src.shared.embedder import Embedder
+from src.shared.query_cache import QueryEmbeddingCache
+
+
+def _config(corpora):
+    config = load_config()
+    config.corpora = corpora
+    return config
+
+
+def test_list_corpora_resolves_paths(tmp_path):
+    """Test the default corpus and relative/explicit corpus directories."""
+    docs_dir = tmp_path / "main"
+    corpora = list_corpora(docs_dir, tmp_path / "index", _config([
+        CorpusConfig(name="handbook", docs_dir="../handbook"),
+        CorpusConfig(name="wiki", docs_dir=str(tmp_path / "wiki"), data_dir=str(tmp_path / "wiki-index")),
+    ]))
+
+    assert corpora == [
+        (DEFAULT_CORPUS, docs_dir, tmp_path / "index"),
+        ("handbook", tmp_path / "handbook", tmp_path / "handbook" / ".rag-index"),
+        ("wiki", tmp_path / "wiki", tmp_path / "wiki-index"),
+    ]
+
+    with pytest.raises(ValueError):
+        list_corpora(docs_dir, tmp_path / "index", _config([
+            CorpusConfig(name=DEFAULT_CORPUS, docs_dir="other")
+        ]))
+
+
+def test_corpora_share_embedder_and_query_cache(tmp_path):
+    """Test that each corpus searches its own index through shared components."""
+    embedder = Embedder(EmbeddingConfig(backend="hashing", output_dimensionality=64), RetryConfig())
+    query_cache = QueryEmbeddingCache(16)
+    corpora = {}
+    for name, text in [("python", "Pythonのインストール方法"), ("rust", "Rustのインストール方法")]:
+        docs_dir = tmp_path / name
+        docs_dir.mkdir()
+        (docs_dir / "guide.md").write_text(f"# {text}\n\n{text}を説明します。", encoding="utf-8")
+        corpora[name] = open_corpus(
+            name, docs_dir, docs_dir / ".rag-index", embedder, query_cache=query_cache
+        )
+        corpora[name].indexer.update()
+
+    python_results = get_corpus(corpora, "python").searcher.search("インストール", top_k=3)
+    rust_results = get_corpus(corpora, "rust").searcher.search("インストール", top_k=3)
+
+    assert [r.content for r in python_results] and all("Python" in r.content for r in python_results)
+    assert [r.content for r in rust_results] and all("Rust" in r.content for r in rust_results)
+    # The second corpus reused the query embedding of the first
+    assert query_cache.stats()["hits"] == 1
+
+    with pytest.raises(KeyError):
+        get_corpus(corpora, "go")
+    for corpus in corpora.values():
+        corpus.close()
@@ -0,0 +1,294 @@
+"""Tests for db module."""
+
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import sqlite3
+import threading
+
+import chromadb
+import pytest
+from chromadb.segment import VectorReader
+
+from src.shared.chunker import Chunk
+from src.shared.config import ChromaDBConfig
+from src.shared.db import (
+    ChunkRecord, FileDB, FileRecord, MetadataFilter, SearchFilters, VectorStore, distance_to_score
+)
+from tests.shared.helpers import make_chunks, make_vectors
+
+
+def test_new_collection_uses_configured_hnsw_settings(tmp_path):
+    """Test that the collection is created with the HNSW metadata."""
+    config = ChromaDBConfig(hnsw_space="cosine", hnsw_M=8, hnsw_construction_ef=50)
+    store = VectorStore(tmp_path / "chroma", config)
+
+    metadata = store.collection.metadata
+    assert metadata["hnsw:space"] == "cosine"
+    assert metadata["hnsw:M"] == 8
+    assert metadata["hnsw:construction_ef"] == 50
+    assert metadata["hnsw:search_ef"] == config.hnsw_search_ef
+
+
+def test_legacy_collection_is_migrated(tmp_path):
+    """Test that a collection without HNSW metadata is rebuilt with its data."""
+    persist_dir = tmp_path / "chroma"
+    vectors = make_vectors(5, normalize=True)
+    legacy = chromadb.PersistentClient(path=str(persist_dir)).create_collection("documents")
+    legacy.add(
+        ids=[f"a.md::chunk_{i}" for i in range(5)],
+        embeddings=vectors.tolist(),
+        documents=[f"chunk {i}" for i in range(5)],
+        metadatas=[{"file_path": "a.md", "chunk_index": i, "heading": ""} for i in range(5)]
+    )
+
+    store = VectorStore(persist_dir, ChromaDBConfig())
+
+    assert store.collection.metadata["hnsw:space"] == "cosine"
+    assert store.count() == 5
+    results = store.query(vectors[3], top_k=1)
+    assert results[0].chunk_index == 3
+    assert results[0].distance == pytest.approx(0.0, abs=1e-5)
+    names = {c.name for c in store.client.list_collections()}
+    assert names == {"documents"}
+
+
+def test_search_ef_override_returns_top_k(tmp_path):
+    """Test that a larger per-query ef still returns exactly top_k results."""
+    store = VectorStore(tmp_path / "chroma", ChromaDBConfig(hnsw_search_ef=10))
+    vectors = make_vectors(50, normalize=True)
+    store.add_chunks("a.md", make_chunks(50), vectors)
+
+    default = store.query(vectors[7], top_k=3)
+    wide = store.query(vectors[7], top_k=3, search_ef=200)
+
+    assert len(default) == len(wide) == 3
+    assert wide[0].chunk_index == 7
+    assert [r.chunk_index for r in wide] == [r.chunk_index for r in default]
+
+
+def test_changed_search_ef_is_applied_to_existing_collection(tmp_path):
+    """Test that reopening with another search_ef updates the collection in place."""
+    persist_dir = tmp_path / "chroma"
+    first = VectorStore(persist_dir, ChromaDBConfig(hnsw_search_ef=200))
+    vectors = make_vectors(20, normalize=True)
+    first.add_chunks("a.md", make_chunks(20), vectors)
+    first.query(vectors[0], top_k=1)
+
+    store = VectorStore(persist_dir, ChromaDBConfig(hnsw_search_ef=16))
+
+    assert store.collection.id == first.collection.id
+    assert store.collection.metadata["hnsw:search_ef"] == 16
+    assert store.collection.metadata["hnsw:space"] == "cosine"
+    assert store._index_search_ef == 16
+    stored = store.client.get_collection("documents").metadata
+    assert stored["hnsw:search_ef"] == 16
+    assert stored["hnsw:space"] == "cosine"
+    segment = store.client._server._manager.get_segment(store.collection.id, VectorReader)
+    assert segment._params.search_ef == 16
+    assert segment._index.ef == 16
+    assert store.count() == 20
+    assert store.query(vectors[4], top_k=1)[0].chunk_index == 4
+
+
+@pytest.mark.parametrize("distance, space, expected", [
+    (0.2, "cosine", 0.8),
+    (0.2, "ip", 0.8),
+    (0.4, "l2", 0.8),
+    (1.5, "cosine", 0.0),
+])
+def test_distance_to_score(distance, space, expected):
+    """Test distance to score conversion for each space."""
+    assert distance_to_score(distance, space) == pytest.approx(expected)
+
+
+def test_add_chunks_bulk_respects_max_batch_size(tmp_path):
+    """Test that bulk adds are split into ChromaDB-sized calls."""
+    store = VectorStore(tmp_path / "chroma", ChromaDBConfig())
+    files = [
+        (f"doc{i}.md", make_chunks(3), make_vectors(3, seed=i, normalize=True)) for i in range(5)
+    ]
+
+    collection = store.collection
+    store.collection = MagicMock(wraps=collection)
+
+    with patch.object(
+        type(store.client), "max_batch_size", new_callable=PropertyMock, return_value=4
+    ):
+        store.add_chunks_bulk(files)
+
+    add_calls = store.collection.upsert.call_args_list
+    assert [len(call.kwargs["ids"]) for call in add_calls] == [4, 4, 4, 3]
+    assert collection.count() == 15
+
+
+def test_delete_by_files_removes_only_given_files(tmp_path):
+    """Test batched deletion by file path, including unknown paths."""
+    store = VectorStore(tmp_path / "chroma", ChromaDBConfig())
+    store.add_chunks_bulk([
+        (f"doc{i}.md", make_chunks(2), make_vectors(2, seed=i, normalize=True)) for i in range(4)
+    ])
+
+    store.delete_by_files(["doc0.md", "doc2.md", "missing.md"])
+    store.delete_by_file("also-missing.md")
+
+    remaining = store.collection.get(include=["metadatas"])["metadatas"]
+    assert sorted({m["file_path"] for m in remaining}) == ["doc1.md", "doc3.md"]
+
+
+def test_file_db_bulk_upsert_and_delete(tmp_path):
+    """Test that FileDB bulk operations insert, update and delete records."""
+    db = FileDB(tmp_path / "files.db")
+    db.upsert_files([FileRecord(path=f"doc{i}.md", hash="h", mtime=1.0) for i in range(3)])
+    db.upsert_files([FileRecord(path="doc1.md", hash="h2", mtime=2.0)])
+    db.delete_files(["doc0.md", "missing.md"])
+
+    records = db.get_all_files()
+    assert sorted(records) == ["doc1.md", "doc2.md"]
+    assert records["doc1.md"].hash == "h2"
+    db.close()
+
+
+def test_chunk_ids_are_content_derived():
+    """Test that chunk IDs ignore position and disambiguate duplicates."""
+    chunks = [
+        Chunk(content="same", heading="# A", chunk_index=0),
+        Chunk(content="other", heading="# B", chunk_index=1),
+        Chunk(content="same", heading="# A", chunk_index=2),
+    ]
+    ids = VectorStore.make_chunk_ids("doc.md", chunks)
+
+    assert len(set(ids)) == 3
+    assert ids[2] == ids[0] + "~1"
+    assert VectorStore.make_chunk_ids("doc.md", chunks[1:2]) == ids[1:2]
+    assert VectorStore.make_chunk_ids("other.md", chunks[:1]) != ids[:1]
+
+
+def test_file_db_stores_chunk_lists(tmp_path):
+    """Test that chunk rows are replaced with their file and removed with it."""
+    db = FileDB(tmp_path / "files.db")
+    record = FileRecord(path="doc.md", hash="h", mtime=1.0)
+    db.upsert_files([record], chunks={"doc.md": [
+        ChunkRecord(chunk_index=i, chunk_id=f"doc.md::chunk_{i}", content_hash=f"c{i}")
+        for i in range(3)
+    ]})
+    db.upsert_files([record], chunks={"doc.md": [
+        ChunkRecord(chunk_index=0, chunk_id="doc.md::chunk_0", content_hash="c0", heading="# A")
+    ]})
+
+    assert db.get_chunks("doc.md") == [
+        ChunkRecord(chunk_index=0, chunk_id="doc.md::chunk_0", content_hash="c0", heading="# A")
+    ]
+
+    db.delete_files(["doc.md"])
+    assert db.get_chunks("doc.md") == []
+    db.close()
+
+
+def test_file_db_resolves_filters(tmp_path):
+    """Test path prefix, glob, extension and heading resolution."""
+    db = FileDB(tmp_path / "files.db")
+    paths = ["docs/runbooks/db.md", "docs/runbooks/web.TXT", "docs/runbook.md", "notes/db.md"]
+    db.upsert_files(
+        [FileRecord(path=path, hash="h", mtime=1.0) for path in paths],
+        chunks={path: [
+            ChunkRecord(chunk_index=0, chunk_id=f"{path}::0", content_hash="c", heading="## Rollback steps"),
+            ChunkRecord(chunk_index=1, chunk_id=f"{path}::1", content_hash="c", heading=f"# {path}"),
+        ] for path in paths}
+    )
+
+    def resolve(**kwargs):
+        where = db.resolve_filters(SearchFilters(**kwargs))
+        return (
+            None if where.file_paths is None else sorted(where.file_paths),
+            None if where.headings is None else sorted(where.headings)
+        )
+
+    assert resolve(path_prefix="docs/runbooks/") == (["docs/runbooks/db.md", "docs/runbooks/web.TXT"], None)
+    assert resolve(path_prefix="./docs\\runbook") == (sorted(paths[:3]), None)
+    assert resolve(path_glob="*/db.md") == (["docs/runbooks/db.md", "notes/db.md"], None)
+    assert resolve(path_prefix="docs/", extensions=["txt"]) == (["docs/runbooks/web.TXT"], None)
+    assert resolve(heading="ROLLBACK") == (None, ["## Rollback steps"])
+    assert resolve(path_prefix="notes/", heading="#") == (
+        ["notes/db.md"], ["# notes/db.md", "## Rollback steps"]
+    )
+    assert db.resolve_filters(SearchFilters(path_prefix="missing/", heading="x")).matches_nothing()
+    db.close()
+
+
+def test_file_db_full_text_search(tmp_path):
+    """Test BM25 search over Japanese words, identifiers and filters."""
+    db = FileDB(tmp_path / "files.db")
+    texts = {
+        "setup.md": [Chunk(content="チャンクの最大文字数は max_chunk_chars で設定する", heading="# 設定", chunk_index=0)],
+        "deploy.md": [
+            Chunk(content="本番環境へのデプロイ手順", heading="# デプロイ", chunk_index=0),
+            Chunk(content="失敗したら設定を戻す", heading="## 切り戻し", chunk_index=1),
+        ],
+    }
+    db.upsert_files([FileRecord(path=path, hash="h", mtime=1.0) for path in texts], texts=texts)
+
+    def search(query, where=None):
+        return [(r.file_path, r.chunk_index) for r in db.search_text(query, 5, where)]
+
+    # Two-character words, matched by bigrams; headings weigh more
+    assert search("設定") == [("setup.md", 0), ("deploy.md", 1)]
+    assert search("手順") == [("deploy.md", 0)]
+    assert search("MAX_CHUNK_CHARS") == [("setup.md", 0)]
+    assert search("設定", MetadataFilter(file_paths=["deploy.md"])) == [("deploy.md", 1)]
+    assert search("設定", MetadataFilter(headings=["# 設定"])) == [("setup.md", 0)]
+    assert search("!?") == []
+
+    db.upsert_files([FileRecord(path="deploy.md", hash="h2", mtime=2.0)], texts={"deploy.md": []})
+    assert search("設定") == [("setup.md", 0)]
+    db.delete_files(["setup.md"])
+    assert not db.has_texts()
+    db.close()
+
+
+def test_query_pushes_metadata_filter_to_chroma(tmp_path):
+    """Test that filtered queries only return matching chunks."""
+    store = VectorStore(tmp_path / "chroma", ChromaDBConfig())
+    store.add_chunks_bulk([
+        (f"doc{i}.md", make_chunks(5), make_vectors(5, seed=i, normalize=True)) for i in range(4)
+    ])
+    query = make_vectors(1, seed=9, normalize=True)[0]
+
+    results = store.query(query, top_k=10, where=MetadataFilter(file_paths=["doc1.md", "doc3.md"]))
+    assert len(results) == 10
+    assert {r.file_path for r in results} == {"doc1.md", "doc3.md"}
+
+    results = store.query(query, top_k=10, where=MetadataFilter(file_paths=["doc1.md"], headings=["# 2"]))
+    assert [(r.file_path, r.chunk_index) for r in results] == [("doc1.md", 2)]
+
+    assert store.query(query, top_k=10, where=MetadataFilter(file_paths=[])) == []
+
+
+def test_file_db_uses_wal_and_per_thread_connections(tmp_path):
+    """Test WAL mode, read-only readers and concurrent access from threads."""
+    db = FileDB(tmp_path / "files.db")
+    assert db._writer().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    with pytest.raises(sqlite3.OperationalError):
+        db._reader().execute("DELETE FROM files")
+
+    errors = []
+
+    def write(worker):
+        try:
+            db.upsert_files([
+                FileRecord(path=f"w{worker}/doc{i}.md", hash="h", mtime=1.0)
+                for i in range(50)
+            ])
+            db.get_all_files()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.count_files() == 200
+    db.close()
@@ -0,0 +1,266 @@
+"""Tests for embedder module."""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from src.shared.config import EmbeddingConfig, RetryConfig
+from src.shared.embedder import Embedder
+from src.shared.embedding_backends import EmbeddingBackend
+from src.shared.rate_limiter import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    """Provide a dummy API key; no request ever reaches the network."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
+
+def _make_embedder(**embedding_kwargs):
+    return Embedder(
+        EmbeddingConfig(**embedding_kwargs),
+        RetryConfig(max_retries=3, base_delay=0.01, backoff_factor=1.0)
+    )
+
+
+class _LimitedBackend(EmbeddingBackend):
+    """Backend rejecting requests over max_chars like the Gemini API does."""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.requests = []
+
+    @property
+    def model_id(self):
+        return "limited"
+
+    def embed(self, texts, task_type):
+        self.requests.append(len(texts))
+        if sum(len(text) for text in texts) > self.max_chars:
+            raise RuntimeError(
+                "400 INVALID_ARGUMENT. Request payload size exceeds the limit"
+            )
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_batches_preserve_order():
+    """Test that batches run concurrently and results keep input order."""
+    embedder = _make_embedder(batch_size=2, max_concurrent_requests=4)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_batch(texts, task_type):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return [[float(text)] for text in texts]
+
+    texts = [str(i) for i in range(16)]
+    with patch.object(embedder, "_embed_batch", side_effect=fake_batch):
+        embeddings = embedder.embed_texts(texts)
+
+    assert embeddings.tolist() == [[float(i)] for i in range(16)]
+    assert peak == 4
+
+
+def test_failed_batch_is_retried_without_blocking_others():
+    """Test that a failing batch is retried while other batches proceed."""
+    embedder = _make_embedder(batch_size=1, max_concurrent_requests=2)
+    failures = {"a": 1}
+    calls = []
+
+    def fake_batch(texts, task_type):
+        calls.append(texts[0])
+        if failures.get(texts[0], 0) > 0:
+            failures[texts[0]] -= 1
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return [[1.0] for _ in texts]
+
+    with patch.object(embedder, "_embed_batch", side_effect=fake_batch):
+        embeddings = embedder.embed_texts(["a", "b", "c"])
+
+    assert embeddings.tolist() == [[1.0], [1.0], [1.0]]
+    assert calls.count("a") == 2
+    # "c" was sent while "a" was backing off
+    assert calls[-1] == "a"
+
+
+def test_exhausted_retries_raise():
+    """Test that a batch failing every attempt propagates the error."""
+    embedder = _make_embedder(batch_size=1, max_concurrent_requests=2)
+
+    with patch.object(embedder, "_embed_batch", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            embedder.embed_texts(["a", "b"])
+
+
+def test_rate_limiter_spaces_requests():
+    """Test that the limiter delays requests beyond the per-minute budget."""
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+
+    # The full minute budget is available immediately
+    assert limiter.reserve(10) == 0.0
+    for _ in range(59):
+        limiter.reserve(1)
+
+    # Request budget is now exhausted: the next request waits about 1s
+    assert limiter.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+    # Token budget is enforced independently
+    tokens_only = RateLimiter(tokens_per_minute=600)
+    assert tokens_only.reserve(600) == 0.0
+    assert tokens_only.reserve(300) == pytest.approx(30.0, abs=0.5)
+
+
+def test_unlimited_rate_limiter_never_waits():
+    """Test that a limiter without limits grants every request."""
+    limiter = RateLimiter()
+    assert all(limiter.reserve(10000) == 0.0 for _ in range(100))
+
+
+async def test_embed_texts_async_runs_batches_concurrently():
+    """Test that async batches overlap and a failed batch is retried."""
+    embedder = _make_embedder(batch_size=1, max_concurrent_requests=3)
+    active = 0
+    peak = 0
+    failures = {"b": 1}
+
+    async def fake_batch(texts, task_type):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        if failures.get(texts[0], 0) > 0:
+            failures[texts[0]] -= 1
+            raise RuntimeError("503 UNAVAILABLE")
+        return [[float(ord(texts[0]))]]
+
+    with patch.object(embedder, "_embed_batch_async", side_effect=fake_batch):
+        embeddings = await embedder.embed_texts_async(["a", "b", "c", "d"])
+
+    assert embeddings.tolist() == [[97.0], [98.0], [99.0], [100.0]]
+    assert peak == 3
+
+
+def test_hashing_backend_works_offline(monkeypatch):
+    """Test that the hashing backend needs no API key and is deterministic."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    embedder = Embedder(
+        EmbeddingConfig(backend="hashing", output_dimensionality=64), RetryConfig()
+    )
+
+    first = embedder.embed_texts(["Pythonのインストール方法", "エラーハンドリング"])
+    second = embedder.embed_texts(["Pythonのインストール方法"])
+    query = embedder.embed_query("Pythonのインストール")
+
+    assert first.shape == (2, 64)
+    assert first.dtype == np.float32
+    assert first[0].tolist() == second[0].tolist()
+    assert float(np.dot(first[0], first[0])) == pytest.approx(1.0)
+
+    def dot(a, b):
+        return sum(x * y for x, y in zip(a, b))
+
+    assert dot(query, first[0]) > dot(query, first[1])
+
+
+def test_unknown_backend_is_rejected():
+    """Test that an unknown backend name raises ValueError."""
+    with pytest.raises(ValueError):
+        Embedder(EmbeddingConfig(backend="nope"), RetryConfig())
+
+
+def test_batches_are_packed_by_character_budget():
+    """Test that batches respect max_batch_chars as well as batch_size."""
+    embedder = _make_embedder(backend="hashing", batch_size=10, max_batch_chars=10)
+
+    batches = embedder._make_batches(["aaaa", "bbbb", "cccc", "d" * 20, "e"])
+
+    assert batches == [["aaaa", "bbbb"], ["cccc"], ["d" * 20], ["e"]]
+
+
+@pytest.mark.parametrize("max_concurrent_requests", [1, 4])
+def test_oversized_batches_are_split_and_limits_adapt(max_concurrent_requests):
+    """Test that payload-too-large errors split the batch instead of retrying."""
+    backend = _LimitedBackend(max_chars=25)
+    embedder = Embedder(
+        EmbeddingConfig(
+            batch_size=8, max_batch_chars=0,
+            max_concurrent_requests=max_concurrent_requests
+        ),
+        RetryConfig(max_retries=1, base_delay=0.01),
+        backend=backend
+    )
+    texts = ["x" * (i + 1) for i in range(8)]
+
+    embeddings = embedder.embed_texts(texts)
+
+    assert embeddings.tolist() == [[float(i + 1)] for i in range(8)]
+    assert embedder._batch_chars_limit <= 18
+    assert embedder._batch_texts_limit == 8
+
+    # The next call is packed within the reduced limits up front
+    backend.requests.clear()
+    embedder.embed_texts(texts)
+    assert len(backend.requests) == len(embedder._make_batches(texts))
+
+
+def test_batch_limits_grow_back_after_successes():
+    """Test that limits recover towards the configured values."""
+    embedder = _make_embedder(backend="hashing", batch_size=100, max_batch_chars=1000)
+    embedder._shrink_batch_limits(
+        ["x" * 10] * 10, RuntimeError("at most 100 requests can be in one batch")
+    )
+    embedder._shrink_batch_limits(["x" * 10] * 10, RuntimeError("payload size exceeds"))
+    assert (embedder._batch_texts_limit, embedder._batch_chars_limit) == (5, 50)
+
+    for _ in range(embedder._GROW_AFTER * 30):
+        embedder._record_batch_success()
+
+    assert (embedder._batch_texts_limit, embedder._batch_chars_limit) == (100, 1000)
+
+
+async def test_async_oversized_batches_are_split():
+    """Test that the async path splits oversized batches too."""
+    backend = _LimitedBackend(max_chars=10)
+    embedder = Embedder(
+        EmbeddingConfig(batch_size=4, max_batch_chars=0),
+        RetryConfig(max_retries=1, base_delay=0.01),
+        backend=backend
+    )
+
+    embeddings = await embedder.embed_texts_async(["aaaa", "bbbb", "cccc", "dddd"])
+
+    assert embeddings.tolist() == [[4.0]] * 4
+
+
+class _StubModel:
+    """sentence-transformers stand-in returning 384-dimensional vectors."""
+
+    def get_sentence_embedding_dimension(self):
+        return 384
+
+    def encode(self, texts, normalize_embeddings, convert_to_numpy):
+        return np.ones((len(texts), 384), dtype=np.float32) / np.sqrt(384)
+
+
+@pytest.mark.parametrize("configured, expected", [(768, 384), (256, 256)])
+def test_local_backend_reports_model_dimensions(configured, expected):
+    """Test that vectors, empty results and cache keys use the real dimension."""
+    embedder = _make_embedder(backend="local", output_dimensionality=configured)
+    embedder.backend._model = _StubModel()
+
+    assert embedder.dimensions == expected
+    assert embedder.embed_texts(["a", "b"]).shape == (2, expected)
+    assert embedder.embed_texts([]).shape == (0, expected)
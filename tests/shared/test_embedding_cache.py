@@ -0,0 +1,87 @@
+"""Tests for embedding cache module."""
+
+import pytest
+from unittest.mock import patch
+
+from src.shared.config import EmbeddingConfig, RetryConfig
+from src.shared.embedder import Embedder, EmbeddingStats
+from src.shared.embedding_cache import EmbeddingCache
+
+
+MODEL = "gemini-embedding-001"
+DIM = 4
+TASK = "RETRIEVAL_DOCUMENT"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Embedding cache in a temporary directory."""
+    cache = EmbeddingCache(tmp_path / "cache.db", max_entries=3)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def embedder(cache, monkeypatch):
+    """Embedder backed by the cache, with the API call stubbed out."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    embedder = Embedder(EmbeddingConfig(output_dimensionality=DIM), RetryConfig(), cache)
+
+    def fake_batch(texts, task_type):
+        embedder.api_call_count += 1
+        return [[float(len(text)), 0.0, 0.0, 1.0] for text in texts]
+
+    with patch.object(embedder, "_embed_batch", side_effect=fake_batch):
+        yield embedder
+
+
+def test_put_and_get(cache):
+    """Test that stored vectors are returned for the same key only."""
+    h = EmbeddingCache.hash_text("hello")
+    cache.put_many({h: [0.5, 0.25, 0.0, 1.0]}, MODEL, DIM, TASK)
+
+    assert cache.get_many([h], MODEL, DIM, TASK)[0].tolist() == [0.5, 0.25, 0.0, 1.0]
+    assert cache.get_many([h], MODEL, DIM, "RETRIEVAL_QUERY") == [None]
+    assert cache.get_many([h], MODEL, 8, TASK) == [None]
+
+
+def test_lru_eviction(cache):
+    """Test that least recently used entries are evicted beyond max_entries."""
+    hashes = [EmbeddingCache.hash_text(t) for t in ["a", "b", "c", "d"]]
+    for h in hashes[:3]:
+        cache.put_many({h: [1.0] * DIM}, MODEL, DIM, TASK)
+
+    # Touch "a" so that "b" becomes the oldest entry
+    cache.get_many([hashes[0]], MODEL, DIM, TASK)
+    cache.put_many({hashes[3]: [1.0] * DIM}, MODEL, DIM, TASK)
+
+    assert cache.count() == 3
+    result = cache.get_many(hashes, MODEL, DIM, TASK)
+    assert result[1] is None
+    assert all(v is not None for i, v in enumerate(result) if i != 1)
+
+
+def test_embedder_uses_cache(embedder):
+    """Test that repeated texts are served from the cache."""
+    first = embedder.embed_texts(["alpha", "beta", "alpha"])
+    assert embedder.get_api_call_count() == 1
+    assert embedder.get_cache_stats() == (0, 3)
+
+    embedder.reset_cache_stats()
+    second = embedder.embed_texts(["beta", "alpha", "gamma"])
+
+    assert embedder.get_api_call_count() == 2
+    assert embedder.get_cache_stats() == (2, 1)
+    assert second.shape == (3, DIM)
+    assert second[0].tolist() == first[1].tolist()
+    assert second[1].tolist() == first[0].tolist()
+
+
+def test_embedder_counts_per_call_stats(embedder):
+    """Test that per-call stats exclude work done for other callers."""
+    embedder.embed_texts(["alpha", "beta"])
+    stats = EmbeddingStats()
+    embedder.embed_texts(["alpha", "gamma", "delta"], stats=stats)
+
+    assert stats == EmbeddingStats(api_calls=1, cache_hits=1, cache_misses=2)
+    assert embedder.get_api_call_count() == 2
@@ -0,0 +1,239 @@
+"""Tests for indexer module."""
+
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from src.shared.config import ChunkerConfig, EmbeddingConfig, ScannerConfig
+from src.shared.db import FileDB
+from src.shared.indexer import Indexer
+
+
+class FakeEmbedder:
+    """Embedder stand-in recording the size of every embed call."""
+
+    def __init__(self, batch_size: int):
+        self.embedding_config = EmbeddingConfig(batch_size=batch_size, max_concurrent_requests=1)
+        self.calls = []
+
+    def embed_texts(self, texts, task_type=None, stats=None):
+        self.calls.append(len(texts))
+        if stats is not None:
+            stats.api_calls += 1
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def _write_notes(docs_dir, count):
+    """Write `count` Markdown notes with three sections each."""
+    for i in range(count):
+        (docs_dir / f"note{i}.md").write_text(
+            f"# Note {i}\n\nIntro text for note {i}.\n\n"
+            f"## Part A\n\nFirst section of note {i}.\n\n"
+            f"## Part B\n\nSecond section of note {i}.\n",
+            encoding="utf-8"
+        )
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    """Documents directory with ten small notes."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    _write_notes(docs, 10)
+    return docs
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """FileDB in a temporary directory."""
+    db = FileDB(tmp_path / "index" / "files.db")
+    yield db
+    db.close()
+
+
+def _make_indexer(docs_dir, file_db, embedder):
+    return Indexer(
+        docs_dir, file_db, MagicMock(), embedder,
+        ScannerConfig(), ChunkerConfig(min_chunk_chars=10)
+    )
+
+
+def test_update_packs_chunks_across_files(docs_dir, file_db):
+    """Test that chunks from many files share full embedding batches."""
+    embedder = FakeEmbedder(batch_size=8)
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+
+    summary = indexer.update()
+
+    # 10 files x 3 chunks = 30 chunks -> 3 full batches + 1 partial
+    assert embedder.calls == [8, 8, 8, 6]
+    assert summary.added == 10
+    assert summary.api_call_count == 4
+    assert len(file_db.get_all_files()) == 10
+
+    # Files are written in groups, each with exactly its own vectors
+    add_calls = indexer.vector_store.add_chunks_bulk.call_args_list
+    assert len(add_calls) == 4
+    written = [item for call in add_calls for item in call.args[0]]
+    assert len(written) == 10
+    assert sorted(path for path, _, _ in written) == sorted(f"note{i}.md" for i in range(10))
+    for path, chunks, embeddings in written:
+        note = path[len("note"):-len(".md")]
+        assert all(c.content.endswith(f"note {note}.") for c in chunks)
+        assert len(chunks) == len(embeddings) == 3
+        assert isinstance(embeddings, np.ndarray) and embeddings.dtype == np.float32
+        assert [e[0] for e in embeddings] == [float(len(c.content)) for c in chunks]
+
+
+def test_update_embedding_failure_leaves_files_unindexed(docs_dir, file_db):
+    """Test that files in a failed batch are retried on the next update."""
+    embedder = FakeEmbedder(batch_size=100)
+    embedder.embed_texts = MagicMock(side_effect=RuntimeError("quota exceeded"))
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+
+    indexer.update()
+
+    assert file_db.get_all_files() == {}
+    indexer.vector_store.add_chunks.assert_not_called()
+
+
+def _bump_mtime(path):
+    """Move the mtime forward so the scanner sees the file as modified."""
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_update_embeds_only_changed_chunks(docs_dir, file_db):
+    """Test that editing one section re-embeds and rewrites only that chunk."""
+    embedder = FakeEmbedder(batch_size=100)
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+    indexer.update()
+    old_ids = [record.chunk_id for record in file_db.get_chunks("note0.md")]
+    assert len(old_ids) == 3
+
+    note = docs_dir / "note0.md"
+    note.write_text(
+        note.read_text(encoding="utf-8").replace("Second section", "Edited section"),
+        encoding="utf-8"
+    )
+    _bump_mtime(note)
+    embedder.calls.clear()
+    indexer.vector_store.reset_mock()
+
+    summary = indexer.update()
+
+    assert summary.updated == 1
+    assert embedder.calls == [1]
+    indexer.vector_store.delete_by_files.assert_not_called()
+    indexer.vector_store.delete_ids.assert_called_once_with([old_ids[2]])
+    indexer.vector_store.update_chunk_indices.assert_not_called()
+    (path, chunks, _), = indexer.vector_store.add_chunks_bulk.call_args.args[0]
+    assert path == "note0.md"
+    assert [c.heading for c in chunks] == ["## Part B"]
+    assert len(file_db.get_chunks("note0.md")) == 3
+
+
+def test_update_deletes_removed_chunks(docs_dir, file_db):
+    """Test that chunks past the end of a shortened file are deleted."""
+    embedder = FakeEmbedder(batch_size=100)
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+    indexer.update()
+    old_ids = [record.chunk_id for record in file_db.get_chunks("note0.md")]
+
+    note = docs_dir / "note0.md"
+    note.write_text(
+        note.read_text(encoding="utf-8").split("## Part B")[0],
+        encoding="utf-8"
+    )
+    _bump_mtime(note)
+    embedder.calls.clear()
+    indexer.vector_store.reset_mock()
+
+    indexer.update()
+
+    assert embedder.calls == []
+    indexer.vector_store.delete_ids.assert_called_once_with(old_ids[2:])
+    assert [r.chunk_id for r in file_db.get_chunks("note0.md")] == old_ids[:2]
+
+
+def test_update_keeps_ids_of_shifted_chunks(docs_dir, file_db):
+    """Test that inserting a section only embeds it and renumbers the rest."""
+    embedder = FakeEmbedder(batch_size=100)
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+    indexer.update()
+    old_ids = [record.chunk_id for record in file_db.get_chunks("note0.md")]
+
+    note = docs_dir / "note0.md"
+    note.write_text(
+        note.read_text(encoding="utf-8").replace(
+            "## Part A", "## Part Z\n\nInserted section of note 0.\n\n## Part A"
+        ),
+        encoding="utf-8"
+    )
+    _bump_mtime(note)
+    embedder.calls.clear()
+    indexer.vector_store.reset_mock()
+
+    indexer.update()
+
+    assert embedder.calls == [1]
+    indexer.vector_store.delete_ids.assert_not_called()
+    indexer.vector_store.update_chunk_indices.assert_called_once_with(
+        {old_ids[1]: 2, old_ids[2]: 3}
+    )
+    new_ids = [record.chunk_id for record in file_db.get_chunks("note0.md")]
+    assert new_ids[0] == old_ids[0] and new_ids[2:] == old_ids[1:]
+
+
+def test_update_reindexes_when_vector_store_is_empty(docs_dir, file_db):
+    """Test that recorded files are indexed again into an empty vector store."""
+    embedder = FakeEmbedder(batch_size=100)
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+    indexer.update()
+
+    indexer.vector_store.count.return_value = 0
+    summary = indexer.update()
+
+    assert summary.added == 10
+    assert len(file_db.get_all_files()) == 10
+
+
+def test_update_maintains_full_text_index(docs_dir, file_db):
+    """Test that chunk texts are indexed for BM25 and removed with their file."""
+    indexer = _make_indexer(docs_dir, file_db, FakeEmbedder(batch_size=100))
+    indexer.update()
+
+    results = file_db.search_text("second", 30)
+    assert len(results) == 10
+    assert all(r.heading == "## Part B" for r in results)
+
+    (docs_dir / "note3.md").unlink()
+    indexer.update()
+
+    results = file_db.search_text("second", 30)
+    assert len(results) == 9
+    assert all(r.file_path != "note3.md" for r in results)
+
+
+def test_update_backfills_empty_full_text_index(docs_dir, file_db):
+    """Test that an index built without texts or chunk lists is filled without embedding."""
+    embedder = FakeEmbedder(batch_size=100)
+    indexer = _make_indexer(docs_dir, file_db, embedder)
+    indexer.update()
+    with sqlite3.connect(file_db.db_path) as conn:
+        conn.execute("DELETE FROM chunks_fts")
+        conn.execute("DELETE FROM chunks")
+    conn.close()
+    indexer.vector_store.reset_mock()
+
+    summary = indexer.update()
+
+    assert embedder.calls == [30]
+    assert summary.unchanged == 10
+    indexer.vector_store.delete_by_files.assert_not_called()
+    indexer.vector_store.add_chunks_bulk.assert_not_called()
+    assert file_db.has_texts()
+    assert len(file_db.search_text("first", 30)) == 10
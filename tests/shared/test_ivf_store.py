@@ -0,0 +1,94 @@
+"""Tests for ivf_store module."""
+
+import numpy as np
+import pytest
+
+from src.shared import ivf_store
+from src.shared.config import VectorStoreConfig
+from src.shared.db import MetadataFilter
+from src.shared.ivf_store import IVFVectorStore, assign_lists, train_kmeans
+from tests.shared.helpers import make_chunks
+
+
+def _clustered(count, dim=16, clusters=8, seed=0):
+    """Normalized vectors scattered around a few well-separated centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)) * 5
+    vectors = centers[np.arange(count) % clusters] + rng.normal(size=(count, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def small_training(monkeypatch):
+    """Let the store cluster itself from 200 chunks on."""
+    monkeypatch.setattr(ivf_store, "_MIN_TRAIN_CHUNKS", 200)
+
+
+def test_train_kmeans_separates_clusters():
+    """Test that k-means recovers well-separated clusters."""
+    vectors = _clustered(400, clusters=4)
+    centroids = train_kmeans(vectors, 4)
+    lists = assign_lists(vectors, centroids)
+
+    assert np.linalg.norm(centroids, axis=1) == pytest.approx(np.ones(4))
+    # Every true cluster maps to exactly one list
+    for cluster in range(4):
+        assert len(set(lists[cluster::4].tolist())) == 1
+    assert len(set(lists.tolist())) == 4
+
+
+def test_store_clusters_and_probes_lists(tmp_path, small_training):
+    """Test clustering on growth, incremental assignment and probed search."""
+    store = IVFVectorStore(tmp_path / "ivf", VectorStoreConfig(ivf_lists=8, ivf_probes=2))
+    store.add_chunks("a.md", make_chunks(100), _clustered(100))
+    assert store._centroids is None
+
+    vectors = _clustered(300, seed=1)
+    store.add_chunks("b.md", make_chunks(300), vectors)
+    assert store._centroids.shape == (8, 16)
+    assert store._trained_count == 400
+
+    # Added after clustering: assigned without re-clustering
+    centroids = store._centroids
+    store.add_chunks("c.md", make_chunks(50, "late"), _clustered(50, seed=2))
+    assert store._centroids is centroids
+    assert (store._arrays["lists"][np.flatnonzero(store._live)] >= 0).all()
+
+    # The query scans only its probed lists, which hold its true neighbours
+    query = vectors[0]
+    scanned = store._scan_slots(query, len(store._live))
+    assert 0 < len(scanned) < store.count()
+    results = store.query(query, top_k=5)
+    assert results[0].file_path == "b.md" and results[0].chunk_index == 0
+    assert results[0].distance == pytest.approx(0.0, abs=1e-5)
+    store.close()
+
+
+def test_reopened_store_keeps_lists(tmp_path, small_training):
+    """Test that centroids and assignments persist across instances."""
+    config = VectorStoreConfig(ivf_lists=8, ivf_probes=8)
+    store = IVFVectorStore(tmp_path / "ivf", config)
+    store.add_chunks("a.md", make_chunks(300), _clustered(300))
+    expected = [r.chunk_index for r in store.query(_clustered(1, seed=5)[0], top_k=5)]
+    store.close()
+
+    reopened = IVFVectorStore(tmp_path / "ivf", config)
+    assert reopened._trained_count == 300
+    assert [r.chunk_index for r in reopened.query(_clustered(1, seed=5)[0], top_k=5)] == expected
+
+    reopened.delete_by_files(["a.md"])
+    assert reopened.query(_clustered(1, seed=5)[0], top_k=5) == []
+    reopened.close()
+
+
+def test_filter_outside_probed_lists_scans_scope(tmp_path, small_training):
+    """Test that a filter finds matches even in lists the query would not probe."""
+    store = IVFVectorStore(tmp_path / "ivf", VectorStoreConfig(ivf_lists=8, ivf_probes=1))
+    store.add_chunks("a.md", make_chunks(300), _clustered(300))
+    store.add_chunks("b.md", make_chunks(8, "far"), _clustered(8, seed=3))
+
+    results = store.query(_clustered(1)[0], top_k=3, where=MetadataFilter(file_paths=["b.md"]))
+    assert len(results) == 3
+    assert {r.file_path for r in results} == {"b.md"}
+    store.close()
@@ -0,0 +1,209 @@
+"""Tests for numpy_store module."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.shared import numpy_store
+from src.shared.config import ChromaDBConfig, VectorStoreConfig
+from src.shared.db import MetadataFilter, VectorStore, create_vector_store
+from src.shared.numpy_store import NumpyVectorStore, quantize_binary, quantize_int8, truncate_dims
+from tests.shared.helpers import make_chunks, make_vectors
+
+
+@pytest.fixture
+def store(tmp_path):
+    """NumpyVectorStore in a temporary directory."""
+    store = NumpyVectorStore(tmp_path / "vectors")
+    yield store
+    store.close()
+
+
+def test_query_is_exact(store):
+    """Test that results match a brute-force cosine ranking."""
+    vectors = make_vectors(50)
+    store.add_chunks("doc.md", make_chunks(50), vectors)
+    query = make_vectors(1, seed=1)[0]
+
+    results = store.query(query, top_k=5)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarities = normalized @ (query / np.linalg.norm(query))
+    expected = np.argsort(-similarities)[:5]
+    assert [r.chunk_index for r in results] == expected.tolist()
+    assert [r.distance for r in results] == pytest.approx(1.0 - similarities[expected], abs=1e-5)
+    assert results[0].file_path == "doc.md"
+    assert results[0].content == f"chunk {expected[0]}"
+
+
+def test_upsert_delete_and_slot_reuse(store, monkeypatch):
+    """Test overwriting by ID, deletions and growth past the initial capacity."""
+    monkeypatch.setattr(numpy_store, "_INITIAL_CAPACITY", 4)
+    store.add_chunks("a.md", make_chunks(3), make_vectors(3))
+    store.add_chunks("b.md", make_chunks(3, "other"), make_vectors(3, seed=1))
+    assert store.count() == 6
+    assert len(store._live) == 8
+
+    # Same IDs: overwritten in place
+    store.add_chunks("a.md", make_chunks(3), make_vectors(3, seed=2))
+    assert store.count() == 6
+
+    store.delete_by_files(["a.md"])
+    ids = store.make_chunk_ids("b.md", make_chunks(3, "other"))
+    store.delete_ids(ids[:1])
+    assert store.count() == 2
+    assert {r.file_path for r in store.query(make_vectors(1)[0], top_k=10)} == {"b.md"}
+
+    # Freed slots are reused before the file grows again
+    store.add_chunks("c.md", make_chunks(4, "new"), make_vectors(4, seed=3))
+    assert store.count() == 6
+    assert len(store._live) == 8
+
+
+class _InterleavingLock:
+    """RLock that runs a callback before it is taken for the second time."""
+
+    def __init__(self, callback):
+        self._lock = threading.RLock()
+        self._callback = callback
+        self._entries = 0
+
+    def __enter__(self):
+        self._entries += 1
+        if self._entries == 2:
+            self._callback()
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._lock.__exit__(*exc_info)
+
+
+def test_query_skips_slots_reused_during_scoring(store):
+    """Test that a slot freed and refilled while scoring does not return the new chunk."""
+    vectors = make_vectors(3)
+    store.add_chunks("a.md", make_chunks(3), vectors)
+
+    def replace_file():
+        store.delete_by_files(["a.md"])
+        store.add_chunks("b.md", make_chunks(3, "other"), make_vectors(3, seed=1))
+        assert store._live[:3].all()
+
+    store._lock = _InterleavingLock(replace_file)
+    assert store.query(vectors[1], top_k=3) == []
+
+    assert {r.file_path for r in store.query(vectors[1], top_k=3)} == {"b.md"}
+
+
+def test_persistence_and_cross_instance_sync(tmp_path):
+    """Test that a second instance sees data written before and after it opened."""
+    writer = NumpyVectorStore(tmp_path / "vectors")
+    writer.add_chunks("a.md", make_chunks(3), make_vectors(3))
+
+    reader = NumpyVectorStore(tmp_path / "vectors")
+    assert reader.count() == 3
+
+    writer.add_chunks("b.md", make_chunks(2, "other"), make_vectors(2, seed=1))
+    writer.update_chunk_indices({writer.make_chunk_ids("a.md", make_chunks(3))[0]: 7})
+    assert reader.count() == 5
+    ids, vectors = reader.get_all_vectors()
+    assert len(ids) == 5 and vectors.shape == (5, 8)
+    indices = {(r.file_path, r.chunk_index) for r in reader.query(make_vectors(1)[0], top_k=5)}
+    assert ("a.md", 7) in indices
+
+    writer.close()
+    reader.close()
+
+
+def test_quantizers():
+    """Test int8 round trip accuracy, binary packing and truncation."""
+    vectors = make_vectors(4, dim=16)
+    codes, scales = quantize_int8(vectors)
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - vectors).max() <= scales.max() / 2 + 1e-6
+
+    bits = quantize_binary(vectors)
+    assert bits.shape == (4, 2)
+    assert np.array_equal(np.unpackbits(bits, axis=1), (vectors > 0).astype(np.uint8))
+
+    truncated = truncate_dims(vectors, 8)
+    assert truncated.shape == (4, 8)
+    assert np.linalg.norm(truncated, axis=1) == pytest.approx(np.ones(4))
+
+
+@pytest.mark.parametrize("quantization, coarse_dims", [
+    ("int8", 0), ("binary", 0), ("none", 16), ("int8", 32)
+])
+def test_coarse_search_rescores_to_exact_results(tmp_path, quantization, coarse_dims):
+    """Test that rescored coarse search returns the exact ranking and distances."""
+    vectors = make_vectors(300, dim=64)
+    if coarse_dims:
+        # Decaying variance per dimension, like Matryoshka embeddings
+        vectors *= np.linspace(2.0, 0.2, 64, dtype=np.float32)
+    query = make_vectors(1, dim=64, seed=1)[0]
+    exact = NumpyVectorStore(tmp_path / "exact")
+    exact.add_chunks("doc.md", make_chunks(300), vectors)
+    quantized = NumpyVectorStore(
+        tmp_path / "coarse",
+        VectorStoreConfig(quantization=quantization, coarse_dims=coarse_dims)
+    )
+    quantized.add_chunks("doc.md", make_chunks(300), vectors)
+    if coarse_dims:
+        assert quantized._arrays["codes"].shape[1] == coarse_dims
+
+    expected = exact.query(query, top_k=5)
+    results = quantized.query(query, top_k=5, search_ef=150)
+
+    assert [r.chunk_index for r in results] == [r.chunk_index for r in expected]
+    assert [r.distance for r in results] == pytest.approx([r.distance for r in expected])
+    exact.close()
+    quantized.close()
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_filtered_query_is_exact_within_scope(tmp_path, quantization):
+    """Test that a filter restricts the scan to matching chunks."""
+    store = NumpyVectorStore(tmp_path / "vectors", VectorStoreConfig(quantization=quantization))
+    for i in range(4):
+        store.add_chunks(f"dir{i % 2}/doc{i}.md", make_chunks(25), make_vectors(25, seed=i))
+    query = make_vectors(1, seed=9)[0]
+
+    where = MetadataFilter(file_paths=["dir1/doc1.md", "dir1/doc3.md"])
+    results = store.query(query, top_k=5, where=where)
+    expected = [
+        r for r in store.query(query, top_k=100) if r.file_path.startswith("dir1/")
+    ][:5]
+    assert [(r.file_path, r.chunk_index) for r in results] == [
+        (r.file_path, r.chunk_index) for r in expected
+    ]
+
+    results = store.query(query, top_k=5, where=MetadataFilter(headings=["# 3", "# 4"]))
+    assert len(results) == 5 and {r.heading for r in results} <= {"# 3", "# 4"}
+    assert store.query(query, top_k=5, where=MetadataFilter(headings=[])) == []
+    store.close()
+
+
+def test_changing_quantization_rebuilds_codes(tmp_path):
+    """Test that codes are built for vectors stored under another setting."""
+    store = NumpyVectorStore(tmp_path / "vectors")
+    store.add_chunks("doc.md", make_chunks(20), make_vectors(20))
+    expected = [r.chunk_index for r in store.query(make_vectors(1, seed=1)[0], top_k=3)]
+    store.close()
+
+    store = NumpyVectorStore(tmp_path / "vectors", VectorStoreConfig(quantization="int8"))
+    assert store._arrays["codes"].shape == store._matrix.shape
+    assert [r.chunk_index for r in store.query(make_vectors(1, seed=1)[0], top_k=3)] == expected
+    store.close()
+
+
+def test_create_vector_store_selects_backend(tmp_path):
+    """Test the backend factory."""
+    numpy_backend = create_vector_store(tmp_path, VectorStoreConfig(backend="numpy"), ChromaDBConfig())
+    assert isinstance(numpy_backend, NumpyVectorStore)
+    numpy_backend.close()
+
+    assert isinstance(
+        create_vector_store(tmp_path, VectorStoreConfig(), ChromaDBConfig()), VectorStore
+    )
+    with pytest.raises(ValueError):
+        create_vector_store(tmp_path, VectorStoreConfig(backend="faiss"), ChromaDBConfig())
@@ -0,0 +1,61 @@
+"""Tests for query batcher module."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.shared.config import EmbeddingConfig
+from src.shared.query_batcher import QueryBatcher
+
+
+@pytest.fixture
+def embedder():
+    """Embedder stand-in returning one vector per text."""
+    embedder = MagicMock()
+    embedder.embedding_config = EmbeddingConfig()
+
+    async def fake_embed(texts, task_type=None):
+        await asyncio.sleep(0)
+        return [[float(len(text))] for text in texts]
+
+    embedder.embed_texts_async = AsyncMock(side_effect=fake_embed)
+    return embedder
+
+
+async def test_concurrent_queries_share_one_request(embedder):
+    """Test that queries arriving together are embedded in one request."""
+    batcher = QueryBatcher(embedder, max_wait_ms=20, max_batch_size=32)
+    queries = ["a", "bb", "ccc", "bb"]
+
+    results = await asyncio.gather(*(batcher.embed(q) for q in queries))
+
+    assert results == [[1.0], [2.0], [3.0], [2.0]]
+    embedder.embed_texts_async.assert_awaited_once_with(
+        ["a", "bb", "ccc"], task_type="RETRIEVAL_QUERY"
+    )
+
+
+async def test_full_batch_is_sent_without_waiting(embedder):
+    """Test that reaching max_batch_size flushes immediately."""
+    batcher = QueryBatcher(embedder, max_wait_ms=10000, max_batch_size=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.embed(str(i)) for i in range(4))),
+        timeout=1.0
+    )
+
+    assert len(results) == 4
+    assert embedder.embed_texts_async.await_count == 2
+
+
+async def test_errors_reach_every_caller(embedder):
+    """Test that a failed batch raises in all waiting callers."""
+    embedder.embed_texts_async.side_effect = RuntimeError("quota exceeded")
+    batcher = QueryBatcher(embedder, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
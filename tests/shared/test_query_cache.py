@@ -0,0 +1,112 @@
+"""Tests for query embedding cache module."""
+
+import threading
+import time
+
+from unittest.mock import MagicMock
+
+from src.shared.config import EmbeddingConfig
+from src.shared.query_cache import QueryEmbeddingCache
+from src.shared.searcher import Searcher
+
+
+def _key(query):
+    return QueryEmbeddingCache.make_key(
+        QueryEmbeddingCache.normalize(query), "gemini-embedding-001", 768
+    )
+
+
+def test_normalized_queries_share_key():
+    """Test that whitespace and full-width variants map to the same key."""
+    assert _key("Python  インストール") == _key(" Ｐｙｔｈｏｎ インストール\n")
+    assert _key("Python") != _key("Java")
+
+
+def test_lru_eviction_and_stats():
+    """Test LRU eviction order and hit/miss accounting."""
+    cache = QueryEmbeddingCache(max_entries=2)
+    cache.put(_key("a"), [1.0])
+    cache.put(_key("b"), [2.0])
+    assert cache.get(_key("a")) == [1.0]
+
+    cache.put(_key("c"), [3.0])
+
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("c")) == [3.0]
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "size": 2}
+
+
+def test_ttl_expiry():
+    """Test that entries older than the TTL are treated as misses."""
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=0.05)
+    cache.put(_key("a"), [1.0])
+    assert cache.get(_key("a")) == [1.0]
+
+    time.sleep(0.1)
+
+    assert cache.get(_key("a")) is None
+
+
+def test_persistence_survives_restart(tmp_path):
+    """Test that persisted entries are available to a new cache instance."""
+    path = tmp_path / "query_cache.db"
+    cache = QueryEmbeddingCache(max_entries=10, persist_path=path)
+    cache.put(_key("a"), [0.5, 0.25])
+    cache.close()
+
+    reopened = QueryEmbeddingCache(max_entries=10, persist_path=path)
+    assert reopened.get(_key("a")).tolist() == [0.5, 0.25]
+    reopened.close()
+
+
+def test_searcher_skips_embedding_on_repeat_query():
+    """Test that repeated searches reuse the cached query embedding."""
+    embedder = MagicMock()
+    embedder.embedding_config = EmbeddingConfig()
+    embedder.embed_query.return_value = [1.0, 0.0]
+    vector_store = MagicMock()
+    vector_store.count.return_value = 1
+    vector_store.query.return_value = []
+
+    searcher = Searcher(embedder, vector_store, query_cache=QueryEmbeddingCache())
+    searcher.search("how to install")
+    searcher.search("how  to install")
+
+    embedder.embed_query.assert_called_once_with("how to install")
+    assert vector_store.query.call_count == 2
+    assert searcher.get_stats()["hit_rate"] == 0.5
+
+
+async def test_async_search_reads_persistent_cache_off_the_event_loop(tmp_path):
+    """Test that disk lookups run on the executor and memory hits inline."""
+    embedder = MagicMock()
+    embedder.embedding_config = EmbeddingConfig()
+    embedder.model_id = "gemini-embedding-001"
+    embedder.dimensions = 768
+    vector_store = MagicMock()
+    vector_store.count.return_value = 1
+    vector_store.query.return_value = []
+
+    path = tmp_path / "query_cache.db"
+    seeded = QueryEmbeddingCache(persist_path=path)
+    seeded.put(_key("how to install"), [1.0, 0.0])
+    seeded.close()
+
+    cache = QueryEmbeddingCache(persist_path=path)
+    loop_thread = threading.current_thread()
+    threads = []
+    get_many = cache._store.get_many
+
+    def recording_get_many(*args):
+        threads.append(threading.current_thread())
+        return get_many(*args)
+
+    cache._store.get_many = recording_get_many
+    searcher = Searcher(embedder, vector_store, query_cache=cache)
+    await searcher.search_async("how to install")
+    await searcher.search_async("how to install")
+
+    assert len(threads) == 1 and threads[0] is not loop_thread
+    embedder.embed_query_async.assert_not_called()
+    assert cache.stats()["hits"] == 2
+    cache.close()
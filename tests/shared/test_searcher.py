@@ -0,0 +1,142 @@
+"""Tests for searcher module."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.shared.config import EmbeddingConfig
+from src.shared.db import MetadataFilter, QueryResult, SearchFilters
+from src.shared.searcher import Searcher
+
+
+@pytest.fixture
+def searcher():
+    """Searcher over a mocked embedder and vector store."""
+    embedder = MagicMock()
+    embedder.embedding_config = EmbeddingConfig()
+
+    async def slow_embed(query):
+        await asyncio.sleep(0.02)
+        return [1.0, 0.0]
+
+    embedder.embed_query_async = AsyncMock(side_effect=slow_embed)
+
+    vector_store = MagicMock()
+    vector_store.count.return_value = 1
+    vector_store.query.return_value = [
+        QueryResult(file_path="a.md", content="text", heading="# A", distance=0.2, chunk_index=0)
+    ]
+    return Searcher(embedder, vector_store)
+
+
+async def test_identical_concurrent_searches_share_work(searcher):
+    """Test that identical in-flight searches run the pipeline once."""
+    results = await asyncio.gather(*(searcher.search_async("python", 3) for _ in range(5)))
+
+    assert all(r == results[0] for r in results)
+    assert results[0][0].score == pytest.approx(0.8)
+    searcher.embedder.embed_query_async.assert_awaited_once()
+    assert searcher.vector_store.query.call_count == 1
+    assert searcher.get_stats()["coalesced"] == 4
+
+
+async def test_different_parameters_are_not_coalesced(searcher):
+    """Test that searches with different top_k run separately."""
+    await asyncio.gather(searcher.search_async("python", 3), searcher.search_async("python", 5))
+
+    assert searcher.embedder.embed_query_async.await_count == 2
+
+
+async def test_finished_searches_are_not_reused(searcher):
+    """Test that a completed search is recomputed on the next request."""
+    await searcher.search_async("python", 3)
+    await searcher.search_async("python", 3)
+
+    assert searcher.embedder.embed_query_async.await_count == 2
+
+
+async def test_filters_are_resolved_and_pushed_down(searcher):
+    """Test that filters reach the store and unmatched filters skip embedding."""
+    searcher.file_db = MagicMock()
+    where = MetadataFilter(file_paths=["docs/a.md"])
+    searcher.file_db.resolve_filters.return_value = where
+
+    await searcher.search_async("python", 3, filters=SearchFilters(path_prefix="docs/"))
+    assert searcher.vector_store.query.call_args.args[3] is where
+
+    searcher.file_db.resolve_filters.return_value = MetadataFilter(file_paths=[])
+    assert await searcher.search_async("python", 3, filters=SearchFilters(path_prefix="x/")) == []
+    searcher.embedder.embed_query_async.assert_awaited_once()
+
+
+def test_filters_require_file_db(searcher):
+    """Test that filtered searches without a FileDB are rejected."""
+    with pytest.raises(ValueError):
+        searcher.search("python", 3, filters=SearchFilters(heading="Setup"))
+
+
+def _lexical(file_path, chunk_index, rank):
+    return QueryResult(
+        file_path=file_path, content="text", heading="", distance=rank, chunk_index=chunk_index
+    )
+
+
+async def test_hybrid_fuses_vector_and_lexical_ranks(searcher):
+    """Test that hybrid search ranks chunks found by both retrievers first."""
+    searcher.vector_store.query.return_value = [
+        QueryResult(file_path="v.md", content="text", heading="", distance=0.1, chunk_index=0),
+        QueryResult(file_path="a.md", content="text", heading="", distance=0.2, chunk_index=0),
+    ]
+    searcher.file_db = MagicMock()
+    searcher.file_db.search_text.return_value = [_lexical("a.md", 0, -3.0), _lexical("l.md", 0, -2.0)]
+
+    results = await searcher.search_async("python", 3, mode="hybrid")
+
+    assert [r.file_path for r in results] == ["a.md", "v.md", "l.md"]
+    assert results[0].score == pytest.approx((1 / 62 + 1 / 61) / (2 / 61))
+    # Both retrievers are asked for more candidates than returned
+    assert searcher.vector_store.query.call_args.args[1] == 50
+    assert searcher.file_db.search_text.call_args.args[1] == 50
+
+
+async def test_lexical_mode_skips_embedding(searcher):
+    """Test that lexical search uses BM25 scores and no embedding call."""
+    searcher.file_db = MagicMock()
+    searcher.file_db.search_text.return_value = [_lexical("a.md", 0, -3.0)]
+
+    results = await searcher.search_async("python", 3, mode="lexical")
+
+    assert results[0].score == pytest.approx(0.75)
+    searcher.embedder.embed_query_async.assert_not_awaited()
+    searcher.vector_store.query.assert_not_called()
+
+
+def test_hybrid_falls_back_to_lexical_when_embedding_fails(searcher):
+    """Test that a failing embedding API still yields lexical results."""
+    searcher.embedder.embed_query.side_effect = RuntimeError("API unavailable")
+    searcher.file_db = MagicMock()
+    searcher.file_db.search_text.return_value = [_lexical("a.md", 0, -1.0), _lexical("b.md", 0, -0.5)]
+
+    results = searcher.search("python", 1, mode="hybrid")
+
+    assert [(r.file_path, r.score) for r in results] == [("a.md", pytest.approx(0.5))]
+
+    searcher.mode = "vector"
+    with pytest.raises(RuntimeError):
+        searcher.search("python", 1)
+
+
+def test_unknown_mode_is_rejected(searcher):
+    """Test that an unknown search mode raises ValueError."""
+    with pytest.raises(ValueError):
+        searcher.search("python", 3, mode="fuzzy")
+
+
+async def test_coalesced_variants_embed_normalized_text(searcher):
+    """Test that the embedded text matches the normalized in-flight key."""
+    await asyncio.gather(
+        searcher.search_async(" Ｐｙｔｈｏｎ  setup", 3), searcher.search_async("Python setup", 3)
+    )
+
+    searcher.embedder.embed_query_async.assert_awaited_once_with("Python setup")
@@ -0,0 +1,132 @@
+"""Tests for sharded_store module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.shared.config import ChromaDBConfig, VectorStoreConfig
+from src.shared.db import MetadataFilter, create_vector_store
+from src.shared.numpy_store import NumpyVectorStore
+from src.shared.sharded_store import ShardedVectorStore
+from tests.shared.helpers import make_chunks, make_vectors
+
+
+FILES = ["a/one.md", "a/two.md", "b/one.md", "c/d/one.md", "root.md"]
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    """Three-shard numpy store."""
+    store = create_vector_store(
+        tmp_path, VectorStoreConfig(backend="numpy", shards=3), ChromaDBConfig()
+    )
+    yield store
+    store.close()
+
+
+def test_directory_routing():
+    """Test that files below one top-level directory share a shard."""
+    store = ShardedVectorStore([None] * 4, "directory")
+    assert store.shard_of("a/one.md") == store.shard_of("a/x/two.md") == store.shard_of("a\\three.md")
+    assert store.shard_of("root.md") == store.shard_of("other.md")
+    assert len({ShardedVectorStore([None] * 4, "hash").shard_of(f) for f in FILES}) > 1
+    store.executor.shutdown()
+
+
+def test_fan_out_matches_single_store(tmp_path, sharded):
+    """Test that merged shard results equal those of one unsharded store."""
+    single = NumpyVectorStore(tmp_path / "single")
+    for i, file_path in enumerate(FILES):
+        files = [(file_path, make_chunks(10), make_vectors(10, seed=i))]
+        single.add_chunks_bulk(files)
+        sharded.add_chunks_bulk(files)
+    assert sharded.count() == single.count() == 50
+    assert sum(shard.count() > 0 for shard in sharded.shards) > 1
+
+    query = make_vectors(1, seed=99)[0]
+    expected = single.query(query, top_k=7)
+    results = sharded.query(query, top_k=7)
+    assert [(r.file_path, r.chunk_index) for r in results] == [
+        (r.file_path, r.chunk_index) for r in expected
+    ]
+    assert [r.distance for r in results] == pytest.approx([r.distance for r in expected])
+
+    ids, vectors = sharded.get_all_vectors()
+    assert len(ids) == 50 and vectors.shape == (50, 8)
+    single.close()
+
+
+def test_deletes_reach_the_owning_shard(sharded):
+    """Test deletion by file and by chunk ID across shards."""
+    for i, file_path in enumerate(FILES):
+        sharded.add_chunks(file_path, make_chunks(4), make_vectors(4, seed=i))
+
+    sharded.delete_by_files(["a/one.md", "root.md"])
+    sharded.delete_ids(sharded.make_chunk_ids("b/one.md", make_chunks(4))[:2])
+    sharded.update_chunk_indices({sharded.make_chunk_ids("c/d/one.md", make_chunks(4))[0]: 9})
+
+    assert sharded.count() == 10
+    results = sharded.query(make_vectors(1)[0], top_k=20)
+    assert {r.file_path for r in results} == {"a/two.md", "b/one.md", "c/d/one.md"}
+    assert ("c/d/one.md", 9) in {(r.file_path, r.chunk_index) for r in results}
+
+
+def test_filtered_query_searches_owning_shards(sharded):
+    """Test that a path filter is split across the shards holding the files."""
+    for i, file_path in enumerate(FILES):
+        sharded.add_chunks(file_path, make_chunks(4), make_vectors(4, seed=i))
+    owners = {sharded.shard_of("a/two.md"), sharded.shard_of("c/d/one.md")}
+    for shard in sharded.shards:
+        shard.query = MagicMock(wraps=shard.query)
+
+    results = sharded.query(
+        make_vectors(1)[0], top_k=6, where=MetadataFilter(file_paths=["a/two.md", "c/d/one.md"])
+    )
+
+    assert len(results) == 6
+    assert {r.file_path for r in results} == {"a/two.md", "c/d/one.md"}
+    assert {i for i, shard in enumerate(sharded.shards) if shard.query.called} == owners
+
+
+def test_chroma_shards_use_separate_collections(tmp_path):
+    """Test the sharded chroma factory and queries with empty shards."""
+    store = create_vector_store(
+        tmp_path, VectorStoreConfig(shards=2, shard_by="hash"), ChromaDBConfig()
+    )
+    names = {shard.collection.name for shard in store.shards}
+    assert len(names) == 2
+    assert store.query(make_vectors(1)[0], top_k=3) == []
+
+    store.add_chunks("a.md", make_chunks(3), make_vectors(3))
+    assert len(store.query(make_vectors(1)[0], top_k=3)) == 3
+    store.close()
+
+    with pytest.raises(ValueError):
+        create_vector_store(tmp_path, VectorStoreConfig(shards=2, shard_by="size"), ChromaDBConfig())
+
+
+@pytest.mark.parametrize("backend", ["numpy", "chroma"])
+def test_changed_layout_warns_about_stale_shards(tmp_path, caplog, backend):
+    """Test that stores of a previous shard layout are reported."""
+    def open_store(**kwargs):
+        store = create_vector_store(
+            tmp_path, VectorStoreConfig(backend=backend, **kwargs), ChromaDBConfig()
+        )
+        store.add_chunks("a/one.md", make_chunks(2), make_vectors(2))
+        store.close()
+
+    open_store(shards=2)
+    caplog.clear()
+    open_store(shards=2)
+    assert "no longer used" not in caplog.text
+
+    open_store(shards=3)
+    assert "directory2-0" in caplog.text and "directory2-1" in caplog.text
+
+    caplog.clear()
+    open_store()
+    assert "directory3-2" in caplog.text
+    caplog.clear()
+    open_store(shards=3)
+    expected = "collection 'documents' " if backend == "chroma" else "unsharded files"
+    assert expected in caplog.text